@@ -10,7 +10,9 @@ from trademind.backtest.engine import (
     run_backtest,
     simulate_trades,
     calculate_performance_metrics,
-    generate_trade_summary
+    generate_trade_summary,
+    prepare_backtest_arrays,
+    trade_loop_kernel
 )
 
 
@@ -122,6 +124,40 @@ class TestBacktestEngine(unittest.TestCase):
             for key in expected_trade_keys:
                 self.assertIn(key, first_trade)
     
+    def test_prepare_backtest_arrays(self):
+        """测试预先提取的数组与逐日计算的结果一致"""
+        self.data.iloc[25, self.data.columns.get_loc('Volume')] = np.nan
+        arrays = prepare_backtest_arrays(self.data, self.signals)
+        
+        volume = self.data['Volume']
+        for i in range(50, len(self.data)):
+            self.assertEqual(arrays['avg_volume'][i], volume.iloc[i-20:i].mean())
+        
+        self.assertEqual(arrays['buy'].dtype, bool)
+        self.assertTrue(arrays['buy'][10])
+        self.assertFalse(arrays['buy'][11])
+        self.assertEqual(len(arrays['timestamps']), len(self.data))
+        
+        # 没有成交量数据时使用固定的平均成交量
+        arrays = prepare_backtest_arrays(self.data.drop(columns=['Volume']), self.signals)
+        self.assertTrue((arrays['avg_volume'] == 1000).all())
+    
+    def test_simulate_trades_with_custom_kernel(self):
+        """测试可替换的交易循环实现"""
+        calls = []
+        
+        def kernel(arrays, params, start, stop):
+            calls.append((start, stop, params['max_hold_days']))
+            return trade_loop_kernel(arrays, params, start, stop)
+        
+        trades, equity = simulate_trades(self.data, self.signals, max_hold_days=5, kernel=kernel)
+        self.assertEqual(calls, [(50, len(self.data), 5)])
+        self.assertEqual((trades, equity), simulate_trades(self.data, self.signals, max_hold_days=5))
+        
+        for trade in trades:
+            self.assertEqual(trade['hold_days'], (trade['exit_date'] - trade['entry_date']).days)
+            self.assertLessEqual(trade['hold_days'], 5)
+    
     def test_calculate_performance_metrics(self):
         """测试性能指标计算功能"""
         # 创建一些模拟的交易记录
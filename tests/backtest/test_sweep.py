@@ -0,0 +1,89 @@
+"""
+参数扫描模块的单元测试
+"""
+
+import unittest
+import pandas as pd
+import numpy as np
+from trademind.backtest.engine import run_backtest
+from trademind.backtest.sweep import run_parameter_sweep, expand_grid
+from trademind.core.indicator_frame import IndicatorFrame
+from trademind.core.signals import generate_signals
+
+
+class TestParameterSweep(unittest.TestCase):
+    """测试回测参数扫描"""
+    
+    def setUp(self):
+        """设置测试数据"""
+        np.random.seed(21)
+        dates = pd.date_range(start='2021-01-01', periods=300, freq='B')
+        self.histories = {}
+        for symbol in ['AAA', 'BBB']:
+            close = np.abs(100 + np.cumsum(np.random.normal(0, 2, len(dates)))) + 5
+            open_prices = close + np.random.normal(0, 0.5, len(dates))
+            self.histories[symbol] = pd.DataFrame({
+                'Open': open_prices,
+                'High': np.maximum(open_prices, close) + np.random.uniform(0, 1, len(dates)),
+                'Low': np.minimum(open_prices, close) - np.random.uniform(0, 1, len(dates)),
+                'Close': close,
+                'Volume': np.random.randint(1000, 9000, len(dates))
+            }, index=dates)
+        self.grid = {'stop_loss_pct': [0.03, 0.07], 'max_hold_days': [5, 20]}
+    
+    def test_expand_grid(self):
+        """测试参数网格展开"""
+        combinations = expand_grid(self.grid)
+        self.assertEqual(len(combinations), 4)
+        self.assertEqual(combinations[0]['take_profit_pct'], 0.15)
+        self.assertEqual(combinations[-1]['stop_loss_pct'], 0.07)
+        self.assertEqual(combinations[-1]['max_hold_days'], 20)
+        
+        with self.assertRaises(ValueError):
+            expand_grid({'unknown': [1]})
+    
+    def test_sweep_matches_run_backtest(self):
+        """测试进程池扫描结果与逐个调用run_backtest一致"""
+        results = run_parameter_sweep(self.histories, self.grid, max_workers=2, chunk_size=3)
+        self.assertEqual(len(results), 8)
+        self.assertEqual(list(results.columns[:5]),
+                         ['symbol', 'risk_per_trade_pct', 'stop_loss_pct', 'take_profit_pct', 'max_hold_days'])
+        
+        # 顺序执行与进程池执行结果一致（Sortino比率在无下行风险时含随机值，不参与比较）
+        serial = run_parameter_sweep(self.histories, self.grid, max_workers=1)
+        compared = [column for column in results.columns if column != 'sortino_ratio']
+        pd.testing.assert_frame_equal(results[compared], serial[compared])
+        
+        for _, row in results.iterrows():
+            data = self.histories[row['symbol']]
+            expected = run_backtest(
+                data, generate_signals(data, IndicatorFrame(data)),
+                stop_loss_pct=row['stop_loss_pct'], max_hold_days=row['max_hold_days']
+            )
+            for key in ['total_trades', 'win_rate', 'net_profit', 'max_drawdown', 'annualized_return']:
+                self.assertEqual(row[key], expected[key])
+    
+    def test_trade_dates_keep_timezone(self):
+        """测试扫描中的交易日期保留原数据的时区，与run_backtest一致"""
+        from trademind.backtest.engine import prepare_backtest_arrays
+        from trademind.backtest.sweep import SWEEP_PARAMETERS, _backtest_arrays
+        
+        data = self.histories['AAA'].tz_localize('America/New_York')
+        signals = generate_signals(data, IndicatorFrame(data))
+        trades = _backtest_arrays(prepare_backtest_arrays(data, signals), SWEEP_PARAMETERS, 10000.0)[1]
+        expected = run_backtest(data, signals)
+        
+        self.assertEqual(len(trades), expected['total_trades'])
+        self.assertGreater(len(trades), 0)
+        self.assertEqual(str(trades[0]['entry_date'].tz), 'America/New_York')
+        self.assertTrue(set(trade['entry_date'] for trade in trades) <= set(data.index))
+    
+    def test_empty_input(self):
+        """测试没有可用数据时返回空结果"""
+        results = run_parameter_sweep({'EMPTY': pd.DataFrame()}, self.grid)
+        self.assertTrue(results.empty)
+        self.assertIn('total_trades', results.columns)
+
+
+if __name__ == '__main__':
+    unittest.main()
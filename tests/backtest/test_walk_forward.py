@@ -0,0 +1,118 @@
+"""
+滚动前推优化模块的单元测试
+"""
+
+import unittest
+import pandas as pd
+import numpy as np
+from trademind.backtest.engine import prepare_backtest_arrays
+from trademind.backtest.sweep import _backtest_arrays, _default_signals, expand_grid
+from trademind.backtest.walk_forward import run_walk_forward, walk_forward_splits
+
+
+class TestWalkForward(unittest.TestCase):
+    """测试滚动前推优化"""
+    
+    def setUp(self):
+        """设置测试数据"""
+        np.random.seed(33)
+        dates = pd.date_range(start='2020-01-01', periods=500, freq='B')
+        close = np.abs(100 + np.cumsum(np.random.normal(0, 2, len(dates)))) + 5
+        open_prices = close + np.random.normal(0, 0.5, len(dates))
+        self.data = pd.DataFrame({
+            'Open': open_prices,
+            'High': np.maximum(open_prices, close) + np.random.uniform(0, 1, len(dates)),
+            'Low': np.minimum(open_prices, close) - np.random.uniform(0, 1, len(dates)),
+            'Close': close,
+            'Volume': np.random.randint(1000, 9000, len(dates))
+        }, index=dates)
+        self.grid = {'stop_loss_pct': [0.03, 0.07], 'max_hold_days': [5, 20]}
+    
+    def test_splits(self):
+        """测试滚动和固定起点两种区间划分"""
+        splits = walk_forward_splits(400, in_sample_bars=200, out_of_sample_bars=50)
+        self.assertEqual(splits, [(50, 250, 250, 300), (100, 300, 300, 350), (150, 350, 350, 400)])
+        
+        anchored = walk_forward_splits(400, in_sample_bars=200, out_of_sample_bars=50, anchored=True)
+        self.assertEqual([split[0] for split in anchored], [50, 50, 50])
+        self.assertEqual([split[2:] for split in anchored], [split[2:] for split in splits])
+        
+        self.assertEqual(walk_forward_splits(100, in_sample_bars=200, out_of_sample_bars=50), [])
+    
+    def test_selects_best_in_sample_parameters(self):
+        """测试每个区间选择样本内得分最高的参数"""
+        result = run_walk_forward(self.data, self.grid, in_sample_bars=200, out_of_sample_bars=100,
+                                  objective='final_return', max_workers=1)
+        folds = result['folds']
+        self.assertEqual(len(folds), 2)
+        
+        arrays = prepare_backtest_arrays(self.data, _default_signals(self.data))
+        for fold, (is_start, is_stop, _, _) in zip(folds.itertuples(), walk_forward_splits(500, 200, 100)):
+            scores = [_backtest_arrays(arrays, params, 10000.0, is_start, is_stop)[0]['final_return']
+                      for params in expand_grid(self.grid)]
+            self.assertAlmostEqual(fold.in_sample_final_return, max(scores))
+    
+    def test_minimized_objective(self):
+        """测试最大回撤等越小越好的指标取样本内最小值"""
+        result = run_walk_forward(self.data, self.grid, in_sample_bars=200, out_of_sample_bars=100,
+                                  objective='max_drawdown', max_workers=1)
+        
+        arrays = prepare_backtest_arrays(self.data, _default_signals(self.data))
+        for fold, (is_start, is_stop, _, _) in zip(result['folds'].itertuples(), walk_forward_splits(500, 200, 100)):
+            scores = [_backtest_arrays(arrays, params, 10000.0, is_start, is_stop)[0]['max_drawdown']
+                      for params in expand_grid(self.grid)]
+            self.assertAlmostEqual(fold.in_sample_max_drawdown, min(scores))
+    
+    def test_open_positions_closed_at_fold_end(self):
+        """测试样本外区间结束时仍持有的仓位在区间末尾平仓"""
+        arrays = prepare_backtest_arrays(self.data, _default_signals(self.data))
+        params = expand_grid({'max_hold_days': [1000], 'stop_loss_pct': [0.5], 'take_profit_pct': [5.0]})[0]
+        _, open_trades, open_equity = _backtest_arrays(arrays, params, 10000.0, 250, 350)
+        _, trades, equity = _backtest_arrays(arrays, params, 10000.0, 250, 350, close_at_stop=True)
+        
+        self.assertEqual(len(trades), len(open_trades) + 1)
+        self.assertEqual(trades[-1]['exit_reason'], '区间结束')
+        self.assertEqual(trades[-1]['exit_date'], self.data.index[349])
+        self.assertAlmostEqual(equity[-1], open_equity[-1] + trades[-1]['profit'])
+        
+        result = run_walk_forward(self.data, self.grid, in_sample_bars=200, out_of_sample_bars=100,
+                                  max_workers=1)
+        for fold in result['folds'].itertuples():
+            fold_trades = [trade for trade in result['trades']
+                           if fold.out_of_sample_start <= trade['entry_date'] <= fold.out_of_sample_end]
+            self.assertTrue(all(trade['exit_date'] <= fold.out_of_sample_end for trade in fold_trades))
+    
+    def test_stitched_equity(self):
+        """测试样本外权益曲线首尾相接，资金在区间之间延续"""
+        result = run_walk_forward(self.data, self.grid, in_sample_bars=200, out_of_sample_bars=100,
+                                  max_workers=1)
+        equity = result['equity']
+        self.assertEqual(len(equity), 200)
+        self.assertTrue(equity.index.equals(self.data.index[250:450]))
+        
+        folds = result['folds']
+        second_start = equity.index.get_loc(folds['out_of_sample_start'].iloc[1])
+        self.assertAlmostEqual(equity.iloc[second_start - 1] + folds['oos_net_profit'].iloc[1],
+                               equity.iloc[-1], delta=0.01)
+        self.assertAlmostEqual(result['metrics']['net_profit'], equity.iloc[-1] - 10000.0, delta=0.01)
+        self.assertEqual(result['metrics']['total_trades'], len(result['trades']))
+    
+    def test_parallel_matches_serial(self):
+        """测试多进程与单进程结果一致"""
+        serial = run_walk_forward(self.data, self.grid, in_sample_bars=200, out_of_sample_bars=100,
+                                  max_workers=1)
+        parallel = run_walk_forward(self.data, self.grid, in_sample_bars=200, out_of_sample_bars=100,
+                                    max_workers=2)
+        # Sortino比率在没有下行风险时含随机成分，不参与比较
+        columns = [column for column in serial['folds'].columns if 'sortino' not in column]
+        pd.testing.assert_frame_equal(serial['folds'][columns], parallel['folds'][columns])
+        pd.testing.assert_series_equal(serial['equity'], parallel['equity'])
+    
+    def test_invalid_objective(self):
+        """测试不支持的优化目标"""
+        with self.assertRaises(ValueError):
+            run_walk_forward(self.data, self.grid, objective='unknown')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,6 +11,7 @@ from pathlib import Path
 import tempfile
 import shutil
 import os
+import time
 
 from trademind.core.analyzer import StockAnalyzer
 
@@ -196,6 +197,141 @@ class TestStockAnalyzer(unittest.TestCase):
         # 验证generate_html_report被调用
         self.assertTrue(mock_generate_html_report.called)
     
+    def test_pipelined_analysis_order(self):
+        """测试流水线获取数据时结果仍按输入顺序返回"""
+        symbols = ['AAA', 'BBB', 'CCC', 'DDD', 'EEE']
+        delays = {'AAA': 0.05, 'BBB': 0.0, 'CCC': 0.03, 'DDD': 0.0, 'EEE': 0.01}
+        
+        def get_stock_data(symbol):
+            time.sleep(delays[symbol])
+            return pd.DataFrame() if symbol == 'DDD' else self.mock_data
+        
+        with patch.object(self.analyzer, 'get_stock_data', side_effect=get_stock_data), \
+             patch.object(self.analyzer, 'analyze_history',
+                          side_effect=lambda symbol, name, hist: {'symbol': symbol, 'name': name}):
+            results = self.analyzer.analyze_stocks(symbols, {'AAA': 'A公司'}, lookahead=3)
+        
+        self.assertEqual([r['symbol'] for r in results], ['AAA', 'BBB', 'CCC', 'EEE'])
+        self.assertEqual(results[0]['name'], 'A公司')
+    
+    def test_process_pool_analysis(self):
+        """测试多进程分析的结果与单进程一致、按输入顺序返回，且单只股票失败不影响其他股票"""
+        symbols = ['AAA', 'BAD', 'BBB', 'EMPTY', 'CCC']
+        histories = {
+            'AAA': self.mock_data,
+            'BAD': self.mock_data[['Volume']],
+            'BBB': self.mock_data.iloc[::-1].set_axis(self.mock_data.index),
+            'EMPTY': pd.DataFrame(),
+            'CCC': self.mock_data.tz_localize('America/New_York')
+        }
+        
+        with patch.object(self.analyzer, 'get_stock_data', side_effect=histories.get):
+            serial = self.analyzer.analyze_stocks(symbols)
+            parallel = self.analyzer.analyze_stocks(symbols, workers=2)
+        
+        self.assertEqual([r['symbol'] for r in parallel], ['AAA', 'BBB', 'CCC'])
+        self.assertEqual([r['symbol'] for r in serial], ['AAA', 'BBB', 'CCC'])
+        for expected, result in zip(serial, parallel):
+            self.assertAlmostEqual(result['price'], expected['price'])
+            self.assertAlmostEqual(result['price_change_pct'], expected['price_change_pct'])
+            self.assertEqual(result['advice'], expected['advice'])
+            self.assertEqual(result['patterns'], expected['patterns'])
+            # 精简后的指标只包含最新值
+            self.assertIsInstance(result['indicators'], dict)
+            self.assertNotIn('rsi_series', result['indicators'])
+            self.assertAlmostEqual(result['indicators']['rsi'], expected['indicators']['rsi'])
+            self.assertEqual(result['indicators']['macd'], expected['indicators']['macd'])
+            for key in ('total_trades', 'win_rate', 'final_return', 'max_drawdown'):
+                self.assertEqual(result['backtest'][key], expected['backtest'][key])
+    
+    def test_progress_callback_and_cancel(self):
+        """测试进度回调收到各阶段和每只股票结束的事件，取消后不再开始新的股票"""
+        import threading
+        
+        events = []
+        cancel_event = threading.Event()
+        histories = {'AAA': self.mock_data, 'EMPTY': pd.DataFrame(), 'BBB': self.mock_data, 'CCC': self.mock_data}
+        
+        def on_progress(event, data):
+            events.append((event, data.get('stage') or data.get('status'), data['symbol']))
+            if event == 'symbol' and data['symbol'] == 'BBB':
+                cancel_event.set()
+        
+        with patch.object(self.analyzer, 'get_stock_data', side_effect=histories.get):
+            results = self.analyzer.analyze_stocks(list(histories), progress_callback=on_progress,
+                                                   cancel_event=cancel_event, lookahead=0)
+        
+        self.assertEqual([r['symbol'] for r in results], ['AAA', 'BBB'])
+        self.assertEqual(events[:5], [('stage', 'fetch', None), ('stage', 'indicators', 'AAA'),
+                                      ('stage', 'backtest', 'AAA'), ('symbol', 'done', 'AAA'),
+                                      ('symbol', 'skipped', 'EMPTY')])
+        self.assertEqual(events[-1], ('symbol', 'done', 'BBB'))
+        
+        # 已取消时不生成报告
+        with patch.object(self.analyzer, 'get_stock_data', side_effect=histories.get), \
+             patch.object(self.analyzer, 'generate_report') as mock_generate_report:
+            self.assertIsNone(self.analyzer.analyze_and_report(['AAA'], cancel_event=cancel_event))
+        mock_generate_report.assert_not_called()
+    
+    def test_analyze_and_stream_report(self):
+        """测试传入报告写入器时边分析边写入报告"""
+        from trademind.reports.generator import HTMLReportWriter
+        
+        histories = {'AAA': self.mock_data, 'EMPTY': pd.DataFrame(), 'BBB': self.mock_data}
+        writer = HTMLReportWriter("流式报告", self.temp_dir)
+        with patch.object(self.analyzer, 'get_stock_data', side_effect=histories.get), \
+             patch.object(self.analyzer, 'generate_report') as mock_generate_report:
+            report_path = self.analyzer.analyze_and_report(list(histories), title="流式报告", report_writer=writer)
+        
+        mock_generate_report.assert_not_called()
+        self.assertEqual(report_path, str(writer.path))
+        self.assertEqual(writer.stock_count, 2)
+        with open(report_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        self.assertIn('AAA', content)
+        self.assertIn('BBB', content)
+        
+        # 没有结果时删除已写入的报告
+        empty_writer = HTMLReportWriter("空报告", self.temp_dir)
+        with patch.object(self.analyzer, 'get_stock_data', return_value=pd.DataFrame()):
+            self.assertIsNone(self.analyzer.analyze_and_report(['EMPTY'], report_writer=empty_writer))
+        self.assertFalse(empty_writer.path.exists())
+        
+        # 分析中途出错时删除写了一半的报告，报告阶段在写入开始前通知
+        events = []
+        broken_writer = HTMLReportWriter("中断报告", self.temp_dir)
+        def broken_results():
+            yield {'symbol': 'AAA'}
+            raise RuntimeError("进程池已损坏")
+        
+        with patch.object(self.analyzer, 'iter_analyze_stocks', return_value=broken_results()):
+            with self.assertRaises(RuntimeError):
+                self.analyzer.analyze_and_report(['AAA'], report_writer=broken_writer,
+                                                 progress_callback=lambda event, data: events.append(data.get('stage')))
+        self.assertFalse(broken_writer.path.exists())
+        self.assertEqual(events[0], 'report')
+    
+    @patch('trademind.data.loader._fetch_cn_stock_data')
+    @patch('trademind.data.loader._download_us_batch')
+    @patch('yfinance.Ticker')
+    def test_prefetch_matches_get_stock_data(self, mock_ticker, mock_download, mock_fetch_cn):
+        """测试批量预取与get_stock_data获取相同的数据：A股也从Yahoo获取3年数据"""
+        mock_download.return_value = {'600519': self.mock_data, 'SHOP': self.mock_data}
+        seen = {}
+        
+        def analyze_history(symbol, name, hist):
+            seen[symbol] = hist
+            return {'symbol': symbol}
+        
+        with patch.object(self.analyzer, 'analyze_history', side_effect=analyze_history):
+            self.analyzer.analyze_stocks(['600519', 'SHOP'], prefetch=True)
+        
+        self.assertEqual(mock_download.call_args[0][:2], (['600519', 'SHOP'], '3y'))
+        mock_fetch_cn.assert_not_called()
+        # 预取的数据在本次运行中直接使用，不再单独请求
+        mock_ticker.assert_not_called()
+        pd.testing.assert_frame_equal(seen['600519'], self.mock_data)
+    
     def test_clean_reports(self):
         """测试清理报告功能"""
         # 创建一些测试报告文件
@@ -0,0 +1,127 @@
+"""
+指标集合模块的测试
+
+本模块包含对trademind.core.indicator_frame模块中IndicatorFrame的测试。
+测试确保指标集合的结果与各独立指标函数一致，并且指标按需生成。
+"""
+
+import unittest
+import pandas as pd
+import numpy as np
+from trademind.core.indicator_frame import IndicatorFrame
+from trademind.core.indicators import (
+    calculate_macd,
+    calculate_kdj,
+    calculate_rsi,
+    calculate_rsi_series,
+    calculate_bollinger_bands,
+    calculate_dynamic_rsi_thresholds
+)
+from trademind.core.signals import generate_signals, generate_trading_advice
+
+
+class TestIndicatorFrame(unittest.TestCase):
+    """测试IndicatorFrame"""
+
+    def setUp(self):
+        """设置测试数据"""
+        np.random.seed(42)
+        length = 400
+        dates = pd.date_range(start='2022-01-01', periods=length, freq='B')
+        close = 100 + np.cumsum(np.random.normal(0, 1, length))
+        self.data = pd.DataFrame({
+            'Open': close + np.random.normal(0, 0.5, length),
+            'High': close + np.abs(np.random.normal(0, 1, length)),
+            'Low': close - np.abs(np.random.normal(0, 1, length)),
+            'Close': close,
+            'Volume': np.random.randint(1000, 10000, length)
+        }, index=dates)
+
+    def test_matches_indicator_functions(self):
+        """测试指标集合与独立指标函数结果一致"""
+        frame = IndicatorFrame(self.data)
+        close, high, low = self.data['Close'], self.data['High'], self.data['Low']
+
+        self.assertAlmostEqual(frame['rsi'], calculate_rsi(close), places=10)
+        pd.testing.assert_series_equal(frame['rsi_series'], calculate_rsi_series(close), check_names=False)
+
+        macd, signal, hist = calculate_macd(close)
+        self.assertAlmostEqual(frame['macd']['macd'], macd, places=10)
+        self.assertAlmostEqual(frame['macd']['signal'], signal, places=10)
+        self.assertAlmostEqual(frame['macd']['hist'], hist, places=10)
+
+        k, d, j = calculate_kdj(high, low, close)
+        self.assertAlmostEqual(frame['kdj']['k'], k, places=10)
+        self.assertAlmostEqual(frame['kdj']['d'], d, places=10)
+        self.assertAlmostEqual(frame['kdj']['j'], j, places=10)
+
+        expected = calculate_bollinger_bands(close)
+        bollinger = frame['bollinger']
+        for key, value in zip(['upper', 'middle', 'lower', 'bandwidth', 'percent_b'], expected):
+            self.assertAlmostEqual(bollinger[key], value, places=10)
+
+        expected = calculate_dynamic_rsi_thresholds(high, low, close)
+        dynamic_rsi = frame['dynamic_rsi']
+        for key, value in zip(['rsi', 'oversold', 'overbought', 'volatility'], expected):
+            self.assertAlmostEqual(dynamic_rsi[key], value, places=10)
+
+        for window in [5, 10, 20, 50, 200]:
+            pd.testing.assert_series_equal(
+                frame[f'sma{window}'], close.rolling(window=window).mean(), check_names=False
+            )
+
+    def test_insufficient_data_defaults(self):
+        """测试数据不足时返回与独立指标函数相同的默认值"""
+        frame = IndicatorFrame(self.data.iloc[:12])
+
+        self.assertEqual(frame['rsi'], 50.0)
+        self.assertEqual(frame['macd'], {'macd': 0.0, 'signal': 0.0, 'hist': 0.0})
+        self.assertEqual(frame['bollinger']['upper'], 0.0)
+        self.assertEqual(frame['dynamic_rsi'], {'rsi': 50.0, 'oversold': 30.0, 'overbought': 70.0, 'volatility': 0.5})
+
+    def test_lazy_materialization(self):
+        """测试指标列按需生成，且共享中间量只计算一次"""
+        frame = IndicatorFrame(self.data)
+        self.assertEqual(frame.materialized, ())
+
+        frame['kdj']
+        self.assertEqual(set(frame.materialized), {'k', 'd', 'j'})
+
+        # 20日均线与布林带中轨共用同一个滚动均值
+        frame.column('bb_middle')
+        self.assertIs(frame.column('sma20'), frame.column('bb_middle'))
+
+        column = frame.column('rsi')
+        self.assertEqual(column.dtype, np.float64)
+        self.assertTrue(column.flags['C_CONTIGUOUS'])
+        self.assertIs(frame.column('rsi'), column)
+
+    def test_mapping_interface(self):
+        """测试映射接口与原指标字典的键一致"""
+        frame = IndicatorFrame(self.data)
+        self.assertEqual(
+            list(frame),
+            ['rsi', 'rsi_series', 'dynamic_rsi', 'macd', 'kdj', 'bollinger',
+             'sma5', 'sma10', 'sma20', 'sma50', 'sma200']
+        )
+        self.assertIn('kdj', frame)
+        self.assertIsInstance(frame['kdj'], dict)
+        self.assertIsNone(frame.get('unknown'))
+        with self.assertRaises(KeyError):
+            frame.column('unknown')
+
+    def test_consumers(self):
+        """测试信号生成和交易建议可直接使用指标集合"""
+        frame = IndicatorFrame(self.data)
+
+        signals = generate_signals(self.data, frame)
+        self.assertEqual(len(signals), len(self.data))
+        pd.testing.assert_series_equal(signals['macd_line'], frame.series('macd'), check_names=False)
+        pd.testing.assert_series_equal(signals['upper_band'], frame.series('bb_upper'), check_names=False)
+
+        advice = generate_trading_advice(frame, float(self.data['Close'].iloc[-1]))
+        self.assertIn('advice', advice)
+
+
+if __name__ == '__main__':
+    unittest.main()
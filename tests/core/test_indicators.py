@@ -12,11 +12,49 @@ import math
 from trademind.core.indicators import (
     calculate_macd,
     calculate_kdj,
+    calculate_kdj_series,
     calculate_rsi,
-    calculate_bollinger_bands
+    calculate_rsi_series,
+    calculate_bollinger_bands,
+    calculate_panel_indicators,
+    align_panel,
+    rolling_percentile
 )
 
 
+def legacy_rsi(prices: pd.Series, period: int = 14) -> float:
+    """原StockAnalyzer中基于循环的Wilder RSI实现，作为对照基准"""
+    if len(prices) <= period:
+        return 50.0
+    delta = prices.diff().dropna()
+    gain = delta.clip(lower=0)
+    loss = -delta.clip(upper=0)
+    avg_gain = gain.rolling(window=period).mean().iloc[period-1]
+    avg_loss = loss.rolling(window=period).mean().iloc[period-1]
+    for i in range(period, len(delta)):
+        avg_gain = (avg_gain * (period - 1) + gain.iloc[i]) / period
+        avg_loss = (avg_loss * (period - 1) + loss.iloc[i]) / period
+    if avg_loss == 0:
+        return 100.0
+    return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+def legacy_kdj(high: pd.Series, low: pd.Series, close: pd.Series, n: int = 9) -> tuple:
+    """原StockAnalyzer中基于循环的KDJ实现，作为对照基准"""
+    low_list = low.rolling(window=n).min()
+    high_list = high.rolling(window=n).max()
+    rsv = pd.Series(0.0, index=close.index)
+    valid_idx = high_list != low_list
+    rsv[valid_idx] = (close[valid_idx] - low_list[valid_idx]) / (high_list[valid_idx] - low_list[valid_idx]) * 100
+    k = pd.Series(50.0, index=close.index)
+    d = pd.Series(50.0, index=close.index)
+    for i in range(n, len(close)):
+        k.iloc[i] = 2/3 * k.iloc[i-1] + 1/3 * rsv.iloc[i]
+        d.iloc[i] = 2/3 * d.iloc[i-1] + 1/3 * k.iloc[i]
+    j = 3 * k - 2 * d
+    return k.clip(0, 100), d.clip(0, 100), j.clip(0, 100)
+
+
 class TestIndicators(unittest.TestCase):
     """测试技术指标计算函数"""
 
@@ -85,6 +123,30 @@ class TestIndicators(unittest.TestCase):
         self.assertFalse(math.isnan(d))
         self.assertFalse(math.isnan(j))
 
+    def test_calculate_kdj_series_matches_legacy(self):
+        """测试KDJ序列与原循环实现逐点一致"""
+        rng = np.random.default_rng(3)
+        close = pd.Series(100 + np.cumsum(rng.normal(0, 1, 200)))
+        high = close + rng.uniform(0, 2, 200)
+        low = close - rng.uniform(0, 2, 200)
+        
+        k, d, j = calculate_kdj_series(high, low, close)
+        legacy_k, legacy_d, legacy_j = legacy_kdj(high, low, close)
+        
+        np.testing.assert_allclose(k.to_numpy(), legacy_k.to_numpy(), atol=1e-9)
+        np.testing.assert_allclose(d.to_numpy(), legacy_d.to_numpy(), atol=1e-9)
+        np.testing.assert_allclose(j.to_numpy(), legacy_j.to_numpy(), atol=1e-9)
+        self.assertTrue(k.index.equals(close.index))
+        
+        # 元组接口是完整序列最后一个元素的视图
+        self.assertEqual(calculate_kdj(high, low, close), (k.iloc[-1], d.iloc[-1], j.iloc[-1]))
+        
+        # 价格无波动时RSV为0，不应产生除零
+        flat = pd.Series([10.0] * 30)
+        flat_k, flat_d, flat_j = calculate_kdj_series(flat, flat, flat)
+        self.assertFalse(flat_k.isna().any())
+        self.assertEqual(flat_k.iloc[8], 50.0)
+
     def test_calculate_rsi(self):
         """测试RSI计算函数"""
         rsi = calculate_rsi(self.prices)
@@ -99,6 +161,46 @@ class TestIndicators(unittest.TestCase):
         # 验证返回值不是NaN
         self.assertFalse(math.isnan(rsi))
 
+    def test_calculate_rsi_matches_legacy(self):
+        """测试向量化RSI与原循环实现一致"""
+        rng = np.random.default_rng(42)
+        prices = pd.Series(100 + np.cumsum(rng.normal(0, 1, 300)))
+        
+        self.assertAlmostEqual(calculate_rsi(prices), legacy_rsi(prices), places=8)
+        self.assertAlmostEqual(calculate_rsi(self.prices), legacy_rsi(self.prices), places=8)
+        
+        # 单边上涨时平均跌幅为零，RSI为100
+        self.assertEqual(calculate_rsi(pd.Series(np.arange(30.0))), 100.0)
+
+    def test_calculate_rsi_series(self):
+        """测试完整RSI序列"""
+        rng = np.random.default_rng(7)
+        prices = pd.Series(100 + np.cumsum(rng.normal(0, 1, 120)))
+        rsi = calculate_rsi_series(prices)
+        
+        # 验证索引对齐和预热期
+        self.assertTrue(rsi.index.equals(prices.index))
+        self.assertTrue(rsi.iloc[:14].isna().all())
+        self.assertFalse(rsi.iloc[14:].isna().any())
+        
+        # 序列中每个位置都应等于截至该位置计算的RSI
+        for end in (15, 40, 120):
+            self.assertAlmostEqual(rsi.iloc[end - 1], legacy_rsi(prices.iloc[:end]), places=8)
+        
+        # 数据不足时全部为NaN
+        self.assertTrue(calculate_rsi_series(prices.iloc[:10]).isna().all())
+
+    def test_rolling_percentile(self):
+        """测试滚动百分位与逐窗口排名结果一致"""
+        np.random.seed(3)
+        # 保留两位小数以产生并列值
+        values = pd.Series(np.round(np.random.random(400), 2))
+        values.iloc[:10] = np.nan
+        window = 60
+        
+        expected = values.rolling(window=window).apply(lambda x: pd.Series(x).rank(pct=True).iloc[-1])
+        pd.testing.assert_series_equal(rolling_percentile(values, window), expected)
+
     def test_calculate_bollinger_bands(self):
         """测试布林带计算函数"""
         upper, middle, lower, bandwidth, percent_b = calculate_bollinger_bands(self.prices)
@@ -122,5 +224,67 @@ class TestIndicators(unittest.TestCase):
         self.assertFalse(math.isnan(percent_b))
 
 
+class TestPanelIndicators(unittest.TestCase):
+    """测试多股票面板指标计算"""
+
+    def setUp(self):
+        """设置测试数据，其中一只股票上市较晚"""
+        np.random.seed(11)
+        dates = pd.date_range(start='2022-01-03', periods=300, freq='B')
+        self.histories = {}
+        for symbol, start in [('AAA', 0), ('BBB', 0), ('NEW', 240)]:
+            close = 100 + np.cumsum(np.random.normal(0, 1, len(dates) - start))
+            self.histories[symbol] = pd.DataFrame({
+                'High': close + np.abs(np.random.normal(0, 1, len(close))),
+                'Low': close - np.abs(np.random.normal(0, 1, len(close))),
+                'Close': close
+            }, index=dates[start:])
+
+    def test_matches_single_symbol(self):
+        """测试面板结果与逐只股票计算一致"""
+        panel = align_panel(self.histories, fields=('High', 'Low', 'Close'))
+        self.assertEqual(list(panel['Close'].columns), ['AAA', 'BBB', 'NEW'])
+        
+        results = calculate_panel_indicators(panel['High'], panel['Low'], panel['Close'])
+        
+        for symbol, data in self.histories.items():
+            close, high, low = data['Close'], data['High'], data['Low']
+            
+            def latest(name):
+                return results[name][symbol].loc[data.index[-1]]
+            
+            pd.testing.assert_series_equal(
+                results['rsi'][symbol].loc[data.index], calculate_rsi_series(close), check_names=False
+            )
+            k, d, j = calculate_kdj_series(high, low, close)
+            pd.testing.assert_series_equal(results['k'][symbol].loc[data.index], k, check_names=False)
+            pd.testing.assert_series_equal(results['j'][symbol].loc[data.index], j, check_names=False)
+            
+            np.testing.assert_allclose(
+                [latest('macd'), latest('macd_signal'), latest('macd_hist')], calculate_macd(close), atol=1e-8
+            )
+            np.testing.assert_allclose(
+                [latest(name) for name in ['bb_upper', 'bb_middle', 'bb_lower', 'bb_bandwidth', 'bb_percent_b']],
+                calculate_bollinger_bands(close), atol=1e-8
+            )
+            np.testing.assert_allclose(
+                results['sma50'][symbol].loc[data.index], close.rolling(window=50).mean(), atol=1e-8
+            )
+        
+        # 上市之前没有指标值
+        before_listing = results['rsi']['NEW'].loc[:self.histories['NEW'].index[0]].iloc[:-1]
+        self.assertTrue(before_listing.isna().all())
+        self.assertTrue(results['atr']['NEW'].loc[:self.histories['NEW'].index[0]].iloc[:-1].isna().all())
+
+    def test_accepts_arrays(self):
+        """测试面板接口接受二维数组"""
+        close = np.column_stack([self.histories['AAA']['Close'], self.histories['BBB']['Close']])
+        results = calculate_panel_indicators(close + 1, close - 1, close)
+        self.assertEqual(results['rsi'].shape, close.shape)
+        np.testing.assert_allclose(
+            results['rsi'][0].to_numpy(), calculate_rsi_series(pd.Series(close[:, 0])).to_numpy()
+        )
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
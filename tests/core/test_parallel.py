@@ -0,0 +1,65 @@
+"""
+测试多进程分析模块
+"""
+
+import unittest
+import pandas as pd
+import numpy as np
+
+from trademind.core.indicator_frame import IndicatorFrame
+from trademind.core.parallel import attach_history, compact_result, release_history, share_history
+
+
+class TestParallel(unittest.TestCase):
+    """测试共享内存传递历史数据"""
+    
+    def setUp(self):
+        """设置测试环境"""
+        dates = pd.date_range(start='2023-01-02', periods=60, freq='B', tz='Asia/Shanghai', name='Date')
+        np.random.seed(7)
+        close = 100 + np.cumsum(np.random.normal(0, 1, len(dates)))
+        self.data = pd.DataFrame({
+            'Open': close + 0.5,
+            'High': close + 1.0,
+            'Low': close - 1.0,
+            'Close': close,
+            'Volume': np.random.randint(1000, 5000, len(dates)),
+            'Name': 'TEST'
+        }, index=dates)
+    
+    def roundtrip(self, data):
+        block, descriptor = share_history(data)
+        try:
+            return attach_history(descriptor)
+        finally:
+            release_history(block)
+    
+    def test_roundtrip(self):
+        """测试数值列、数据类型和带时区的日期索引原样恢复，非数值列被忽略"""
+        restored = self.roundtrip(self.data)
+        pd.testing.assert_frame_equal(restored, self.data.drop(columns=['Name']), check_freq=False)
+    
+    def test_roundtrip_with_nan_and_naive_index(self):
+        """测试缺失值和不带时区的索引"""
+        data = self.data.drop(columns=['Name']).tz_localize(None)
+        data.iloc[3, 0] = np.nan
+        pd.testing.assert_frame_equal(self.roundtrip(data), data, check_freq=False)
+    
+    def test_roundtrip_empty(self):
+        """测试空数据"""
+        restored = self.roundtrip(self.data.iloc[:0])
+        self.assertTrue(restored.empty)
+        self.assertEqual(list(restored.columns), ['Open', 'High', 'Low', 'Close', 'Volume'])
+    
+    def test_compact_result(self):
+        """测试分析结果中的指标集合被替换为只含最新值的字典"""
+        indicators = IndicatorFrame(self.data)
+        result = compact_result({'symbol': 'TEST', 'indicators': indicators})
+        
+        self.assertEqual(set(result['indicators']), {'rsi', 'dynamic_rsi', 'macd', 'kdj', 'bollinger'})
+        self.assertEqual(result['indicators']['macd'], indicators['macd'])
+        self.assertEqual(result['symbol'], 'TEST')
+
+
+if __name__ == '__main__':
+    unittest.main()
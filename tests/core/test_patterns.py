@@ -7,7 +7,7 @@ TradeMind Lite（轻量版）- 形态识别模块测试
 import unittest
 import pandas as pd
 import numpy as np
-from trademind.core.patterns import TechnicalPattern, identify_candlestick_patterns
+from trademind.core.patterns import TechnicalPattern, identify_candlestick_patterns, scan_candlestick_patterns
 
 
 class TestTechnicalPattern(unittest.TestCase):
@@ -163,6 +163,32 @@ class TestCandlestickPatterns(unittest.TestCase):
         if len(bearish_engulfing_patterns) > 0:
             print(f"识别出的看跌吞没形态: {bearish_engulfing_patterns[0].name}, 置信度: {bearish_engulfing_patterns[0].confidence}")
     
+    def test_scan_candlestick_patterns(self):
+        """测试形态矩阵的最后一行与最新K线的识别结果一致"""
+        np.random.seed(9)
+        length = 300
+        close = 100 + np.cumsum(np.random.normal(0, 1, length))
+        open_price = close + np.random.normal(0, 0.8, length)
+        # 制造部分小实体K线，覆盖十字星形态
+        open_price[::6] = close[::6] + np.random.normal(0, 0.01, len(open_price[::6]))
+        data = pd.DataFrame({
+            'Open': open_price,
+            'High': np.maximum(open_price, close) + np.random.random(length) * np.random.choice([0.05, 2.0], length),
+            'Low': np.minimum(open_price, close) - np.random.random(length) * np.random.choice([0.05, 2.0], length),
+            'Close': close
+        })
+        
+        matrix = scan_candlestick_patterns(data)
+        self.assertEqual(matrix.shape, (length, 9))
+        self.assertEqual(matrix.dtypes.unique().tolist(), [np.uint8])
+        self.assertTrue((matrix.iloc[:4] == 0).all().all())
+        self.assertTrue(matrix.astype(bool).any().all(), "测试数据应覆盖全部形态")
+        
+        for end in range(5, length + 1):
+            expected = [(p.name, p.confidence) for p in identify_candlestick_patterns(data.iloc[:end])]
+            row = matrix.iloc[end - 1]
+            self.assertEqual([(name, int(value)) for name, value in row.items() if value > 0], expected)
+
     def test_compare_with_original(self):
         """测试与原始实现的结果一致性"""
         # 这个测试需要在集成测试中完成，因为需要访问原始的StockAnalyzer类
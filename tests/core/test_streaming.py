@@ -0,0 +1,90 @@
+"""
+增量指标模块的测试
+
+本模块包含对trademind.core.streaming模块中增量指标状态的测试。
+测试确保逐根K线更新的结果与trademind.core.indicators一致，并且状态可以序列化后恢复。
+"""
+
+import json
+import unittest
+import pandas as pd
+import numpy as np
+from trademind.core.streaming import IndicatorState, ATRState
+from trademind.core.indicators import (
+    calculate_macd,
+    calculate_kdj,
+    calculate_rsi,
+    calculate_bollinger_bands
+)
+
+
+class TestIndicatorState(unittest.TestCase):
+    """测试增量指标状态"""
+
+    def setUp(self):
+        """设置测试数据"""
+        np.random.seed(7)
+        length = 300
+        dates = pd.date_range(start='2023-01-02', periods=length, freq='B')
+        close = 100 + np.cumsum(np.random.normal(0, 1, length))
+        self.data = pd.DataFrame({
+            'High': close + np.abs(np.random.normal(0, 1, length)),
+            'Low': close - np.abs(np.random.normal(0, 1, length)),
+            'Close': close
+        }, index=dates)
+
+    def assert_matches_indicators(self, snapshot, data):
+        close, high, low = data['Close'], data['High'], data['Low']
+
+        # 预热期内两者都可能为NaN，NaN视为相等
+        np.testing.assert_allclose(snapshot['rsi'], calculate_rsi(close), atol=1e-8)
+        np.testing.assert_allclose(
+            [snapshot['macd'][key] for key in ['macd', 'signal', 'hist']],
+            calculate_macd(close), atol=1e-8
+        )
+        np.testing.assert_allclose(
+            [snapshot['kdj'][key] for key in ['k', 'd', 'j']],
+            calculate_kdj(high, low, close), atol=1e-8
+        )
+        np.testing.assert_allclose(
+            [snapshot['bollinger'][key] for key in ['upper', 'middle', 'lower', 'bandwidth', 'percent_b']],
+            calculate_bollinger_bands(close), atol=1e-8
+        )
+
+    def test_matches_batch_indicators(self):
+        """测试不同长度下增量结果与批量计算一致"""
+        for length in [5, 20, 30, 120, 300]:
+            data = self.data.iloc[:length]
+            state = IndicatorState.from_history(data)
+            self.assert_matches_indicators(state.snapshot(), data)
+
+    def test_resume_from_serialized_state(self):
+        """测试序列化后恢复状态，只输入新增K线即可得到相同结果"""
+        state = IndicatorState.from_history(self.data.iloc[:250])
+        restored = IndicatorState.from_dict(json.loads(json.dumps(state.to_dict())))
+
+        # 传入包含重叠部分的数据，已处理的K线应被跳过
+        processed = restored.update(self.data.iloc[200:])
+        self.assertEqual(processed, 50)
+        self.assertEqual(restored.last_timestamp, self.data.index[-1])
+        self.assert_matches_indicators(restored.snapshot(), self.data)
+
+    def test_atr_matches_wilder_smoothing(self):
+        """测试ATR与回测引擎中的Wilder平滑方法一致"""
+        high, low, close = self.data['High'], self.data['Low'], self.data['Close']
+        tr = pd.concat([high - low, abs(high - close.shift()), abs(low - close.shift())], axis=1).max(axis=1)
+        atr = tr.rolling(window=14).mean()
+        for i in range(14, len(tr)):
+            atr.iloc[i] = (atr.iloc[i-1] * 13 + tr.iloc[i]) / 14
+
+        state = ATRState()
+        for i in range(len(close)):
+            state.update(high.iloc[i], low.iloc[i], close.iloc[i])
+            if i < 13:
+                self.assertTrue(np.isnan(state.value()))
+            else:
+                self.assertAlmostEqual(state.value(), atr.iloc[i], places=10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,3 @@
+"""
+数据加载模块的测试包
+"""
\ No newline at end of file
@@ -0,0 +1,226 @@
+"""
+行情数据缓存模块的单元测试
+"""
+
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+import numpy as np
+import pandas as pd
+import pytz
+from trademind.core.streaming import IndicatorState
+from trademind.data import cache as cache_module
+from trademind.data.cache import (
+    OHLCVCache,
+    cached_history,
+    is_market_open,
+    last_session_close,
+    symbol_market
+)
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=pytz.utc)
+
+
+class TestOHLCVCache(unittest.TestCase):
+    """测试本地行情缓存"""
+    
+    def setUp(self):
+        """设置测试数据"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = OHLCVCache(self.temp_dir)
+        dates = pd.date_range(start='2023-01-03', periods=400, freq='B', tz='America/New_York', name='Date')
+        np.random.seed(5)
+        self.data = pd.DataFrame({
+            'Open': np.random.uniform(90, 110, len(dates)),
+            'High': np.random.uniform(110, 120, len(dates)),
+            'Low': np.random.uniform(80, 90, len(dates)),
+            'Close': np.random.uniform(90, 110, len(dates)),
+            'Volume': np.random.randint(1000, 9000, len(dates)),
+            'Code': 'AAPL'
+        }, index=dates)
+        # 2024-07-12（周五）美东收盘后
+        self.fetched_at = utc(2024, 7, 12, 21, 0)
+    
+    def tearDown(self):
+        """清理测试环境"""
+        shutil.rmtree(self.temp_dir)
+        cache_module.disable_cache()
+    
+    def test_round_trip(self):
+        """测试写入后读取的数据、索引和时区与原数据一致，非数值列不缓存"""
+        self.assertTrue(self.cache.write('AAPL', self.data, '2y', fetched_at=self.fetched_at))
+        data, meta = self.cache.read('AAPL')
+        pd.testing.assert_frame_equal(data, self.data.drop(columns=['Code']), check_freq=False)
+        self.assertEqual(meta['period'], '2y')
+        self.assertEqual(self.cache.read('MSFT'), (None, None))
+    
+    def test_market_sessions(self):
+        """测试交易时段和最近收盘时间"""
+        self.assertEqual(symbol_market('600519'), 'CN')
+        self.assertEqual(symbol_market('000001.SZ'), 'CN')
+        self.assertEqual(symbol_market('AAPL'), 'US')
+        self.assertEqual(symbol_market('SH600519'), 'CN')
+        self.assertEqual(symbol_market('SHOP'), 'US')
+        self.assertEqual(symbol_market('BJ'), 'US')
+        
+        self.assertTrue(is_market_open('US', utc(2024, 7, 12, 15, 0)))
+        self.assertFalse(is_market_open('US', utc(2024, 7, 13, 15, 0)))
+        self.assertTrue(is_market_open('CN', utc(2024, 7, 12, 2, 0)))
+        
+        # 周末的最近收盘为周五收盘
+        self.assertEqual(last_session_close('US', utc(2024, 7, 14, 12, 0)), utc(2024, 7, 12, 20, 0))
+        self.assertEqual(last_session_close('CN', utc(2024, 7, 15, 3, 0)), utc(2024, 7, 12, 7, 0))
+    
+    def test_freshness(self):
+        """测试按交易时段判断缓存是否新鲜"""
+        self.cache.write('AAPL', self.data, '1y', fetched_at=self.fetched_at)
+        
+        # 周末和下一交易日开盘前仍然新鲜
+        self.assertIsNotNone(self.cache.get('AAPL', '1y', now=utc(2024, 7, 14, 12, 0)))
+        self.assertIsNotNone(self.cache.get('AAPL', '1y', now=utc(2024, 7, 15, 13, 0)))
+        # 交易时段内超过有效期，或下一交易日收盘后，需要重新获取
+        self.assertIsNone(self.cache.get('AAPL', '1y', now=utc(2024, 7, 15, 15, 0)))
+        self.assertIsNone(self.cache.get('AAPL', '1y', now=utc(2024, 7, 15, 21, 0)))
+        self.assertIsNotNone(self.cache.get('AAPL', '1y', now=utc(2024, 7, 15, 21, 0), allow_stale=True))
+        
+        # 收盘前获取的数据在收盘后过期
+        self.cache.write('AAPL', self.data, '1y', fetched_at=utc(2024, 7, 12, 19, 50))
+        self.assertIsNone(self.cache.get('AAPL', '1y', now=utc(2024, 7, 12, 20, 30)))
+    
+    def test_period_coverage(self):
+        """测试缓存周期覆盖请求周期时截取返回，否则视为未命中"""
+        self.cache.write('AAPL', self.data, '2y', fetched_at=self.fetched_at)
+        now = utc(2024, 7, 13, 12, 0)
+        
+        data = self.cache.get('AAPL', '6mo', now=now)
+        self.assertGreaterEqual(data.index[0], pd.Timestamp(now) - pd.Timedelta(days=180))
+        self.assertEqual(data.index[-1], self.data.index[-1])
+        self.assertEqual(len(self.cache.get('AAPL', '2y', now=now)), len(self.data))
+        self.assertIsNone(self.cache.get('AAPL', '5y', now=now))
+        self.assertIsNone(self.cache.get('AAPL', 'max', now=now))
+    
+    def test_cached_history(self):
+        """测试启用缓存后只在缓存不可用时访问数据源"""
+        fetch = MagicMock(return_value=self.data)
+        
+        # 未启用缓存时每次都访问数据源
+        cached_history('AAPL', '1y', '1d', fetch)
+        cached_history('AAPL', '1y', '1d', fetch)
+        self.assertEqual(fetch.call_count, 2)
+        
+        cache_module.configure_cache(self.temp_dir)
+        fetch.reset_mock()
+        first = cached_history('AAPL', '1y', '1d', fetch)
+        second = cached_history('AAPL', '1y', '1d', fetch)
+        self.assertEqual(fetch.call_count, 1)
+        pd.testing.assert_frame_equal(first.drop(columns=['Code']), second, check_freq=False)
+        
+        # 数据源失败时回退到过期缓存
+        cache = cache_module.get_cache()
+        cache.write('AAPL', self.data, '1y', fetched_at=utc(2020, 1, 1))
+        fallback = cached_history('AAPL', '1y', '1d', MagicMock(return_value=pd.DataFrame()))
+        self.assertEqual(len(fallback), len(self.data))
+    
+    def test_delta_update(self):
+        """测试缓存过期时只获取缓存末尾之后的K线并追加"""
+        cache_module.configure_cache(self.temp_dir)
+        cache = cache_module.get_cache()
+        cache.write('AAPL', self.data.iloc[:-10], 'max', fetched_at=utc(2020, 1, 1))
+        
+        fetch = MagicMock(return_value=self.data)
+        fetch_since = MagicMock(side_effect=lambda start: self.data[self.data.index >= start])
+        data = cached_history('AAPL', 'max', '1d', fetch, fetch_since=fetch_since)
+        
+        fetch.assert_not_called()
+        self.assertEqual(fetch_since.call_args[0][0], self.data.index[-15])
+        pd.testing.assert_frame_equal(data, self.data.drop(columns=['Code']), check_freq=False)
+        
+        # 更新后的缓存已是最新，不再访问数据源
+        fetch_since.reset_mock()
+        cached_history('AAPL', 'max', '1d', fetch, fetch_since=fetch_since)
+        fetch_since.assert_not_called()
+    
+    def test_narrower_fetch_keeps_wider_cache(self):
+        """测试较短周期的完整数据合并到已缓存的较长周期数据中，复权变化时才覆盖"""
+        cache_module.configure_cache(self.temp_dir)
+        cache = cache_module.get_cache()
+        cache.write('AAPL', self.data, 'max', fetched_at=utc(2020, 1, 1))
+        
+        recent = self.data.iloc[-100:].copy()
+        recent.iloc[-1, recent.columns.get_loc('Volume')] = 1
+        cached_history('AAPL', '1y', '1d', MagicMock(return_value=recent))
+        data, meta = cache.read('AAPL')
+        self.assertEqual(meta['period'], 'max')
+        self.assertEqual(len(data), len(self.data))
+        self.assertEqual(data['Volume'].iloc[-1], 1)
+        self.assertIsNotNone(cache.get('AAPL', 'max'))
+        
+        adjusted = recent.copy()
+        adjusted['Close'] *= 0.98
+        self.assertTrue(cache.store('AAPL', adjusted, '1y'))
+        data, meta = cache.read('AAPL')
+        self.assertEqual(meta['period'], '1y')
+        self.assertEqual(len(data), len(adjusted))
+    
+    def test_delta_update_replaces_partial_bar(self):
+        """测试交易时段内缓存的未完成K线不被当作复权变化，由新数据直接替换"""
+        cache_module.configure_cache(self.temp_dir)
+        partial = self.data.iloc[:-10].copy()
+        partial.iloc[-1, partial.columns.get_loc('Close')] *= 1.05
+        cache_module.get_cache().write('AAPL', partial, 'max', fetched_at=utc(2020, 1, 1))
+        
+        fetch = MagicMock(return_value=self.data)
+        fetch_since = MagicMock(side_effect=lambda start: self.data[self.data.index >= start])
+        data = cached_history('AAPL', 'max', '1d', fetch, fetch_since=fetch_since)
+        
+        fetch.assert_not_called()
+        pd.testing.assert_frame_equal(data, self.data.drop(columns=['Code']), check_freq=False)
+    
+    def test_delta_update_detects_adjustment(self):
+        """测试重叠部分的复权价格变化时重新获取完整数据"""
+        cache_module.configure_cache(self.temp_dir)
+        cache_module.get_cache().write('AAPL', self.data.iloc[:-10], 'max', fetched_at=utc(2020, 1, 1))
+        
+        adjusted = self.data.copy()
+        adjusted[['Open', 'High', 'Low', 'Close']] *= 0.98
+        fetch = MagicMock(return_value=adjusted)
+        fetch_since = MagicMock(side_effect=lambda start: adjusted[adjusted.index >= start])
+        data = cached_history('AAPL', 'max', '1d', fetch, fetch_since=fetch_since)
+        
+        fetch_since.assert_called_once()
+        fetch.assert_called_once()
+        np.testing.assert_allclose(data['Close'], adjusted['Close'])
+    
+    def test_indicator_state(self):
+        """测试指标状态保存在缓存旁，增量更新只输入新增K线，整体写入后失效"""
+        cache_module.configure_cache(self.temp_dir)
+        cache = cache_module.get_cache()
+        cache.write('AAPL', self.data.iloc[:-10], 'max', fetched_at=utc(2020, 1, 1))
+        state = cache.indicator_state('AAPL')
+        self.assertEqual(state.last_timestamp, self.data.index[-11])
+        self.assertEqual(cache._read_state('AAPL', '1d').last_timestamp, self.data.index[-16])
+        
+        fetch_since = MagicMock(side_effect=lambda start: self.data[self.data.index >= start])
+        cached_history('AAPL', 'max', '1d', MagicMock(), fetch_since=fetch_since)
+        saved = cache._read_state('AAPL', '1d')
+        self.assertEqual(saved.last_timestamp, self.data.index[-6])
+        self.assertEqual(saved.update(self.data), 5)
+        
+        expected = IndicatorState.from_history(self.data).snapshot()
+        snapshot = cache.indicator_state('AAPL').snapshot()
+        self.assertAlmostEqual(snapshot['rsi'], expected['rsi'])
+        self.assertAlmostEqual(snapshot['macd']['hist'], expected['macd']['hist'])
+        self.assertAlmostEqual(snapshot['atr'], expected['atr'])
+        
+        cache.write('AAPL', self.data, 'max', fetched_at=self.fetched_at)
+        self.assertFalse(cache.state_path('AAPL', '1d').exists())
+        cache.clear('AAPL')
+        self.assertIsNone(cache.indicator_state('AAPL'))
+
+
+if __name__ == '__main__':
+    unittest.main()
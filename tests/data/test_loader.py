@@ -0,0 +1,157 @@
+"""
+数据加载器的单元测试
+"""
+
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+import pytz
+from trademind.data import cache as cache_module
+from trademind.data import scheduler
+from trademind.data.loader import batch_validate_stock_codes, get_us_stock_data_batch
+
+
+def make_history(dates, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, len(dates)))
+    return pd.DataFrame({
+        'Open': close + rng.normal(0, 0.5, len(dates)),
+        'High': close + 1,
+        'Low': close - 1,
+        'Close': close,
+        'Volume': rng.integers(1000, 9000, len(dates)),
+        'Dividends': 0.0,
+        'Stock Splits': 0.0
+    }, index=dates)
+
+
+class TestBatchDownload(unittest.TestCase):
+    """测试美股数据批量获取"""
+    
+    def setUp(self):
+        """设置测试数据"""
+        # 测试中不受真实请求速率限制
+        patcher = patch.dict(scheduler._limiters, {'yahoo': scheduler.ProviderLimiter('yahoo', 1000.0, 1000)})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        end = pd.Timestamp.now(tz='America/New_York').normalize()
+        dates = pd.date_range(end=end, periods=30, freq='B', name='Date')
+        self.histories = {
+            'AAA': make_history(dates, 1),
+            # 交易日与其他股票不同，对齐后会出现缺失行
+            'BBB': make_history(dates[5:], 2),
+            'CCC': make_history(dates, 3)
+        }
+    
+    def download(self, tickers, **kwargs):
+        frames = {symbol: self.histories[symbol] for symbol in tickers if symbol in self.histories}
+        return pd.concat(frames, axis=1, names=['Ticker', 'Price'], sort=True)
+    
+    @patch('trademind.data.loader._fetch_us_stock_data')
+    @patch('yfinance.download')
+    def test_split_and_chunk(self, mock_download, mock_fetch):
+        """测试按组请求并拆分为与单只股票一致的列布局"""
+        mock_download.side_effect = self.download
+        results = get_us_stock_data_batch(['AAA', 'BBB', 'CCC'], chunk_size=2)
+        
+        self.assertEqual(mock_download.call_count, 2)
+        self.assertEqual(mock_download.call_args_list[0][0][0], ['AAA', 'BBB'])
+        self.assertTrue(mock_download.call_args.kwargs['auto_adjust'])
+        mock_fetch.assert_not_called()
+        for symbol, expected in self.histories.items():
+            pd.testing.assert_frame_equal(results[symbol], expected, check_freq=False)
+    
+    @patch('trademind.data.loader._fetch_us_stock_data')
+    @patch('yfinance.download')
+    def test_download_paced_by_limiter(self, mock_download, mock_fetch):
+        """测试每次下载的股票数不超过限流器的令牌桶容量"""
+        mock_download.side_effect = self.download
+        with patch.dict(scheduler._limiters, {'yahoo': scheduler.ProviderLimiter('yahoo', 1000.0, 2)}):
+            results = get_us_stock_data_batch(['AAA', 'BBB', 'CCC'])
+        
+        self.assertEqual([call[0][0] for call in mock_download.call_args_list], [['AAA', 'BBB'], ['CCC']])
+        mock_fetch.assert_not_called()
+        self.assertEqual(list(results), ['AAA', 'BBB', 'CCC'])
+    
+    @patch('trademind.data.loader._fetch_us_stock_data')
+    @patch('yfinance.download')
+    def test_fallback_per_symbol(self, mock_download, mock_fetch):
+        """测试批量结果缺失或请求失败时逐个获取"""
+        mock_download.side_effect = lambda tickers, **kwargs: self.download(
+            [symbol for symbol in tickers if symbol != 'BBB'])
+        mock_fetch.side_effect = lambda symbol, *args: self.histories[symbol]
+        results = get_us_stock_data_batch(['AAA', 'BBB'])
+        self.assertEqual([call[0][0] for call in mock_fetch.call_args_list], ['BBB'])
+        pd.testing.assert_frame_equal(results['BBB'], self.histories['BBB'])
+        
+        mock_fetch.reset_mock()
+        mock_download.side_effect = Exception('connection reset')
+        results = get_us_stock_data_batch(['AAA', 'CCC'])
+        self.assertEqual(mock_fetch.call_count, 2)
+        self.assertEqual(list(results), ['AAA', 'CCC'])
+    
+    @patch('trademind.data.loader._fetch_us_stock_data')
+    @patch('yfinance.download')
+    def test_uses_cache(self, mock_download, mock_fetch):
+        """测试新鲜缓存不再请求，过期缓存合并为一次增量请求"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            cache = cache_module.configure_cache(temp_dir)
+            cache.write('AAA', self.histories['AAA'], '1y')
+            cache.write('BBB', self.histories['BBB'].iloc[:-3], '1y',
+                        fetched_at=datetime(2020, 1, 1, tzinfo=pytz.utc))
+            mock_download.side_effect = self.download
+            
+            results = get_us_stock_data_batch(['AAA', 'BBB'])
+            mock_download.assert_called_once()
+            self.assertEqual(mock_download.call_args[0][0], ['BBB'])
+            self.assertIn('start', mock_download.call_args[1])
+            mock_fetch.assert_not_called()
+            self.assertEqual(len(results['AAA']), 30)
+            self.assertEqual(len(results['BBB']), 25)
+        finally:
+            cache_module.disable_cache()
+            shutil.rmtree(temp_dir)
+
+
+
+class TestBatchValidate(unittest.TestCase):
+    """测试批量验证股票代码"""
+    
+    def setUp(self):
+        """设置测试数据"""
+        patcher = patch.dict(scheduler._limiters, {'yahoo': scheduler.ProviderLimiter('yahoo', 1000.0, 1000)})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    @patch('yfinance.Ticker')
+    def test_concurrent_validation(self, mock_ticker):
+        """测试并发验证的结果按输入顺序返回、单个代码出错不影响其他代码，并逐个报告进度"""
+        def ticker(symbol):
+            if symbol == 'BOOM':
+                raise ConnectionError('reset')
+            info = {} if symbol == 'NOPE' else {
+                'symbol': symbol, 'quoteType': 'EQUITY', 'shortName': f'{symbol} Inc.',
+                'currency': 'USD', 'regularMarketPrice': 10.0
+            }
+            return type('Ticker', (), {'info': info})()
+        
+        mock_ticker.side_effect = ticker
+        codes = ['AAPL', 'NOPE', '', 'BOOM', 'MSFT']
+        progress = []
+        results = batch_validate_stock_codes(codes, max_workers=4,
+                                             progress_callback=lambda *args: progress.append(args))
+        
+        self.assertEqual([r['valid'] for r in results], [True, False, False, False, True])
+        self.assertEqual([r['code'] for r in results], ['AAPL', 'NOPE', '', 'BOOM', 'MSFT'])
+        self.assertEqual(results[0]['english_name'], 'AAPL Inc.')
+        self.assertEqual(sorted(p[0] for p in progress), [1, 2, 3, 4, 5])
+        self.assertEqual(sorted(p[2] for p in progress), sorted(codes))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+股票元数据缓存模块的单元测试
+"""
+
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+import pytz
+from trademind.data import metadata as metadata_module
+from trademind.data.metadata import MetadataStore, cached_info, configure_metadata_store
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=pytz.utc)
+
+
+APPLE_INFO = {
+    'symbol': 'AAPL',
+    'quoteType': 'EQUITY',
+    'shortName': 'Apple Inc.',
+    'longName': 'Apple Inc.',
+    'currency': 'USD',
+    'regularMarketPrice': 190.5,
+    'longBusinessSummary': '...',
+    'companyOfficers': []
+}
+
+
+class TestMetadataStore(unittest.TestCase):
+    """测试股票元数据缓存"""
+    
+    def setUp(self):
+        """设置临时缓存文件"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = Path(self.temp_dir) / 'metadata.json'
+        self.now = utc(2024, 7, 12, 12, 0)
+    
+    def tearDown(self):
+        """清理测试环境"""
+        shutil.rmtree(self.temp_dir)
+        metadata_module.disable_metadata_store()
+    
+    def test_put_and_get(self):
+        """测试只缓存需要的字段，并在新建的对象中读回"""
+        store = MetadataStore(self.path)
+        slim = store.put('AAPL', APPLE_INFO, now=self.now)
+        
+        self.assertNotIn('longBusinessSummary', slim)
+        self.assertEqual(slim['regularMarketPrice'], 190.5)
+        self.assertEqual(MetadataStore(self.path).get('AAPL', now=self.now + timedelta(hours=1)), slim)
+        self.assertIsNone(store.get('MSFT', now=self.now))
+    
+    def test_ttl(self):
+        """测试过期的元数据不再返回"""
+        store = MetadataStore(self.path, ttl=timedelta(hours=6))
+        store.put('AAPL', APPLE_INFO, now=self.now)
+        
+        self.assertIsNotNone(store.get('AAPL', now=self.now + timedelta(hours=5)))
+        self.assertIsNone(store.get('AAPL', now=self.now + timedelta(hours=7)))
+    
+    def test_corrupt_file(self):
+        """测试缓存文件损坏时重新建立"""
+        self.path.write_text('{not json', encoding='utf-8')
+        store = MetadataStore(self.path)
+        self.assertIsNone(store.get('AAPL', now=self.now))
+        store.put('AAPL', APPLE_INFO, now=self.now)
+        self.assertIsNotNone(MetadataStore(self.path).get('AAPL', now=self.now))
+    
+    def test_cached_info(self):
+        """测试启用缓存后只在没有缓存时请求，未启用时每次都请求，请求失败不写入缓存"""
+        fetch = MagicMock(return_value=APPLE_INFO)
+        cached_info('AAPL', fetch)
+        cached_info('AAPL', fetch)
+        self.assertEqual(fetch.call_count, 2)
+        
+        configure_metadata_store(self.path)
+        cached_info('AAPL', fetch)
+        info = cached_info('AAPL', fetch)
+        self.assertEqual(fetch.call_count, 3)
+        self.assertEqual(info['shortName'], 'Apple Inc.')
+        
+        with self.assertRaises(ConnectionError):
+            cached_info('MSFT', MagicMock(side_effect=ConnectionError('reset')))
+        self.assertIsNone(metadata_module.get_metadata_store().get('MSFT'))
+        
+        # 缺少代码或最新价格的不完整信息不写入缓存
+        partial = MagicMock(return_value={'shortName': 'Microsoft', 'regularMarketPrice': None})
+        cached_info('MSFT', partial)
+        cached_info('MSFT', partial)
+        self.assertEqual(partial.call_count, 2)
+        self.assertIsNone(metadata_module.get_metadata_store().get('MSFT'))
+    
+    @patch('yfinance.Ticker')
+    def test_validate_stock_code_uses_store(self, mock_ticker):
+        """测试验证股票代码时使用元数据缓存"""
+        from trademind.data.loader import validate_stock_code
+        
+        mock_ticker.return_value.info = APPLE_INFO
+        configure_metadata_store(self.path)
+        first = validate_stock_code('AAPL', translate=False)
+        second = validate_stock_code('aapl', translate=False)
+        
+        self.assertTrue(first['valid'])
+        self.assertEqual(first, second)
+        self.assertEqual(mock_ticker.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
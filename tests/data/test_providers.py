@@ -0,0 +1,162 @@
+"""
+数据源模块的单元测试
+"""
+
+import shutil
+import tempfile
+import unittest
+from datetime import timedelta
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from trademind.data.providers import (
+    DataProvider,
+    RecordingProvider,
+    ReplayProvider,
+    get_data_provider,
+    set_data_provider
+)
+
+
+def make_history(days, end='2024-06-28'):
+    """生成截止到指定日期的日线数据"""
+    dates = pd.date_range(end=pd.Timestamp(end, tz='UTC'), periods=days, freq='D')
+    close = np.linspace(100, 120, len(dates))
+    return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                         'Volume': np.full(len(dates), 1000)}, index=dates)
+
+
+APPLE_INFO = {'symbol': 'AAPL', 'shortName': 'Apple Inc.', 'regularMarketPrice': 190.5}
+
+
+class StaticProvider(DataProvider):
+    """返回固定数据的数据源"""
+    
+    name = 'static'
+    
+    def __init__(self, data, info):
+        self.data = data
+        self.info = info
+        self.calls = 0
+    
+    def get_history(self, symbol, period='1y', interval='1d'):
+        self.calls += 1
+        return self.data
+    
+    def get_info(self, symbol):
+        return self.info
+
+
+class TestReplayProvider(unittest.TestCase):
+    """测试数据录制和回放"""
+    
+    def setUp(self):
+        """设置临时录制目录"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data = make_history(3 * 365)
+    
+    def tearDown(self):
+        """清理测试环境"""
+        shutil.rmtree(self.temp_dir)
+        set_data_provider(None)
+    
+    def test_record_and_replay(self):
+        """测试录制的历史数据和股票信息可以原样回放"""
+        recorder = RecordingProvider(self.temp_dir, StaticProvider(self.data, APPLE_INFO))
+        recorder.get_history('AAPL', '3y')
+        recorder.get_info('AAPL')
+        
+        replay = ReplayProvider(self.temp_dir)
+        pd.testing.assert_frame_equal(replay.get_history('AAPL', '3y'), self.data, check_freq=False)
+        self.assertEqual(replay.get_info('AAPL'), APPLE_INFO)
+    
+    def test_period_relative_to_last_bar(self):
+        """测试按周期截取时以最后一根K线为基准"""
+        replay = ReplayProvider(self.temp_dir)
+        replay.record_history('AAPL', self.data, '3y')
+        one_year = replay.get_history('AAPL', '1y')
+        
+        self.assertEqual(one_year.index[-1], self.data.index[-1])
+        self.assertGreaterEqual(one_year.index[0], self.data.index[-1] - timedelta(days=366))
+        self.assertLess(len(one_year), len(self.data))
+    
+    def test_missing_symbol(self):
+        """测试没有录制的股票返回空数据"""
+        replay = ReplayProvider(self.temp_dir)
+        self.assertTrue(replay.get_history('MSFT').empty)
+        self.assertEqual(replay.get_info('MSFT'), {})
+    
+    def test_recording_keeps_longer_history(self):
+        """测试较短周期的结果不覆盖已录制的较长数据"""
+        source = StaticProvider(self.data, APPLE_INFO)
+        recorder = RecordingProvider(self.temp_dir, source)
+        recorder.get_history('AAPL', '3y')
+        source.data = self.data.tail(30)
+        recorder.get_history('AAPL', '1mo')
+        
+        self.assertEqual(len(ReplayProvider(self.temp_dir).get_history('AAPL', 'max')), len(self.data))
+    
+    @patch('yfinance.Ticker')
+    def test_loader_uses_provider(self, mock_ticker):
+        """测试设置了数据源后loader不再联网"""
+        from trademind.data.loader import get_stock_data, get_stock_data_many, get_stock_info
+        
+        replay = ReplayProvider(self.temp_dir)
+        replay.record_history('AAPL', self.data, '3y')
+        replay.record_info('AAPL', APPLE_INFO)
+        set_data_provider(replay)
+        
+        self.assertIs(get_data_provider(), replay)
+        self.assertFalse(get_stock_data('AAPL', period='1y').empty)
+        self.assertEqual(get_stock_info('AAPL'), APPLE_INFO)
+        self.assertEqual(set(get_stock_data_many(['AAPL', '600519'], period='1y')), {'AAPL', '600519'})
+        mock_ticker.assert_not_called()
+    
+    @patch('yfinance.Ticker')
+    def test_analyzer_uses_provider(self, mock_ticker):
+        """测试分析器从数据源读取历史数据和股票信息"""
+        from trademind.core.analyzer import StockAnalyzer
+        
+        provider = StaticProvider(self.data, APPLE_INFO)
+        set_data_provider(provider)
+        analyzer = StockAnalyzer()
+        
+        self.assertEqual(len(analyzer.get_stock_data('AAPL')), len(self.data))
+        self.assertEqual(analyzer.get_stock_info('AAPL'), APPLE_INFO)
+        self.assertEqual(provider.calls, 1)
+        mock_ticker.assert_not_called()
+    
+    @patch('akshare.stock_zh_a_hist')
+    def test_live_cn_history_period(self, mock_hist):
+        """测试联网数据源按请求的周期获取A股数据，3年不会退化为1年"""
+        from trademind.data.providers import LiveProvider
+        
+        mock_hist.return_value = pd.DataFrame({'日期': ['2024-06-28'], '开盘': [1.0], '收盘': [1.0],
+                                               '最高': [1.0], '最低': [1.0], '成交量': [100]})
+        for period, days in [('3y', 365 * 3), ('10y', 365 * 10)]:
+            self.assertFalse(LiveProvider().get_history('600519', period).empty)
+            kwargs = mock_hist.call_args.kwargs
+            span = pd.Timestamp(kwargs['end_date']) - pd.Timestamp(kwargs['start_date'])
+            self.assertEqual(span.days, days)
+        LiveProvider().get_history('600519', 'max')
+        self.assertEqual(mock_hist.call_args.kwargs['start_date'], '19900101')
+    
+    def test_prefetch_is_per_run(self):
+        """测试批量预取的数据只在本次运行中使用，下一次运行重新获取"""
+        from trademind.core.analyzer import StockAnalyzer
+        
+        provider = StaticProvider(self.data, APPLE_INFO)
+        set_data_provider(provider)
+        analyzer = StockAnalyzer()
+        
+        with patch.object(analyzer, 'analyze_history', side_effect=lambda symbol, name, hist: {'symbol': symbol}):
+            analyzer.analyze_stocks(['AAPL'], prefetch=True)
+            self.assertEqual(provider.calls, 1)
+            analyzer.analyze_stocks(['AAPL'], prefetch=True)
+            self.assertEqual(provider.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
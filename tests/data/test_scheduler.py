@@ -0,0 +1,155 @@
+"""
+数据请求调度模块的单元测试
+"""
+
+import threading
+import time
+import unittest
+from trademind.data.scheduler import ProviderLimiter, TokenBucket, fetch_many, iter_prefetched, map_concurrent, rate_limited
+from trademind.data import scheduler
+
+
+class FakeClock:
+    """可控的时钟，sleep只推进时间"""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class RateLimitError(Exception):
+    pass
+
+
+RateLimitError.__name__ = 'YFRateLimitError'
+
+
+class TestTokenBucket(unittest.TestCase):
+    """测试令牌桶和自适应退避"""
+    
+    def setUp(self):
+        """设置测试时钟"""
+        self.clock = FakeClock()
+    
+    def test_rate_and_burst(self):
+        """测试突发容量用完后按速率发放令牌"""
+        bucket = TokenBucket(rate=2.0, capacity=3, clock=self.clock, sleep=self.clock.sleep)
+        waits = [bucket.acquire() for _ in range(7)]
+        self.assertEqual(waits[:3], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(self.clock.now, 2.0)
+        
+        # 超过容量的请求等桶满后扣除，欠下的令牌由后续请求补足
+        bucket.acquire(6)
+        self.assertAlmostEqual(self.clock.now, 3.5)
+        bucket.acquire()
+        self.assertAlmostEqual(self.clock.now, 5.5)
+    
+    def test_backoff_and_recovery(self):
+        """测试限流时暂停并降速，成功后逐步恢复"""
+        limiter = ProviderLimiter('test', rate=2.0, capacity=2, clock=self.clock, sleep=self.clock.sleep)
+        self.assertEqual(limiter.on_rate_limit(), scheduler.INITIAL_BACKOFF)
+        self.assertEqual(limiter.on_rate_limit(), scheduler.INITIAL_BACKOFF * 2)
+        self.assertAlmostEqual(limiter.bucket.rate, 0.5)
+        
+        limiter.acquire()
+        self.assertGreaterEqual(self.clock.now, scheduler.INITIAL_BACKOFF * 2)
+        
+        for _ in range(100):
+            limiter.on_success()
+        self.assertEqual(limiter.backoff, 0.0)
+        self.assertEqual(limiter.bucket.rate, 2.0)
+    
+    def test_rate_limited_retries(self):
+        """测试限流错误退避后重试，其他错误直接抛出"""
+        limiter = ProviderLimiter('test', rate=100.0, capacity=5, clock=self.clock, sleep=self.clock.sleep)
+        scheduler._limiters['test'] = limiter
+        try:
+            calls = []
+            
+            def flaky():
+                calls.append(self.clock.now)
+                if len(calls) < 3:
+                    raise RateLimitError('Too Many Requests')
+                return 'ok'
+            
+            self.assertEqual(rate_limited('test', flaky), 'ok')
+            self.assertEqual(len(calls), 3)
+            self.assertGreaterEqual(calls[2] - calls[1], scheduler.INITIAL_BACKOFF * 2)
+            
+            with self.assertRaises(ValueError):
+                rate_limited('test', lambda: (_ for _ in ()).throw(ValueError('bad')))
+        finally:
+            del scheduler._limiters['test']
+
+
+class TestFetchMany(unittest.TestCase):
+    """测试并发获取"""
+    
+    def test_order_and_failures(self):
+        """测试结果按输入顺序返回，单个失败不影响其他请求"""
+        threads = set()
+        
+        def fetch(key):
+            threads.add(threading.get_ident())
+            if key == 'BAD':
+                raise ValueError('failed')
+            return key.lower()
+        
+        results = fetch_many(['A', 'B', 'BAD', 'C', 'A'], fetch, max_workers=3)
+        self.assertEqual(list(results), ['A', 'B', 'BAD', 'C'])
+        self.assertEqual(results['B'], 'b')
+        self.assertIsNone(results['BAD'])
+    
+    def test_iter_prefetched(self):
+        """测试提前获取时按输入顺序产出，并且同时进行的请求数受lookahead限制"""
+        active = []
+        peak = []
+        lock = threading.Lock()
+        
+        def fetch(key):
+            with lock:
+                active.append(key)
+                peak.append(len(active))
+            time.sleep(0.01)
+            with lock:
+                active.remove(key)
+            if key == 'BAD':
+                raise ValueError('failed')
+            return key.lower()
+        
+        keys = ['A', 'B', 'BAD', 'C', 'D', 'E']
+        for lookahead in [0, 2]:
+            peak.clear()
+            results = list(iter_prefetched(keys, fetch, lookahead))
+            self.assertEqual(results, [('A', 'a'), ('B', 'b'), ('BAD', None), ('C', 'c'), ('D', 'd'), ('E', 'e')])
+            self.assertLessEqual(max(peak), max(lookahead, 1))
+    
+    def test_map_concurrent(self):
+        """测试并发处理时结果按输入顺序返回，重复项不合并，进度回调依次报告已完成数"""
+        delays = {'A': 0.03, 'B': 0.0, 'C': 0.01}
+        progress = []
+        
+        def fn(key):
+            time.sleep(delays[key])
+            return key.lower()
+        
+        def on_result(done, total, key, result):
+            progress.append((done, total, key, result))
+            raise RuntimeError('回调出错不影响结果')
+        
+        keys = ['A', 'B', 'A', 'C']
+        for max_workers in [1, 4]:
+            progress.clear()
+            self.assertEqual(map_concurrent(keys, fn, max_workers, on_result), ['a', 'b', 'a', 'c'])
+            self.assertEqual([p[0] for p in progress], [1, 2, 3, 4])
+            self.assertTrue(all(p[1] == 4 and p[3] == p[2].lower() for p in progress))
+        self.assertEqual(map_concurrent([], fn), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,208 @@
+"""
+请求合并模块的单元测试
+"""
+
+import threading
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from trademind.data.scheduler import fetch_many
+from trademind.data.session import FetchSession, fetch_session, get_session, iter_in_session, session_info
+
+
+def make_history(days):
+    """生成截止到今天的日线数据"""
+    end = pd.Timestamp(datetime.now(pytz.utc).date(), tz='UTC')
+    dates = pd.date_range(end=end, periods=days, freq='D')
+    close = np.linspace(100, 120, len(dates))
+    return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                         'Volume': np.full(len(dates), 1000)}, index=dates)
+
+
+class TestFetchSession(unittest.TestCase):
+    """测试请求合并层"""
+    
+    def setUp(self):
+        """设置测试数据"""
+        self.session = FetchSession()
+        self.data = make_history(3 * 365)
+    
+    def test_narrower_period_is_sliced(self):
+        """测试较短周期从已获取的较长周期数据中截取"""
+        fetch = MagicMock(return_value=self.data)
+        full = self.session.history('AAPL', '3y', '1d', fetch)
+        one_year = self.session.history('AAPL', '1y', '1d', MagicMock(side_effect=AssertionError))
+        
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(len(full), len(self.data))
+        self.assertLess(len(one_year), len(full))
+        self.assertGreaterEqual(one_year.index[0], self.data.index[-1] - timedelta(days=366))
+        pd.testing.assert_frame_equal(one_year, self.data.loc[one_year.index[0]:])
+    
+    def test_wider_period_is_fetched(self):
+        """测试较长周期和不同数据间隔需要重新获取，且之后以较长周期为准"""
+        self.session.history('AAPL', '1y', '1d', MagicMock(return_value=self.data.tail(365)))
+        wider = MagicMock(return_value=self.data)
+        self.session.history('AAPL', '3y', '1d', wider)
+        weekly = MagicMock(return_value=self.data)
+        self.session.history('AAPL', '1y', '1wk', weekly)
+        self.session.history('AAPL', '2y', '1d', MagicMock(side_effect=AssertionError))
+        
+        self.assertEqual(wider.call_count, 1)
+        self.assertEqual(weekly.call_count, 1)
+    
+    def test_result_is_a_copy(self):
+        """测试修改返回的数据不影响已保存的数据"""
+        self.session.history('AAPL', '3y', '1d', MagicMock(return_value=self.data.copy()))
+        first = self.session.history('AAPL', '3y', '1d', MagicMock())
+        first['Close'] = 0.0
+        second = self.session.history('AAPL', '3y', '1d', MagicMock())
+        
+        pd.testing.assert_series_equal(second['Close'], self.data['Close'])
+    
+    def test_concurrent_requests_are_deduplicated(self):
+        """测试并发的相同请求和被覆盖的较短周期请求只发起一次获取"""
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+        
+        def fetch():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return self.data
+        
+        results = {}
+        
+        def request(name, period):
+            results[name] = self.session.history('AAPL', period, '1d', fetch)
+        
+        owner = threading.Thread(target=request, args=('owner', '3y'))
+        owner.start()
+        started.wait(5)
+        waiters = [threading.Thread(target=request, args=(f'waiter{i}', period))
+                   for i, period in enumerate(['3y', '1y', '6mo'])]
+        for thread in waiters:
+            thread.start()
+        release.set()
+        for thread in [owner] + waiters:
+            thread.join(5)
+        
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results['waiter0']), len(self.data))
+        self.assertLess(len(results['waiter2']), len(results['waiter1']))
+    
+    def test_failure_is_not_remembered(self):
+        """测试获取失败时异常传给调用方，之后的调用重新获取"""
+        with self.assertRaises(ConnectionError):
+            self.session.history('AAPL', '1y', '1d', MagicMock(side_effect=ConnectionError('reset')))
+        
+        retry = MagicMock(return_value=self.data)
+        self.session.history('AAPL', '1y', '1d', retry)
+        self.assertEqual(retry.call_count, 1)
+    
+    def test_store_history(self):
+        """测试记录外部获取的数据"""
+        self.session.store_history('AAPL', '3y', '1d', self.data)
+        data = self.session.history('AAPL', '1y', '1d', MagicMock(side_effect=AssertionError))
+        self.assertFalse(data.empty)
+    
+    def test_info_fetched_once(self):
+        """测试股票信息只获取一次"""
+        fetch = MagicMock(return_value={'shortName': 'Apple'})
+        self.assertEqual(self.session.info('AAPL', fetch), {'shortName': 'Apple'})
+        self.assertEqual(self.session.info('AAPL', fetch), {'shortName': 'Apple'})
+        self.assertEqual(fetch.call_count, 1)
+    
+    def test_release(self):
+        """测试释放后重新获取历史数据"""
+        fetch = MagicMock(return_value=self.data)
+        self.session.history('AAPL', '3y', '1d', fetch)
+        self.session.release('AAPL')
+        self.session.history('AAPL', '3y', '1d', fetch)
+        self.assertEqual(fetch.call_count, 2)
+
+
+class TestActiveSession(unittest.TestCase):
+    """测试合并层的作用范围"""
+    
+    def test_scope(self):
+        """测试范围外直接获取，范围内共享，嵌套时沿用外层合并层"""
+        fetch = MagicMock(return_value={'shortName': 'Apple'})
+        session_info('AAPL', fetch)
+        session_info('AAPL', fetch)
+        self.assertEqual(fetch.call_count, 2)
+        
+        with fetch_session() as outer:
+            with fetch_session() as inner:
+                self.assertIs(inner, outer)
+            self.assertIs(get_session(), outer)
+            session_info('AAPL', fetch)
+            session_info('AAPL', fetch)
+        self.assertEqual(fetch.call_count, 3)
+        self.assertIsNone(get_session())
+    
+    def test_concurrent_runs_are_isolated(self):
+        """测试不同线程中同时进行的运行各自使用独立的合并层，先结束的运行不影响其他运行"""
+        entered = threading.Barrier(2)
+        first_done = threading.Event()
+        sessions = {}
+        
+        def run(name):
+            with fetch_session() as session:
+                entered.wait(5)
+                if name == 'b':
+                    first_done.wait(5)
+                sessions[name] = (session, get_session())
+            if name == 'a':
+                first_done.set()
+        
+        threads = [threading.Thread(target=run, args=(name,)) for name in ('a', 'b')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        
+        self.assertIsNot(sessions['a'][0], sessions['b'][0])
+        self.assertIs(sessions['b'][1], sessions['b'][0])
+    
+    def test_worker_threads_use_caller_session(self):
+        """测试线程池中的获取函数使用调用方的合并层"""
+        with fetch_session() as session:
+            seen = fetch_many(['AAPL', 'MSFT'], lambda symbol: get_session(), max_workers=2)
+        self.assertEqual(list(seen.values()), [session, session])
+    
+    def test_iter_in_session(self):
+        """测试迭代过程中的合并层不泄漏到调用方"""
+        def produce():
+            yield get_session()
+            yield get_session()
+        
+        items = iter_in_session(produce)
+        first = next(items)
+        self.assertIsNotNone(first)
+        self.assertIsNone(get_session())
+        self.assertIs(next(items), first)
+        self.assertEqual(list(items), [])
+    
+    @patch('trademind.data.loader.get_us_stock_data')
+    def test_loader_uses_session(self, mock_get_us_stock_data):
+        """测试loader.get_stock_data在合并层中只获取一次"""
+        from trademind.data.loader import get_stock_data
+        
+        mock_get_us_stock_data.return_value = make_history(365)
+        with fetch_session():
+            get_stock_data('AAPL', period='1y')
+            data = get_stock_data('AAPL', period='6mo')
+        
+        self.assertEqual(mock_get_us_stock_data.call_count, 1)
+        self.assertFalse(data.empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+报告目录索引模块的单元测试
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from trademind.reports.catalog import CATALOG_FILENAME, ReportCatalog, get_catalog
+
+
+class TestReportCatalog(unittest.TestCase):
+    """测试报告目录索引"""
+    
+    def setUp(self):
+        """创建临时报告目录"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.now = datetime.now()
+    
+    def tearDown(self):
+        """清理测试环境"""
+        shutil.rmtree(self.temp_dir)
+    
+    def write_report(self, name, days_old=0):
+        """写入报告文件，并把修改时间设为days_old天前"""
+        path = self.temp_dir / name
+        path.write_text('<html></html>', encoding='utf-8')
+        timestamp = (self.now - timedelta(days=days_old)).timestamp()
+        os.utime(path, (timestamp, timestamp))
+        return path
+    
+    def test_imports_existing_reports(self):
+        """测试首次建立索引时导入目录中已有的报告，并按时间从新到旧分页"""
+        for i in range(5):
+            self.write_report(f'stock_analysis_{i}.html', days_old=i)
+        self.write_report('notes.txt')
+        
+        catalog = ReportCatalog(self.temp_dir)
+        entries, total = catalog.list(offset=1, limit=2)
+        
+        self.assertEqual(total, 5)
+        self.assertEqual([e['name'] for e in entries], ['stock_analysis_1.html', 'stock_analysis_2.html'])
+        self.assertTrue((self.temp_dir / CATALOG_FILENAME).exists())
+    
+    def test_repairs_file_without_table(self):
+        """测试索引文件存在但没有建表时补建表并导入已有报告"""
+        import sqlite3
+        
+        self.write_report('stock_analysis_1.html')
+        sqlite3.connect(str(self.temp_dir / CATALOG_FILENAME)).close()
+        
+        entries, total = ReportCatalog(self.temp_dir).list()
+        self.assertEqual(total, 1)
+        self.assertEqual(entries[0]['name'], 'stock_analysis_1.html')
+    
+    def test_add_and_find(self):
+        """测试登记报告后可按文件名查找，且忽略空格差异"""
+        catalog = ReportCatalog(self.temp_dir)
+        catalog.list()
+        path = self.write_report('stock_analysis_20240101_120000.html')
+        catalog.add(path, title='美股分析', stock_count=3)
+        
+        entry = catalog.find('stock_analysis_20240101_120000.html')
+        self.assertEqual(entry['title'], '美股分析')
+        self.assertEqual(entry['stock_count'], 3)
+        self.assertEqual(catalog.find('stock_analysis_2024 0101_120000.html')['name'], path.name)
+        self.assertIsNone(catalog.find('missing.html'))
+    
+    def test_older_than_and_remove(self):
+        """测试按时间查询待清理的报告并删除记录"""
+        self.write_report('new.html')
+        self.write_report('old.html', days_old=40)
+        catalog = ReportCatalog(self.temp_dir)
+        
+        old = catalog.older_than(self.now - timedelta(days=30))
+        self.assertEqual([e['name'] for e in old], ['old.html'])
+        self.assertEqual(len(catalog.older_than(None)), 2)
+        
+        catalog.remove('old.html')
+        self.assertEqual(catalog.list()[1], 1)
+    
+    def test_sync(self):
+        """测试与目录对齐时登记新文件并移除已删除文件的记录"""
+        self.write_report('a.html')
+        catalog = ReportCatalog(self.temp_dir)
+        catalog.list()
+        self.write_report('b.html')
+        os.remove(self.temp_dir / 'a.html')
+        
+        self.assertEqual(catalog.sync(), (1, 1))
+        self.assertEqual([e['name'] for e in catalog.list()[0]], ['b.html'])
+    
+    def test_generate_html_report_registers(self):
+        """测试生成报告时登记到索引"""
+        from trademind.reports.generator import generate_html_report
+        
+        report_path = generate_html_report([], '测试报告', output_dir=self.temp_dir)
+        entry = get_catalog(self.temp_dir).find(os.path.basename(report_path))
+        
+        self.assertEqual(entry['title'], '测试报告')
+        self.assertEqual(entry['stock_count'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
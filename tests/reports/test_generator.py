@@ -11,6 +11,7 @@ import numpy as np
 from datetime import datetime, timedelta
 from pathlib import Path
 from trademind.reports.generator import (
+    HTMLReportWriter,
     generate_html_report,
     generate_performance_charts
 )
@@ -236,6 +237,31 @@ class TestReportGenerator(unittest.TestCase):
             # 确保没有股票卡片内容（而不是检查CSS类名）
             self.assertNotIn("<div class=\"stock-card\">", content)
     
+    def test_stream_report(self):
+        """测试流式写入报告时逐段产出的内容与文件一致"""
+        writer = HTMLReportWriter("流式报告测试", self.temp_dir)
+        chunks = list(writer.stream(iter(self.test_results)))
+        
+        with open(writer.path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        self.assertEqual(''.join(chunks), content)
+        self.assertEqual(len(chunks), len(self.test_results) + 2)
+        self.assertEqual(writer.stock_count, len(self.test_results))
+        self.assertIn("流式报告测试", chunks[0])
+        self.assertIn("AAPL", chunks[1])
+        self.assertTrue(content.rstrip().endswith('</html>'))
+        
+        # 同一秒内创建的报告使用不同的文件
+        other = HTMLReportWriter("流式报告测试", self.temp_dir)
+        self.assertNotEqual(other.path, writer.path)
+        self.assertTrue(other.path.exists())
+        
+        # 删除报告后文件和索引记录都不存在
+        writer.discard()
+        self.assertFalse(writer.path.exists())
+        from trademind.reports.catalog import get_catalog
+        self.assertIsNone(get_catalog(self.temp_dir).find(writer.path.name))
+    
     def test_generate_performance_charts_with_empty_trades(self):
         """测试生成空交易记录的性能图表"""
         # 生成图表
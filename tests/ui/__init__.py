@@ -0,0 +1,3 @@
+"""
+用户界面模块的测试包
+"""
@@ -0,0 +1,216 @@
+"""
+后台任务模块的单元测试
+"""
+
+import os
+import threading
+import unittest
+from concurrent.futures import wait
+
+from trademind.ui.jobs import CANCELLED, DONE, FAILED, QUEUED, RUNNING, JobManager
+
+
+class TestJobManager(unittest.TestCase):
+    """测试后台任务队列"""
+    
+    def setUp(self):
+        """创建只有一个工作线程的任务管理器"""
+        self.manager = JobManager(max_workers=1, history_size=2)
+        self.release = threading.Event()
+    
+    def tearDown(self):
+        """关闭任务管理器"""
+        self.release.set()
+        self.manager.shutdown()
+    
+    def blocking(self, job):
+        """更新进度后等待release"""
+        job.update(percent=0.5)
+        self.release.wait(5)
+        return 'report.html'
+    
+    def wait(self, job):
+        """等待任务结束"""
+        wait([job._future], timeout=5)
+    
+    def test_jobs_are_queued_and_isolated(self):
+        """测试超出线程数的任务排队，且每个任务有独立的进度"""
+        first = self.manager.submit(self.blocking, kind='analysis', progress={'percent': 0})
+        second = self.manager.submit(lambda job: job.update(percent=1.0), kind='analysis', progress={'percent': 0})
+        
+        self.assertEqual(second.state, QUEUED)
+        self.release.set()
+        self.wait(first)
+        self.wait(second)
+        
+        self.assertEqual(first.state, DONE)
+        self.assertEqual(first.result, 'report.html')
+        self.assertEqual(first.snapshot()['progress'], {'percent': 0.5})
+        self.assertEqual(second.snapshot()['progress'], {'percent': 1.0})
+        self.assertIs(self.manager.latest('analysis'), second)
+        self.assertIs(self.manager.get(first.id), first)
+    
+    def test_cancel(self):
+        """测试取消排队中的任务不再执行，运行中的任务检查取消请求后结束"""
+        started = threading.Event()
+        
+        def cooperative(job):
+            started.set()
+            job.cancel_event.wait(5)
+        
+        running = self.manager.submit(cooperative)
+        queued = self.manager.submit(self.blocking)
+        started.wait(5)
+        
+        self.assertEqual(running.state, RUNNING)
+        self.assertTrue(self.manager.cancel(queued.id))
+        self.assertEqual(queued.state, CANCELLED)
+        self.assertTrue(self.manager.cancel(running.id))
+        self.wait(running)
+        self.assertEqual(running.state, CANCELLED)
+        self.assertFalse(self.manager.cancel(running.id))
+        self.assertFalse(self.manager.cancel('missing'))
+    
+    def test_failure(self):
+        """测试任务异常时状态为失败并记录错误"""
+        job = self.manager.submit(lambda job: 1 / 0)
+        self.wait(job)
+        self.assertEqual(job.state, FAILED)
+        self.assertIn('division', job.snapshot()['error'])
+    
+    def test_events(self):
+        """测试等待事件时按编号返回新事件，任务结束后不再等待"""
+        def publishing(job):
+            job.publish('stage', symbol='AAPL', stage='fetch')
+            self.release.wait(5)
+            job.publish('symbol', symbol='AAPL', status='done')
+        
+        job = self.manager.submit(publishing)
+        events, finished = job.wait_events(0, timeout=5)
+        self.assertEqual([record['event'] for record in events], ['stage'])
+        self.assertFalse(finished)
+        self.assertEqual(job.wait_events(events[-1]['id'], timeout=0.05), ([], False))
+        
+        self.release.set()
+        self.wait(job)
+        events, finished = job.wait_events(events[-1]['id'], timeout=5)
+        self.assertEqual(events[0]['data'], {'symbol': 'AAPL', 'status': 'done'})
+        self.assertTrue(finished)
+    
+    def test_finished_jobs_are_pruned(self):
+        """测试只保留最近的已结束任务"""
+        jobs = []
+        for _ in range(4):
+            jobs.append(self.manager.submit(lambda job: None))
+            self.wait(jobs[-1])
+        
+        self.assertIsNone(self.manager.get(jobs[0].id))
+        self.assertIsNotNone(self.manager.get(jobs[-1].id))
+
+
+class TestProgressEndpoint(unittest.TestCase):
+    """测试按任务ID查询分析进度"""
+    
+    def test_progress_by_job_id(self):
+        """测试进度接口返回对应任务的状态"""
+        from trademind.ui import web
+        
+        client = web.app.test_client()
+        job = web.analysis_jobs.submit(lambda job: job.update(percent=1.0), kind='analysis',
+                                       progress={'percent': 0, 'total': 3})
+        job._future.result(5)
+        
+        progress = client.get(f'/api/progress/{job.id}').get_json()['progress']
+        self.assertEqual(progress['job_id'], job.id)
+        self.assertEqual(progress['state'], DONE)
+        self.assertFalse(progress['in_progress'])
+        self.assertEqual(client.get('/api/progress/missing').status_code, 404)
+        self.assertEqual(client.post('/api/cancel/missing').status_code, 404)
+    
+    def test_progress_stream(self):
+        """测试SSE接口推送任务事件，并在任务结束时发送end事件"""
+        from trademind.ui import web
+        
+        def analysis(job):
+            job.publish('stage', symbol='AAPL', stage='fetch')
+            job.publish('symbol', symbol='AAPL', status='done')
+        
+        client = web.app.test_client()
+        job = web.analysis_jobs.submit(analysis, kind='analysis', progress={'percent': 0, 'total': 1})
+        job._future.result(5)
+        
+        response = client.get(f'/api/progress/{job.id}/stream')
+        body = response.get_data(as_text=True)
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        self.assertIn('event: stage', body)
+        self.assertIn('"status": "done"', body)
+        self.assertTrue(body.rstrip().split('\n')[-2].startswith('event: end'))
+        
+        # 断线重连时只推送之后的事件
+        resumed = client.get(f'/api/progress/{job.id}/stream', headers={'Last-Event-ID': '1'}).get_data(as_text=True)
+        self.assertNotIn('event: stage', resumed)
+        self.assertIn('event: symbol', resumed)
+    
+    def test_report_stream(self):
+        """测试报告接口返回任务写入的报告内容"""
+        import shutil
+        import tempfile
+        from trademind.ui import web
+        
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        path = os.path.join(temp_dir, 'report.html')
+        
+        def analysis(job):
+            with open(path, 'w', encoding='utf-8') as f:
+                job.update(live_report_path=path)
+                for chunk in ('<html>', '<div>AAPL</div>', '</html>'):
+                    f.write(chunk)
+                    f.flush()
+                    job.publish('symbol', symbol='AAPL', status='done')
+        
+        client = web.app.test_client()
+        job = web.analysis_jobs.submit(analysis, kind='analysis', progress={'percent': 0, 'total': 1})
+        
+        response = client.get(f'/api/progress/{job.id}/report')
+        self.assertEqual(response.mimetype, 'text/html')
+        self.assertEqual(response.get_data(as_text=True), '<html><div>AAPL</div></html>')
+        self.assertEqual(client.get('/api/progress/missing/report').status_code, 404)
+
+    
+    def test_validation_progress_by_request_id(self):
+        """测试批量验证进度按请求ID分别记录，同时进行的验证请求互不覆盖"""
+        from unittest.mock import MagicMock, patch
+        from trademind.ui import web
+        
+        client = web.app.test_client()
+        seen = {}
+        
+        def validate(codes, market, translate=True, progress_callback=None):
+            # 另一个验证请求正在进行
+            other = dict(web.IDLE_VALIDATION_PROGRESS, in_progress=True, total=5, completed=4)
+            with web.validation_progress_lock:
+                web.validation_progress['other'] = other
+            for done, code in enumerate(codes, 1):
+                progress_callback(done, len(codes), code, {'valid': True})
+            with web.validation_progress_lock:
+                seen.update({key: dict(value) for key, value in web.validation_progress.items()})
+                del web.validation_progress['other']
+            return [{'code': code, 'valid': True} for code in codes]
+        
+        with patch.object(web, 'logger', MagicMock()), \
+             patch.object(web, 'batch_validate_stock_codes', side_effect=validate):
+            response = client.post('/api/validate-stocks', json={'codes': ['AAPL', 'MSFT'], 'request_id': 'mine'})
+        
+        self.assertEqual(response.get_json()['request_id'], 'mine')
+        self.assertEqual(seen['mine']['completed'], 2)
+        self.assertEqual(seen['mine']['current_code'], 'MSFT')
+        self.assertEqual(seen['other']['completed'], 4)
+        # 请求结束后不再保留进度
+        progress = client.get('/api/validate-stocks-progress?request_id=mine').get_json()
+        self.assertFalse(progress['in_progress'])
+        self.assertEqual(web.validation_progress, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
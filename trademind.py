@@ -21,6 +21,7 @@ from rich.align import Align
 
 from trademind.ui.cli import run_cli
 from trademind.ui.web import run_web_server
+from trademind.data.providers import RecordingProvider, ReplayProvider, set_data_provider
 from trademind import __version__
 
 # 创建Rich控制台
@@ -130,9 +131,20 @@ def main():
     parser.add_argument('--web', action='store_true', help='直接启动Web模式')
     parser.add_argument('--port', type=int, default=3336, help='Web服务器端口')
     parser.add_argument('--host', default='0.0.0.0', help='Web服务器主机')
+    parser.add_argument('--replay', metavar='DIR', help='从录制目录回放数据，不访问网络')
+    parser.add_argument('--record', metavar='DIR', help='把获取的数据录制到目录中')
     
     args = parser.parse_args()
     
+    if args.replay and args.record:
+        parser.error('--replay 和 --record 不能同时使用')
+    
+    # 设置数据源
+    if args.replay:
+        set_data_provider(ReplayProvider(args.replay))
+    elif args.record:
+        set_data_provider(RecordingProvider(args.record))
+    
     # 显示版本信息
     if args.version:
         print_banner()
@@ -7,13 +7,21 @@ TradeMind Lite（轻量版）- 回测系统模块
 from trademind.backtest.engine import (
     run_backtest,
     simulate_trades,
+    prepare_backtest_arrays,
+    trade_loop_kernel,
     calculate_performance_metrics,
     generate_trade_summary
 )
+from trademind.backtest.sweep import run_parameter_sweep
+from trademind.backtest.walk_forward import run_walk_forward
 
 __all__ = [
     'run_backtest',
     'simulate_trades',
+    'prepare_backtest_arrays',
+    'trade_loop_kernel',
     'calculate_performance_metrics',
-    'generate_trade_summary'
+    'generate_trade_summary',
+    'run_parameter_sweep',
+    'run_walk_forward'
 ] 
\ No newline at end of file
@@ -96,64 +96,64 @@ def get_empty_results() -> Dict:
     }
 
 
-def simulate_trades(data: pd.DataFrame, signals: pd.DataFrame,
-                   initial_capital: float = 10000.0,
-                   risk_per_trade_pct: float = 0.02,
-                   stop_loss_pct: float = 0.07,
-                   take_profit_pct: float = 0.15,
-                   max_hold_days: int = 20) -> Tuple[List[Dict], List[float]]:
+# 交易成本模型 (基于IBKR的固定费率模型)
+COMMISSION_PER_SHARE = 0.005  # 每股0.005美元 (IBKR固定费率)
+MIN_COMMISSION = 1.0  # 最低每单1美元
+MAX_COMMISSION_PCT = 0.01  # 最高为总成交金额的1%
+
+# 滑点模型
+BASE_SLIPPAGE_PCT = 0.0005  # 基础滑点
+MARKET_IMPACT_FACTOR = 0.1  # 市场冲击系数
+
+# 回测从第50根K线开始，前面的数据用于指标预热
+WARMUP_BARS = 50
+
+# 平仓原因，交易循环中以下标表示
+EXIT_REASONS = ("止损", "止盈", "最大持有期限", "反向信号", "区间结束")
+
+NANOSECONDS_PER_DAY = 86_400_000_000_000
+
+
+def _truthy(values: pd.Series) -> np.ndarray:
+    """按Python的真值规则把信号序列转换为布尔数组（NaN视为True）"""
+    array = values.to_numpy()
+    if array.dtype == bool:
+        return array
+    if array.dtype.kind in 'iuf':
+        return array != 0
+    return np.array([bool(value) for value in array], dtype=bool)
+
+
+def _average_volume(volume: np.ndarray, window: int = 20) -> np.ndarray:
     """
-    模拟交易执行，生成交易记录和权益曲线
+    计算每根K线之前window根K线的平均成交量（跳过NaN），与volume.iloc[i-window:i].mean()一致
+    """
+    avg_volume = np.full(len(volume), np.nan)
+    if len(volume) <= window:
+        return avg_volume
+    
+    windows = np.lib.stride_tricks.sliding_window_view(volume[:-1], window)
+    if volume.dtype.kind in 'iu':
+        # 整数成交量先精确求和再相除
+        avg_volume[window:] = windows.sum(axis=1) / window
+    else:
+        valid = ~np.isnan(windows)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            avg_volume[window:] = np.where(valid, windows, 0.0).sum(axis=1) / valid.sum(axis=1)
+    return avg_volume
+
+
+def enhance_signals(close: pd.Series, signals: pd.DataFrame) -> Tuple[pd.Series, pd.Series]:
+    """
+    在原始买卖信号上叠加RSI超买超卖、MACD交叉和布林带突破信号
     
     参数:
-        data: 包含OHLCV数据的DataFrame
+        close: 收盘价序列
         signals: 包含买入和卖出信号的DataFrame
-        initial_capital: 初始资金
-        risk_per_trade_pct: 每笔交易风险资金的百分比
-        stop_loss_pct: 止损百分比
-        take_profit_pct: 止盈百分比
-        max_hold_days: 最大持有天数
         
     返回:
-        Tuple[List[Dict], List[float]]: 交易记录和权益曲线
+        Tuple[pd.Series, pd.Series]: 增强后的买入信号和卖出信号
     """
-    # 准备数据
-    close = data['Close'].copy()
-    high = data['High'].copy()
-    low = data['Low'].copy()
-    dates = data.index
-    
-    # 交易成本模型 (基于IBKR的固定费率模型)
-    commission_per_share = 0.005  # 每股0.005美元 (IBKR固定费率)
-    min_commission = 1.0  # 最低每单1美元
-    max_commission_pct = 0.01  # 最高为总成交金额的1%
-    
-    # 滑点模型
-    base_slippage_pct = 0.0005  # 基础滑点
-    market_impact_factor = 0.1  # 市场冲击系数
-    
-    # 初始化回测变量
-    position = 0  # 0表示空仓，1表示多头，-1表示空头
-    entry_price = 0.0  # 入场价格
-    entry_date = None  # 入场日期
-    capital = initial_capital  # 当前资金
-    equity = [initial_capital]  # 权益曲线
-    trades = []  # 交易记录
-    
-    # 计算ATR (真实波动幅度)
-    tr1 = high - low
-    tr2 = abs(high - close.shift())
-    tr3 = abs(low - close.shift())
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-    atr = tr.rolling(window=14).mean()
-    
-    # 使用Wilder的平滑方法
-    for i in range(14, len(tr)):
-        atr.iloc[i] = (atr.iloc[i-1] * 13 + tr.iloc[i]) / 14
-    
-    # 计算平均成交量
-    volume = data.get('Volume', pd.Series(np.ones(len(close)), index=close.index))
-    
     # 确保信号数据包含必要的列
     if 'buy_signal' not in signals.columns:
         signals['buy_signal'] = False
@@ -194,47 +194,164 @@ def simulate_trades(data: pd.DataFrame, signals: pd.DataFrame,
         bb_upper_break = (close > upper_band)
         enhanced_sell_signals = enhanced_sell_signals | bb_upper_break
     
-    # 遍历每个交易日
-    for i in range(50, len(signals)):
-        current_date = dates[i]
-        current_price = close.iloc[i]
-        current_high = high.iloc[i]
-        current_low = low.iloc[i]
-        current_volume = volume.iloc[i]
-        avg_volume = volume.iloc[i-20:i].mean() if 'Volume' in data.columns else 1000  # 20日平均成交量
+    return enhanced_buy_signals, enhanced_sell_signals
+
+
+def prepare_backtest_arrays(data: pd.DataFrame, signals: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    一次性提取交易循环所需的全部NumPy数组
+    
+    参数:
+        data: 包含OHLCV数据的DataFrame
+        signals: 包含买入和卖出信号的DataFrame
         
-        # 计算当前ATR
-        current_atr = atr.iloc[i]
+    返回:
+        Dict[str, np.ndarray]: 价格、成交量、20日平均成交量、增强信号和时间戳数组，
+                               时间戳为UTC纳秒整数，索引不是日期时为None；tz为索引的时区名称
+    """
+    close = data['Close']
+    enhanced_buy_signals, enhanced_sell_signals = enhance_signals(close, signals)
+    
+    high = data['High'].to_numpy(dtype=np.float64)
+    low = data['Low'].to_numpy(dtype=np.float64)
+    close_values = close.to_numpy(dtype=np.float64)
+    
+    # 计算平均成交量
+    if 'Volume' in data.columns:
+        volume = data['Volume'].to_numpy()
+        avg_volume = _average_volume(volume)
+        volume = volume.astype(np.float64)
+    else:
+        volume = np.ones(len(close_values))
+        avg_volume = np.full(len(close_values), 1000.0)  # 没有成交量数据时使用固定值
+    
+    # 持有天数按纳秒时间戳计算，索引不是日期时无法计算持有天数
+    tz = None
+    if data.index.inferred_type in ('datetime64', 'datetime'):
+        index = pd.DatetimeIndex(data.index)
+        timestamps = index.as_unit('ns').asi8
+        tz = str(index.tz) if index.tz is not None else None
+    else:
+        timestamps = None
+    
+    return {
+        'close': close_values,
+        'high': high,
+        'low': low,
+        'volume': volume,
+        'avg_volume': avg_volume,
+        'buy': _truthy(enhanced_buy_signals),
+        'sell': _truthy(enhanced_sell_signals),
+        'timestamps': timestamps,
+        'tz': tz
+    }
+
+
+def trade_loop_kernel(arrays: Dict[str, np.ndarray], params: Dict[str, float],
+                      start: int, stop: int) -> Tuple[List[tuple], List[float]]:
+    """
+    交易状态机，只使用数组和数值参数，便于替换为编译后的实现
+    
+    参数:
+        arrays: prepare_backtest_arrays生成的数组
+        params: 包含initial_capital、risk_per_trade_pct、stop_loss_pct、
+                take_profit_pct、max_hold_days的参数字典；可选的close_at_stop为真时，
+                区间结束时仍持有的仓位按最后一根K线的收盘价平仓
+        start: 第一根参与交易的K线下标
+        stop: 最后一根参与交易的K线下标加一
+        
+    返回:
+        Tuple[List[tuple], List[float]]: 交易记录和权益曲线，每笔交易为
+        (入场下标, 出场下标, 入场价, 出场价, 方向, 股数, 盈亏, 盈亏百分比, 平仓原因下标, 持有天数)
+    """
+    # 转换为Python列表，逐元素访问比NumPy标量更快
+    close = arrays['close'].tolist()
+    high = arrays['high'].tolist()
+    low = arrays['low'].tolist()
+    volume = arrays['volume'].tolist()
+    avg_volume = arrays['avg_volume'].tolist()
+    buy = arrays['buy'].tolist()
+    sell = arrays['sell'].tolist()
+    timestamps = arrays['timestamps']
+    timestamps = timestamps.tolist() if timestamps is not None else None
+    
+    initial_capital = params['initial_capital']
+    risk_per_trade_pct = params['risk_per_trade_pct']
+    stop_loss_pct = params['stop_loss_pct']
+    take_profit_pct = params['take_profit_pct']
+    max_hold_days = params['max_hold_days']
+    close_at_stop = params.get('close_at_stop', False)
+    
+    # 初始化回测变量
+    position = 0  # 0表示空仓，1表示多头，-1表示空头
+    entry_price = 0.0  # 入场价格
+    entry_index = -1  # 入场K线下标
+    capital = initial_capital  # 当前资金
+    equity = [initial_capital]  # 权益曲线
+    trades = []  # 交易记录
+    
+    def close_position(i, exit_price, exit_reason, days_held):
+        # 按滑点、佣金平仓，返回平仓盈亏
+        nonlocal capital
+        
+        # 计算滑点
+        volume_ratio = volume[i] / avg_volume[i] if avg_volume[i] > 0 else 1
+        slippage_pct = BASE_SLIPPAGE_PCT + (MARKET_IMPACT_FACTOR * volume_ratio / 100)
+        
+        # 应用滑点
+        if position == 1:  # 多头平仓，卖出
+            exit_price *= (1 - slippage_pct)
+        else:  # 空头平仓，买入
+            exit_price *= (1 + slippage_pct)
+        
+        # 计算交易数量
+        position_value = capital * risk_per_trade_pct / stop_loss_pct
+        shares = position_value / entry_price
+        
+        # 计算交易成本
+        commission = max(MIN_COMMISSION, min(shares * COMMISSION_PER_SHARE, position_value * MAX_COMMISSION_PCT))
+        
+        # 计算交易盈亏
+        if position == 1:  # 多头
+            profit = shares * (exit_price - entry_price) - commission
+        else:  # 空头
+            profit = shares * (entry_price - exit_price) - commission
+        
+        # 更新资金
+        capital += profit
+        
+        trades.append((
+            entry_index, i, entry_price, exit_price, position, shares, profit,
+            profit / (shares * entry_price) * 100, exit_reason, days_held
+        ))
+    
+    # 遍历每个交易日
+    for i in range(start, stop):
+        current_price = close[i]
         
         # 如果有持仓，检查止损止盈
         if position != 0:
-            days_held = (current_date - entry_date).days
-            
-            # 计算浮动盈亏
-            if position == 1:  # 多头
-                profit_pct = (current_price - entry_price) / entry_price
-            else:  # 空头
-                profit_pct = (entry_price - current_price) / entry_price
+            if timestamps is None:
+                raise TypeError("回测数据的索引必须是日期")
+            days_held = (timestamps[i] - timestamps[entry_index]) // NANOSECONDS_PER_DAY
+            current_high = high[i]
+            current_low = low[i]
             
-            # 检查止损条件
+            # 检查止损条件，多头使用当日最低价、空头使用当日最高价
             stop_triggered = False
             if position == 1 and current_low <= entry_price * (1 - stop_loss_pct):
-                # 多头止损 - 使用当日最低价检查
                 stop_price = entry_price * (1 - stop_loss_pct)
                 stop_triggered = True
             elif position == -1 and current_high >= entry_price * (1 + stop_loss_pct):
-                # 空头止损 - 使用当日最高价检查
                 stop_price = entry_price * (1 + stop_loss_pct)
                 stop_triggered = True
             
-            # 检查止盈条件
+            # 检查止盈条件，多头使用当日最高价、空头使用当日最低价
             take_profit_triggered = False
             if position == 1 and current_high >= entry_price * (1 + take_profit_pct):
-                # 多头止盈 - 使用当日最高价检查
                 take_profit_price = entry_price * (1 + take_profit_pct)
                 take_profit_triggered = True
             elif position == -1 and current_low <= entry_price * (1 - take_profit_pct):
-                # 空头止盈 - 使用当日最低价检查
                 take_profit_price = entry_price * (1 - take_profit_pct)
                 take_profit_triggered = True
             
@@ -242,87 +359,120 @@ def simulate_trades(data: pd.DataFrame, signals: pd.DataFrame,
             max_hold_triggered = days_held >= max_hold_days
             
             # 检查反向信号
-            reverse_signal = (position == 1 and enhanced_sell_signals.iloc[i]) or (position == -1 and enhanced_buy_signals.iloc[i])
+            reverse_signal = (position == 1 and sell[i]) or (position == -1 and buy[i])
             
             # 如果触发任何平仓条件，执行平仓
             if stop_triggered or take_profit_triggered or max_hold_triggered or reverse_signal:
                 # 确定平仓价格
                 if stop_triggered:
                     exit_price = stop_price
-                    exit_reason = "止损"
+                    exit_reason = 0
                 elif take_profit_triggered:
                     exit_price = take_profit_price
-                    exit_reason = "止盈"
+                    exit_reason = 1
                 elif max_hold_triggered:
                     exit_price = current_price
-                    exit_reason = "最大持有期限"
+                    exit_reason = 2
                 else:  # reverse_signal
                     exit_price = current_price
-                    exit_reason = "反向信号"
-                
-                # 计算滑点
-                volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1
-                slippage_pct = base_slippage_pct + (market_impact_factor * volume_ratio / 100)
-                
-                # 应用滑点
-                if position == 1:  # 多头平仓，卖出
-                    exit_price *= (1 - slippage_pct)
-                else:  # 空头平仓，买入
-                    exit_price *= (1 + slippage_pct)
-                
-                # 计算交易数量
-                position_value = capital * risk_per_trade_pct / stop_loss_pct
-                shares = position_value / entry_price
-                
-                # 计算交易成本
-                commission = max(min_commission, min(shares * commission_per_share, position_value * max_commission_pct))
+                    exit_reason = 3
                 
-                # 计算交易盈亏
-                if position == 1:  # 多头
-                    profit = shares * (exit_price - entry_price) - commission
-                else:  # 空头
-                    profit = shares * (entry_price - exit_price) - commission
-                
-                # 更新资金
-                capital += profit
-                
-                # 记录交易
-                trades.append({
-                    'entry_date': entry_date,
-                    'entry_price': entry_price,
-                    'exit_date': current_date,
-                    'exit_price': exit_price,
-                    'position': 'long' if position == 1 else 'short',
-                    'shares': shares,
-                    'profit': profit,
-                    'profit_pct': profit / (shares * entry_price) * 100,
-                    'exit_reason': exit_reason,
-                    'hold_days': days_held
-                })
+                close_position(i, exit_price, exit_reason, days_held)
                 
                 # 平仓后重置持仓状态
                 position = 0
-    
+        
         # 如果没有持仓，检查开仓信号
         if position == 0:
             # 检查买入信号
-            if enhanced_buy_signals.iloc[i]:
+            if buy[i]:
                 position = 1  # 多头
-                entry_price = current_price * (1 + base_slippage_pct)  # 考虑滑点
-                entry_date = current_date
+                entry_price = current_price * (1 + BASE_SLIPPAGE_PCT)  # 考虑滑点
+                entry_index = i
             
             # 检查卖出信号 (做空)
-            elif enhanced_sell_signals.iloc[i]:
+            elif sell[i]:
                 position = -1  # 空头
-                entry_price = current_price * (1 - base_slippage_pct)  # 考虑滑点
-                entry_date = current_date
+                entry_price = current_price * (1 - BASE_SLIPPAGE_PCT)  # 考虑滑点
+                entry_index = i
         
         # 更新权益曲线
         equity.append(capital)
     
+    # 区间结束时仍有持仓，按最后一根K线的收盘价平仓
+    if close_at_stop and position != 0:
+        days_held = (timestamps[stop - 1] - timestamps[entry_index]) // NANOSECONDS_PER_DAY
+        close_position(stop - 1, close[stop - 1], 4, days_held)
+        equity[-1] = capital
+    
     return trades, equity
 
 
+def build_trade_records(raw_trades: List[tuple], dates: pd.Index) -> List[Dict]:
+    """
+    将交易循环输出的数值记录转换为交易记录字典
+    
+    参数:
+        raw_trades: trade_loop_kernel输出的交易元组
+        dates: 日期索引
+        
+    返回:
+        List[Dict]: 交易记录列表
+    """
+    return [
+        {
+            'entry_date': dates[entry_index],
+            'entry_price': entry_price,
+            'exit_date': dates[exit_index],
+            'exit_price': exit_price,
+            'position': 'long' if position == 1 else 'short',
+            'shares': shares,
+            'profit': profit,
+            'profit_pct': profit_pct,
+            'exit_reason': EXIT_REASONS[exit_reason],
+            'hold_days': hold_days
+        }
+        for (entry_index, exit_index, entry_price, exit_price, position,
+             shares, profit, profit_pct, exit_reason, hold_days) in raw_trades
+    ]
+
+
+def simulate_trades(data: pd.DataFrame, signals: pd.DataFrame,
+                   initial_capital: float = 10000.0,
+                   risk_per_trade_pct: float = 0.02,
+                   stop_loss_pct: float = 0.07,
+                   take_profit_pct: float = 0.15,
+                   max_hold_days: int = 20,
+                   kernel=None) -> Tuple[List[Dict], List[float]]:
+    """
+    模拟交易执行，生成交易记录和权益曲线
+    
+    参数:
+        data: 包含OHLCV数据的DataFrame
+        signals: 包含买入和卖出信号的DataFrame
+        initial_capital: 初始资金
+        risk_per_trade_pct: 每笔交易风险资金的百分比
+        stop_loss_pct: 止损百分比
+        take_profit_pct: 止盈百分比
+        max_hold_days: 最大持有天数
+        kernel: 交易循环实现，签名与trade_loop_kernel相同，默认使用trade_loop_kernel
+        
+    返回:
+        Tuple[List[Dict], List[float]]: 交易记录和权益曲线
+    """
+    arrays = prepare_backtest_arrays(data, signals)
+    params = {
+        'initial_capital': initial_capital,
+        'risk_per_trade_pct': risk_per_trade_pct,
+        'stop_loss_pct': stop_loss_pct,
+        'take_profit_pct': take_profit_pct,
+        'max_hold_days': max_hold_days
+    }
+    
+    raw_trades, equity = (kernel or trade_loop_kernel)(arrays, params, WARMUP_BARS, len(signals))
+    return build_trade_records(raw_trades, data.index), equity
+
+
 def calculate_performance_metrics(trades: List[Dict], equity: List[float], 
                                  initial_capital: float, dates: pd.DatetimeIndex) -> Dict:
     """
@@ -0,0 +1,293 @@
+"""
+TradeMind Lite（轻量版）- 参数扫描模块
+
+本模块提供回测参数扫描功能：对一组股票和参数网格的全部组合执行回测，
+并通过进程池并行计算。各股票的价格和信号数组只在主进程中准备一次，
+通过共享内存提供给工作进程，任务本身只携带股票代码和参数组合。
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+from trademind.backtest.engine import (
+    build_trade_records,
+    calculate_performance_metrics,
+    get_empty_results,
+    prepare_backtest_arrays,
+    trade_loop_kernel,
+    WARMUP_BARS,
+)
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+# 可扫描的回测参数及其默认值，与run_backtest一致
+SWEEP_PARAMETERS = {
+    'risk_per_trade_pct': 0.02,
+    'stop_loss_pct': 0.07,
+    'take_profit_pct': 0.15,
+    'max_hold_days': 20,
+}
+
+# 共享内存中按数据类型分组存放的数组
+_FLOAT_FIELDS = ('close', 'high', 'low', 'volume', 'avg_volume')
+_BOOL_FIELDS = ('buy', 'sell')
+_INT_FIELDS = ('timestamps',)
+
+# 工作进程中已连接的共享数组
+_worker_arrays: Dict[str, Dict[str, np.ndarray]] = {}
+_worker_blocks: List[shared_memory.SharedMemory] = []
+
+
+def expand_grid(param_grid: Dict[str, Iterable]) -> List[Dict]:
+    """
+    将参数网格展开为参数组合列表，未指定的参数使用默认值
+
+    参数:
+        param_grid: {参数名: 候选值列表}
+
+    返回:
+        List[Dict]: 参数组合列表
+    """
+    unknown = set(param_grid) - set(SWEEP_PARAMETERS)
+    if unknown:
+        raise ValueError(f"不支持的回测参数: {', '.join(sorted(unknown))}")
+
+    names = list(param_grid)
+    combinations = []
+    for values in product(*(list(param_grid[name]) for name in names)):
+        params = dict(SWEEP_PARAMETERS)
+        params.update(zip(names, values))
+        combinations.append(params)
+    return combinations
+
+
+class SharedArrays:
+    """
+    把多只股票的回测数组打包到共享内存中
+
+    同一数据类型的字段存放在同一块共享内存里，形状为(字段数, 总长度)，
+    各股票按偏移量依次排列。
+    """
+
+    def __init__(self, arrays_by_symbol: Dict[str, Dict[str, np.ndarray]]):
+        self.layout: Dict[str, Tuple[int, int]] = {}
+        # 时间戳以UTC存放，时区单独记录，工作进程据此还原带时区的日期
+        self.timezones: Dict[str, Optional[str]] = {symbol: arrays.get('tz')
+                                                    for symbol, arrays in arrays_by_symbol.items()}
+        offset = 0
+        for symbol, arrays in arrays_by_symbol.items():
+            length = len(arrays['close'])
+            self.layout[symbol] = (offset, length)
+            offset += length
+        self.total_length = max(offset, 1)
+
+        self.blocks: Dict[str, shared_memory.SharedMemory] = {}
+        self.specs: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {}
+        for group, dtype, fields in (('float', np.float64, _FLOAT_FIELDS),
+                                     ('bool', np.bool_, _BOOL_FIELDS),
+                                     ('int', np.int64, _INT_FIELDS)):
+            size = len(fields) * self.total_length * np.dtype(dtype).itemsize
+            block = shared_memory.SharedMemory(create=True, size=size)
+            matrix = np.ndarray((len(fields), self.total_length), dtype=dtype, buffer=block.buf)
+            for symbol, arrays in arrays_by_symbol.items():
+                start, length = self.layout[symbol]
+                for row, field in enumerate(fields):
+                    matrix[row, start:start + length] = arrays[field]
+            del matrix
+            self.blocks[group] = block
+            self.specs[group] = (block.name, np.dtype(dtype).str, fields)
+
+    def descriptor(self) -> Dict:
+        """
+        返回工作进程连接共享内存所需的信息（可序列化）
+        """
+        return {'specs': self.specs, 'layout': self.layout, 'timezones': self.timezones,
+                'total_length': self.total_length}
+
+    def close(self) -> None:
+        """
+        释放共享内存
+        """
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks = {}
+
+
+def _attach_shared_arrays(descriptor: Dict) -> None:
+    """
+    工作进程初始化：连接共享内存并为每只股票建立数组视图
+    """
+    _worker_arrays.clear()
+    matrices = {}
+    for group, (name, dtype, fields) in descriptor['specs'].items():
+        # 工作进程与主进程共用同一个resource_tracker，共享内存由主进程负责释放
+        block = shared_memory.SharedMemory(name=name)
+        _worker_blocks.append(block)
+        matrices[group] = (np.ndarray((len(fields), descriptor['total_length']), dtype=np.dtype(dtype),
+                                      buffer=block.buf), fields)
+
+    for symbol, (start, length) in descriptor['layout'].items():
+        arrays = {'tz': descriptor['timezones'].get(symbol)}
+        for matrix, fields in matrices.values():
+            for row, field in enumerate(fields):
+                arrays[field] = matrix[row, start:start + length]
+        _worker_arrays[symbol] = arrays
+
+
+def _array_dates(arrays: Dict[str, np.ndarray]) -> pd.DatetimeIndex:
+    """
+    由UTC纳秒时间戳还原日期索引，原数据带时区时转换回原时区
+    """
+    dates = pd.DatetimeIndex(np.asarray(arrays['timestamps']).view('M8[ns]'))
+    tz = arrays.get('tz')
+    if tz:
+        dates = dates.tz_localize('UTC').tz_convert(tz)
+    return dates
+
+
+def _backtest_arrays(arrays: Dict[str, np.ndarray], params: Dict, initial_capital: float,
+                     start: int = WARMUP_BARS, stop: Optional[int] = None,
+                     close_at_stop: bool = False) -> Tuple[Dict, List[Dict], List[float]]:
+    """
+    基于预先准备的数组在[start, stop)区间执行一次回测并计算性能指标
+
+    close_at_stop为True时区间结束时仍持有的仓位按最后一根K线的收盘价平仓，计入区间的交易和权益。
+
+    返回:
+        Tuple[Dict, List[Dict], List[float]]: 性能指标、交易记录和权益曲线
+    """
+    stop = len(arrays['close']) if stop is None else stop
+    if len(arrays['close']) < WARMUP_BARS or stop <= start:
+        return get_empty_results(), [], [initial_capital]
+
+    run_params = dict(params, initial_capital=initial_capital, close_at_stop=close_at_stop)
+    raw_trades, equity = trade_loop_kernel(arrays, run_params, start, stop)
+    dates = _array_dates(arrays)
+    trades = build_trade_records(raw_trades, dates)
+
+    # 完整区间与run_backtest一致按全部数据计算年化收益，子区间只按区间本身计算
+    period = dates if (start, stop) == (WARMUP_BARS, len(dates)) else dates[start:stop]
+    return calculate_performance_metrics(trades, equity, initial_capital, period), trades, equity
+
+
+def _run_sweep_task(symbol: str, combinations: List[Dict], initial_capital: float,
+                    start: int = WARMUP_BARS, stop: Optional[int] = None,
+                    arrays: Optional[Dict[str, np.ndarray]] = None) -> List[Dict]:
+    """
+    对一只股票在[start, stop)区间执行一组参数组合的回测
+
+    在工作进程中执行时从共享内存读取数组，在当前进程中执行时直接使用传入的数组。
+    """
+    arrays = arrays if arrays is not None else _worker_arrays[symbol]
+    rows = []
+    for params in combinations:
+        try:
+            metrics = _backtest_arrays(arrays, params, initial_capital, start, stop)[0]
+        except Exception as e:
+            logger.error(f"{symbol} 参数 {params} 回测失败: {str(e)}")
+            metrics = get_empty_results()
+        rows.append({'symbol': symbol, **params, **metrics})
+    return rows
+
+
+def run_sweep_tasks(arrays_by_symbol: Dict[str, Dict[str, np.ndarray]], tasks: List[tuple],
+                    initial_capital: float, max_workers: Optional[int] = None) -> List[List[Dict]]:
+    """
+    执行一组回测任务，多进程时通过共享内存提供数组
+
+    参数:
+        arrays_by_symbol: {股票代码: prepare_backtest_arrays生成的数组}
+        tasks: (股票代码, 参数组合列表, 起始下标, 结束下标) 元组列表
+        initial_capital: 初始资金
+        max_workers: 工作进程数，默认为CPU核数；为1时在当前进程中顺序执行
+
+    返回:
+        List[List[Dict]]: 与tasks一一对应的结果行
+    """
+    if max_workers is None:
+        max_workers = min(os.cpu_count() or 1, len(tasks))
+
+    if max_workers <= 1:
+        return [_run_sweep_task(symbol, chunk, initial_capital, start, stop, arrays_by_symbol[symbol])
+                for symbol, chunk, start, stop in tasks]
+
+    shared = SharedArrays(arrays_by_symbol)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_attach_shared_arrays,
+                                 initargs=(shared.descriptor(),)) as executor:
+            futures = [executor.submit(_run_sweep_task, symbol, chunk, initial_capital, start, stop)
+                       for symbol, chunk, start, stop in tasks]
+            return [future.result() for future in futures]
+    finally:
+        shared.close()
+
+
+def _default_signals(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    使用与StockAnalyzer相同的方式生成交易信号
+    """
+    from trademind.core.indicator_frame import IndicatorFrame
+    from trademind.core.signals import generate_signals
+
+    return generate_signals(data, IndicatorFrame(data))
+
+
+def run_parameter_sweep(histories: Dict[str, pd.DataFrame], param_grid: Dict[str, Iterable],
+                        signals: Optional[Dict[str, pd.DataFrame]] = None,
+                        initial_capital: float = 10000.0,
+                        max_workers: Optional[int] = None,
+                        chunk_size: int = 16) -> pd.DataFrame:
+    """
+    对多只股票执行回测参数扫描
+
+    参数:
+        histories: {股票代码: OHLCV历史数据}，索引必须是日期
+        param_grid: {参数名: 候选值列表}，参数名取自SWEEP_PARAMETERS，未指定的参数使用默认值
+        signals: {股票代码: 交易信号DataFrame}，未提供时使用默认的指标和信号生成
+        initial_capital: 初始资金
+        max_workers: 工作进程数，默认为CPU核数；为1时在当前进程中顺序执行
+        chunk_size: 每个任务包含的参数组合数
+
+    返回:
+        pd.DataFrame: 每行对应一只股票的一组参数，包含symbol、各参数列和
+                      calculate_performance_metrics返回的全部指标
+    """
+    combinations = expand_grid(param_grid)
+    signals = signals or {}
+
+    arrays_by_symbol = {}
+    for symbol, data in histories.items():
+        if data is None or data.empty:
+            logger.warning(f"{symbol} 没有历史数据，跳过参数扫描")
+            continue
+        symbol_signals = signals.get(symbol)
+        if symbol_signals is None:
+            symbol_signals = _default_signals(data)
+        else:
+            symbol_signals = symbol_signals.reindex(data.index)
+        arrays = prepare_backtest_arrays(data, symbol_signals)
+        if arrays['timestamps'] is None:
+            logger.warning(f"{symbol} 的数据索引不是日期，跳过参数扫描")
+            continue
+        arrays_by_symbol[symbol] = arrays
+
+    columns = ['symbol'] + list(SWEEP_PARAMETERS) + list(get_empty_results())
+    if not arrays_by_symbol or not combinations:
+        return pd.DataFrame(columns=columns)
+
+    chunks = [combinations[i:i + chunk_size] for i in range(0, len(combinations), chunk_size)]
+    tasks = [(symbol, chunk, WARMUP_BARS, None) for symbol in arrays_by_symbol for chunk in chunks]
+
+    rows = []
+    for task_rows in run_sweep_tasks(arrays_by_symbol, tasks, initial_capital, max_workers):
+        rows.extend(task_rows)
+    return pd.DataFrame(rows, columns=columns)
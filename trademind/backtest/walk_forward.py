@@ -0,0 +1,159 @@
+"""
+TradeMind Lite（轻量版）- 滚动前推优化模块
+
+本模块提供滚动前推（walk-forward）回测：把历史数据划分为依次前移的样本内/样本外区间，
+在每个样本内区间上从参数网格中选出最优参数，再用该参数回测紧随其后的样本外区间，
+最后把各样本外区间的权益曲线按资金延续拼接起来，评估参数选择方法本身的真实表现。
+
+指标和信号只在完整历史上计算一次，各区间通过下标复用同一组数组；
+所有样本内区间的参数搜索一起交给进程池并行执行。
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+import pandas as pd
+
+from trademind.backtest.engine import (
+    calculate_performance_metrics,
+    get_empty_results,
+    prepare_backtest_arrays,
+    WARMUP_BARS,
+)
+from trademind.backtest.sweep import (
+    SWEEP_PARAMETERS,
+    _backtest_arrays,
+    _default_signals,
+    expand_grid,
+    run_sweep_tasks,
+)
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+# 越小越好的优化目标，样本内选参时取最小值；其余指标取最大值
+MINIMIZED_OBJECTIVES = ('max_drawdown', 'consecutive_losses')
+
+
+def walk_forward_splits(n_bars: int, in_sample_bars: int = 504, out_of_sample_bars: int = 126,
+                        anchored: bool = False, start: int = WARMUP_BARS) -> List[Tuple[int, int, int, int]]:
+    """
+    生成滚动前推的区间划分
+
+    参数:
+        n_bars: K线总数
+        in_sample_bars: 样本内区间长度，默认约2年交易日
+        out_of_sample_bars: 样本外区间长度，默认约半年交易日，也是每次前移的步长
+        anchored: 为True时样本内区间起点固定（扩展窗口），否则随样本外区间一起前移
+        start: 第一个样本内区间的起点，默认跳过指标预热期
+
+    返回:
+        List[Tuple[int, int, int, int]]: (样本内起点, 样本内终点, 样本外起点, 样本外终点) 列表，
+                                         区间均为左闭右开，相邻样本外区间首尾相接
+    """
+    splits = []
+    oos_start = start + in_sample_bars
+    while oos_start + out_of_sample_bars <= n_bars:
+        is_start = start if anchored else oos_start - in_sample_bars
+        splits.append((is_start, oos_start, oos_start, oos_start + out_of_sample_bars))
+        oos_start += out_of_sample_bars
+    return splits
+
+
+def run_walk_forward(data: pd.DataFrame, param_grid: Dict[str, Iterable],
+                     signals: Optional[pd.DataFrame] = None,
+                     in_sample_bars: int = 504, out_of_sample_bars: int = 126,
+                     anchored: bool = False, objective: str = 'sharpe_ratio',
+                     initial_capital: float = 10000.0,
+                     max_workers: Optional[int] = None) -> Dict:
+    """
+    执行滚动前推优化
+
+    参数:
+        data: OHLCV历史数据，索引必须是日期
+        param_grid: {参数名: 候选值列表}，参数名取自SWEEP_PARAMETERS
+        signals: 交易信号DataFrame，未提供时使用默认的指标和信号生成
+        in_sample_bars: 样本内区间长度
+        out_of_sample_bars: 样本外区间长度
+        anchored: 是否使用固定起点的扩展样本内窗口
+        objective: 样本内选参所用的指标名（取calculate_performance_metrics的字段），
+                   MINIMIZED_OBJECTIVES中的指标取最小值，其余指标取最大值
+        initial_capital: 初始资金
+        max_workers: 工作进程数，默认为CPU核数；为1时在当前进程中顺序执行
+
+    返回:
+        Dict: 包含以下内容的字典
+            folds: 每个区间的起止日期、所选参数、样本内得分和样本外指标
+            equity: 拼接后的样本外权益曲线（pd.Series，以日期为索引）
+            trades: 全部样本外交易记录
+            metrics: 基于拼接结果计算的整体性能指标
+    """
+    if objective not in get_empty_results():
+        raise ValueError(f"不支持的优化目标: {objective}")
+
+    combinations = expand_grid(param_grid)
+    splits = walk_forward_splits(len(data), in_sample_bars, out_of_sample_bars, anchored)
+    empty = {
+        'folds': pd.DataFrame(),
+        'equity': pd.Series(dtype=float),
+        'trades': [],
+        'metrics': get_empty_results()
+    }
+    if not splits or not combinations:
+        logger.warning("数据不足以划分滚动前推区间")
+        return empty
+
+    # 指标、信号和回测数组只准备一次，所有区间共用
+    if signals is None:
+        signals = _default_signals(data)
+    else:
+        signals = signals.reindex(data.index)
+    arrays = prepare_backtest_arrays(data, signals)
+    if arrays['timestamps'] is None:
+        logger.warning("数据索引不是日期，无法执行滚动前推回测")
+        return empty
+
+    # 并行执行全部样本内区间的参数搜索
+    key = 'walk_forward'
+    tasks = [(key, combinations, is_start, is_stop) for is_start, is_stop, _, _ in splits]
+    in_sample_rows = run_sweep_tasks({key: arrays}, tasks, initial_capital, max_workers)
+
+    # 依次回测样本外区间，资金在区间之间延续；区间结束时仍持有的仓位在区间末尾平仓，
+    # 避免未实现的盈亏被丢弃
+    select = min if objective in MINIMIZED_OBJECTIVES else max
+    dates = data.index
+    capital = initial_capital
+    equity_values = []
+    equity_dates = []
+    all_trades = []
+    folds = []
+    for fold, ((is_start, is_stop, oos_start, oos_stop), rows) in enumerate(zip(splits, in_sample_rows)):
+        best = select(rows, key=lambda row: row[objective])
+        params = {name: best[name] for name in SWEEP_PARAMETERS}
+
+        metrics, trades, equity = _backtest_arrays(arrays, params, capital, oos_start, oos_stop, close_at_stop=True)
+        all_trades.extend(trades)
+        equity_values.extend(equity[1:])
+        equity_dates.extend(dates[oos_start:oos_stop])
+
+        folds.append({
+            'fold': fold,
+            'in_sample_start': dates[is_start],
+            'in_sample_end': dates[is_stop - 1],
+            'out_of_sample_start': dates[oos_start],
+            'out_of_sample_end': dates[oos_stop - 1],
+            **params,
+            f'in_sample_{objective}': best[objective],
+            **{f'oos_{name}': value for name, value in metrics.items()}
+        })
+        capital = equity[-1]
+
+    first_oos = splits[0][2]
+    stitched_dates = dates[first_oos:splits[-1][3]]
+    return {
+        'folds': pd.DataFrame(folds),
+        'equity': pd.Series(equity_values, index=pd.Index(equity_dates), name='equity'),
+        'trades': all_trades,
+        'metrics': calculate_performance_metrics(all_trades, [initial_capital] + equity_values,
+                                                 initial_capital, stitched_dates)
+    }
@@ -9,16 +9,26 @@ from trademind.core import signals
 from trademind.core import patterns
 from trademind.core import analyzer
 from trademind.core import dynamic_rsi_strategy
+from trademind.core import indicator_frame
+from trademind.core import streaming
+from trademind.core import parallel
 
 # 导出常用函数，方便直接导入
 from trademind.core.indicators import (
     calculate_macd,
     calculate_rsi,
+    calculate_rsi_series,
     calculate_kdj,
+    calculate_kdj_series,
     calculate_bollinger_bands,
-    calculate_dynamic_rsi_thresholds
+    calculate_dynamic_rsi_thresholds,
+    calculate_panel_indicators,
+    align_panel
 )
 
+from trademind.core.indicator_frame import IndicatorFrame
+from trademind.core.streaming import IndicatorState
+
 from trademind.core.dynamic_rsi_strategy import (
     dynamic_atr_rsi,
     generate_signals,
@@ -7,28 +7,36 @@ TradeMind Lite（轻量版）- 分析器模块
 import yfinance as yf
 import pandas as pd
 import numpy as np
-from datetime import datetime
+from datetime import datetime, timedelta
 import pytz
 from pathlib import Path
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, wait
 import json
+import threading
 import warnings
 import os
 import sys
-import time
 
-from trademind.core.indicators import (
-    calculate_rsi, 
-    calculate_macd, 
-    calculate_kdj, 
-    calculate_bollinger_bands,
-    calculate_dynamic_rsi_thresholds
-)
+from trademind.core.indicator_frame import IndicatorFrame
+from trademind.core.parallel import analyze_shared, create_analysis_pool, release_history, share_history
 from trademind.core.patterns import identify_candlestick_patterns
 from trademind.core.signals import generate_trading_advice, generate_signals
 from trademind.backtest import run_backtest
-from trademind.reports.generator import generate_html_report, generate_performance_charts
+from trademind.data.cache import cached_history
+from trademind.data.loader import get_us_stock_data_batch
+from trademind.data.providers import get_data_provider
+from trademind.data.scheduler import iter_prefetched, rate_limited
+from trademind.data.session import get_session, iter_in_session, session_history, session_info
+from trademind.reports.catalog import get_catalog
+from trademind.reports.generator import HTMLReportWriter, generate_html_report, generate_performance_charts
+
+# 分析多只股票时提前获取数据的股票数
+PIPELINE_LOOKAHEAD = 4
+
+# 分析进度回调，参数为事件名称（stage或symbol）和事件内容
+ProgressCallback = Callable[[str, Dict], None]
 
 # 忽略警告
 warnings.filterwarnings('ignore', category=Warning)
@@ -94,139 +102,315 @@ class StockAnalyzer:
             "neutral": "#FFA000"
         }
     
-    def analyze_stocks(self, symbols: List[str], names: Dict[str, str] = None) -> List[Dict]:
+    def analyze_stocks(self, symbols: List[str], names: Dict[str, str] = None,
+                       prefetch: bool = False, lookahead: int = PIPELINE_LOOKAHEAD,
+                       workers: int = 1, progress_callback: Optional[ProgressCallback] = None,
+                       cancel_event: Optional[threading.Event] = None) -> List[Dict]:
         """
-        分析多只股票
+        分析多只股票，参数和进度事件见iter_analyze_stocks
+        
+        返回:
+            List[Dict]: 分析结果列表
+        """
+        return list(self.iter_analyze_stocks(symbols, names, prefetch=prefetch, lookahead=lookahead, workers=workers,
+                                             progress_callback=progress_callback, cancel_event=cancel_event))
+    
+    def iter_analyze_stocks(self, symbols: List[str], names: Dict[str, str] = None,
+                            prefetch: bool = False, lookahead: int = PIPELINE_LOOKAHEAD,
+                            workers: int = 1, progress_callback: Optional[ProgressCallback] = None,
+                            cancel_event: Optional[threading.Event] = None) -> Iterator[Dict]:
+        """
+        分析多只股票，每完成一只股票立即产出结果
+        
+        数据获取与分析计算流水线执行：分析当前股票时，后台线程已在获取后面lookahead只股票的数据。
+        workers大于1时分析计算分散到进程池中执行，全部完成后才开始产出，结果中的indicators为只含最新值的字典。
+        结果按输入顺序产出，调用方可以边分析边处理（如流式写入报告），不需要保留全部结果。
+        
+        progress_callback依次收到以下事件，内容均包含symbol、index和total：
+            stage: 进入新的阶段，stage为fetch、indicators或backtest（进程池中分析时只有fetch）
+            symbol: 一只股票分析结束，status为done、skipped或failed，completed为已结束的股票数
+        cancel_event被设置后不再开始新的股票。
         
         参数:
             symbols: 股票代码列表
             names: 股票名称字典，格式为 {代码: 名称}
+            prefetch: 是否在分析开始前批量获取全部股票的历史数据
+            lookahead: 提前获取数据的股票数，为0时逐个获取
+            workers: 分析进程数，为1时在当前进程中分析
+            progress_callback: 进度回调，参数为事件名称和事件内容
+            cancel_event: 取消分析的事件
             
         返回:
-            List[Dict]: 分析结果列表
+            Iterator[Dict]: 分析结果
         """
+        # 每次运行使用独立的请求合并层，同一次运行中每只股票的数据和信息只获取一次
+        return iter_in_session(lambda: self._iter_analyze_stocks(symbols, names, prefetch, lookahead, workers,
+                                                                 progress_callback, cancel_event))
+    
+    def _iter_analyze_stocks(self, symbols: List[str], names: Optional[Dict[str, str]], prefetch: bool,
+                             lookahead: int, workers: int, progress_callback: Optional[ProgressCallback],
+                             cancel_event: Optional[threading.Event]) -> Iterator[Dict]:
         if names is None:
             names = {}
             
-        results = []
         total = len(symbols)
+        completed = 0
+        
+        def finish(symbol, index, status, **data):
+            nonlocal completed
+            completed += 1
+            self._notify(progress_callback, 'symbol', symbol=symbol, name=names.get(symbol, symbol), index=index,
+                         total=total, status=status, completed=completed, **data)
+        
+        def released(histories):
+            # 股票的数据交给分析后即从合并层中释放，内存占用不随股票数量增长
+            session = get_session()
+            for symbol, hist in histories:
+                session.release(symbol)
+                yield symbol, hist
+        
+        self._notify(progress_callback, 'stage', symbol=None, index=0, total=total, stage='fetch')
+        if prefetch:
+            self.prefetch_stock_data(symbols)
         print("\n开始技术分析...")
         
-        for index, symbol in enumerate(symbols, 1):
+        histories = released(iter_prefetched(symbols, self.get_stock_data, lookahead))
+        if workers > 1:
+            yield from self._analyze_in_processes(histories, names, total, workers, finish, cancel_event)
+            return
+        
+        for index, (symbol, hist) in enumerate(histories, 1):
+            if cancel_event is not None and cancel_event.is_set():
+                print("\n分析已取消")
+                break
+            
             try:
                 print(f"\n[{index}/{total} - {index/total*100:.1f}%] 分析: {names.get(symbol, symbol)} ({symbol})")
                 
-                # 获取股票数据
-                hist = self.get_stock_data(symbol)
-                
-                if hist.empty:
+                if hist is None or hist.empty:
                     print(f"⚠️ 无法获取 {symbol} 的数据，跳过")
+                    finish(symbol, index, 'skipped')
                     continue
                 
-                # 确保有足够的数据计算价格变化
-                if len(hist) >= 2:
-                    current_price = hist['Close'].iloc[-1]
-                    prev_price = hist['Close'].iloc[-2]
-                    price_change = current_price - prev_price
-                    # 确保除数不为零
-                    if prev_price > 0:
-                        price_change_pct = (price_change / prev_price) * 100
-                        # 打印调试信息
-                        print(f"计算涨跌幅 - 当前价格: {current_price:.2f}, 前一收盘价: {prev_price:.2f}")
-                        print(f"计算涨跌幅 - 价格变化: {price_change:.2f}, 变化百分比: {price_change_pct:.2f}%")
-                    else:
-                        price_change_pct = 0.0
-                        print(f"计算涨跌幅 - 前一收盘价为零或负值: {prev_price:.2f}, 使用默认值0.0%")
+                if progress_callback is None:
+                    result = self.analyze_history(symbol, names.get(symbol, symbol), hist)
                 else:
-                    # 如果只有一天数据，尝试使用当天的开盘价和收盘价
-                    if not hist.empty:
-                        current_price = hist['Close'].iloc[-1]
-                        prev_price = hist['Open'].iloc[-1]
-                        price_change = current_price - prev_price
-                        # 确保除数不为零
-                        if prev_price > 0:
-                            price_change_pct = (price_change / prev_price) * 100
-                            print(f"计算涨跌幅(单日) - 收盘价: {current_price:.2f}, 开盘价: {prev_price:.2f}")
-                            print(f"计算涨跌幅(单日) - 价格变化: {price_change:.2f}, 变化百分比: {price_change_pct:.2f}%")
-                        else:
-                            price_change_pct = 0.0
-                            print(f"计算涨跌幅(单日) - 开盘价为零或负值: {prev_price:.2f}, 使用默认值0.0%")
-                    else:
-                        current_price = 0.0
-                        prev_price = 0.0
-                        price_change = 0.0
-                        price_change_pct = 0.0
-                        print("计算涨跌幅 - 无历史数据，使用默认值0.0%")
-                
-                # 确保价格变化百分比不是NaN或无穷大
-                if pd.isna(price_change_pct) or np.isinf(price_change_pct):
-                    price_change_pct = 0.0
-                    print(f"计算涨跌幅 - 结果为NaN或无穷大，使用默认值0.0%")
-                
-                # 打印最终使用的涨跌幅
-                print(f"最终涨跌幅: {price_change_pct:.2f}%")
-                
-                print("计算技术指标...")
-                # 计算技术指标
-                indicators = self.calculate_indicators(hist)
-                
-                print("分析K线形态...")
-                # 调用形态识别模块
-                patterns = self.identify_patterns(hist.tail(5))
-                
-                print("生成交易建议...")
-                # 调用信号生成模块
-                advice = generate_trading_advice(indicators, current_price, patterns)
-                
-                print("执行策略回测...")
-                # 生成交易信号
-                signals = generate_signals(hist, indicators)
-                
-                # 调用回测模块
-                backtest_results = run_backtest(hist, signals)
-                
-                # 确保回测结果包含所有必要的字段
-                if 'total_trades' not in backtest_results or backtest_results['total_trades'] == 0:
-                    # 如果没有足够的数据进行回测，提供一些基本信息
-                    backtest_results = {
-                        'total_trades': 0,
-                        'win_rate': 0,
-                        'avg_profit': 0.00,
-                        'max_profit': 0.00,
-                        'max_loss': 0.00,
-                        'profit_factor': 0.00,
-                        'max_drawdown': 0.00,
-                        'consecutive_losses': 0,
-                        'avg_hold_days': 0,
-                        'final_return': 0.00,
-                        'sharpe_ratio': 0.00,
-                        'sortino_ratio': 0.00,
-                        'net_profit': 0.00,
-                        'annualized_return': 0.00
-                    }
-                
-                results.append({
-                    'symbol': symbol,
-                    'name': names.get(symbol, symbol),
-                    'price': current_price,
-                    'price_change': price_change,
-                    'price_change_pct': price_change_pct,
-                    'prev_close': prev_price,
-                    'indicators': indicators,
-                    'patterns': patterns,
-                    'advice': advice,
-                    'backtest': backtest_results
-                })
-                
-                print(f"✅ {symbol} 分析完成")
-                time.sleep(0.5)
+                    on_stage = lambda stage: self._notify(progress_callback, 'stage', symbol=symbol, index=index,
+                                                          total=total, stage=stage)
+                    result = self.analyze_history(symbol, names.get(symbol, symbol), hist, on_stage=on_stage)
                 
             except Exception as e:
                 self.logger.error(f"分析 {symbol} 时出错", exc_info=True)
                 print(f"❌ {symbol} 分析失败: {str(e)}")
+                finish(symbol, index, 'failed', error=str(e))
                 continue
+            
+            print(f"✅ {symbol} 分析完成")
+            finish(symbol, index, 'done')
+            yield result
+    
+    def _notify(self, progress_callback: Optional[ProgressCallback], event: str, **data) -> None:
+        """
+        调用进度回调，回调出错只记录日志，不影响分析
+        """
+        if progress_callback is None:
+            return
+        try:
+            progress_callback(event, data)
+        except Exception as e:
+            self.logger.warning(f"进度回调出错: {str(e)}")
+    
+    def _analyze_in_processes(self, histories, names: Dict[str, str], total: int, workers: int,
+                              finish: Callable = None, cancel_event: Optional[threading.Event] = None) -> List[Dict]:
+        """
+        在进程池中分析已获取的历史数据
+        
+        每只股票的数据写入独立的共享内存，分析完成后立即释放；同时进行中的任务数限制为
+        进程数的两倍，避免数据获取快于分析时占用过多共享内存。单只股票失败不影响其他股票。
+        
+        参数:
+            histories: iter_prefetched产出的 (代码, 历史数据) 迭代器
+            names: 股票名称字典
+            total: 股票总数
+            workers: 分析进程数
+            finish: 每只股票结束时调用，参数为代码、序号、状态和附加信息
+            cancel_event: 取消分析的事件，设置后不再提交新的股票，并取消尚未开始的任务
+            
+        返回:
+            List[Dict]: 按输入顺序排列的分析结果列表
+        """
+        slots = [None] * total
+        pending = {}
+        finish = finish or (lambda symbol, index, status, **data: None)
+        
+        def collect(futures):
+            for future in futures:
+                index, symbol, block = pending.pop(future)
+                release_history(block)
+                if future.cancelled():
+                    continue
+                try:
+                    slots[index] = future.result()
+                    print(f"✅ {symbol} 分析完成")
+                    finish(symbol, index + 1, 'done')
+                except Exception as e:
+                    self.logger.error(f"分析 {symbol} 时出错", exc_info=True)
+                    print(f"❌ {symbol} 分析失败: {str(e)}")
+                    finish(symbol, index + 1, 'failed', error=str(e))
+        
+        try:
+            with create_analysis_pool(workers) as executor:
+                for index, (symbol, hist) in enumerate(histories):
+                    if cancel_event is not None and cancel_event.is_set():
+                        print("\n分析已取消")
+                        for future in pending:
+                            future.cancel()
+                        break
+                    
+                    print(f"\n[{index + 1}/{total} - {(index + 1)/total*100:.1f}%] 分析: {names.get(symbol, symbol)} ({symbol})")
+                    
+                    if hist is None or hist.empty:
+                        print(f"⚠️ 无法获取 {symbol} 的数据，跳过")
+                        finish(symbol, index + 1, 'skipped')
+                        continue
+                    
+                    block = None
+                    try:
+                        block, descriptor = share_history(hist)
+                        future = executor.submit(analyze_shared, symbol, names.get(symbol, symbol), descriptor)
+                    except Exception as e:
+                        if block is not None:
+                            release_history(block)
+                        self.logger.error(f"分析 {symbol} 时出错", exc_info=True)
+                        print(f"❌ {symbol} 分析失败: {str(e)}")
+                        finish(symbol, index + 1, 'failed', error=str(e))
+                        continue
+                    pending[future] = (index, symbol, block)
+                    
+                    if len(pending) >= workers * 2:
+                        done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                        collect(done)
+                
+                collect(list(pending))
+        finally:
+            # 提前中断时释放尚未回收的共享内存
+            for _, _, block in pending.values():
+                release_history(block)
+        
+        return [result for result in slots if result is not None]
+    
+    def analyze_history(self, symbol: str, name: str, hist: pd.DataFrame,
+                        on_stage: Optional[Callable[[str], None]] = None) -> Dict:
+        """
+        基于已获取的历史数据分析单只股票
+        
+        参数:
+            symbol: 股票代码
+            name: 股票名称
+            hist: 股票历史数据
+            on_stage: 进入indicators、backtest阶段时调用
+            
+        返回:
+            Dict: 分析结果
+        """
+        on_stage = on_stage or (lambda stage: None)
+        
+        # 确保有足够的数据计算价格变化
+        if len(hist) >= 2:
+            current_price = hist['Close'].iloc[-1]
+            prev_price = hist['Close'].iloc[-2]
+            price_change = current_price - prev_price
+            # 确保除数不为零
+            if prev_price > 0:
+                price_change_pct = (price_change / prev_price) * 100
+                # 打印调试信息
+                print(f"计算涨跌幅 - 当前价格: {current_price:.2f}, 前一收盘价: {prev_price:.2f}")
+                print(f"计算涨跌幅 - 价格变化: {price_change:.2f}, 变化百分比: {price_change_pct:.2f}%")
+            else:
+                price_change_pct = 0.0
+                print(f"计算涨跌幅 - 前一收盘价为零或负值: {prev_price:.2f}, 使用默认值0.0%")
+        else:
+            # 如果只有一天数据，尝试使用当天的开盘价和收盘价
+            if not hist.empty:
+                current_price = hist['Close'].iloc[-1]
+                prev_price = hist['Open'].iloc[-1]
+                price_change = current_price - prev_price
+                # 确保除数不为零
+                if prev_price > 0:
+                    price_change_pct = (price_change / prev_price) * 100
+                    print(f"计算涨跌幅(单日) - 收盘价: {current_price:.2f}, 开盘价: {prev_price:.2f}")
+                    print(f"计算涨跌幅(单日) - 价格变化: {price_change:.2f}, 变化百分比: {price_change_pct:.2f}%")
+                else:
+                    price_change_pct = 0.0
+                    print(f"计算涨跌幅(单日) - 开盘价为零或负值: {prev_price:.2f}, 使用默认值0.0%")
+            else:
+                current_price = 0.0
+                prev_price = 0.0
+                price_change = 0.0
+                price_change_pct = 0.0
+                print("计算涨跌幅 - 无历史数据，使用默认值0.0%")
+        
+        # 确保价格变化百分比不是NaN或无穷大
+        if pd.isna(price_change_pct) or np.isinf(price_change_pct):
+            price_change_pct = 0.0
+            print(f"计算涨跌幅 - 结果为NaN或无穷大，使用默认值0.0%")
+        
+        # 打印最终使用的涨跌幅
+        print(f"最终涨跌幅: {price_change_pct:.2f}%")
+        
+        print("计算技术指标...")
+        on_stage('indicators')
+        # 计算技术指标
+        indicators = self.calculate_indicators(hist)
+        
+        print("分析K线形态...")
+        # 调用形态识别模块
+        patterns = self.identify_patterns(hist.tail(5))
+        
+        print("生成交易建议...")
+        # 调用信号生成模块
+        advice = generate_trading_advice(indicators, current_price, patterns)
+        
+        print("执行策略回测...")
+        on_stage('backtest')
+        # 生成交易信号
+        signals = generate_signals(hist, indicators)
+        
+        # 调用回测模块
+        backtest_results = run_backtest(hist, signals)
+        
+        # 确保回测结果包含所有必要的字段
+        if 'total_trades' not in backtest_results or backtest_results['total_trades'] == 0:
+            # 如果没有足够的数据进行回测，提供一些基本信息
+            backtest_results = {
+                'total_trades': 0,
+                'win_rate': 0,
+                'avg_profit': 0.00,
+                'max_profit': 0.00,
+                'max_loss': 0.00,
+                'profit_factor': 0.00,
+                'max_drawdown': 0.00,
+                'consecutive_losses': 0,
+                'avg_hold_days': 0,
+                'final_return': 0.00,
+                'sharpe_ratio': 0.00,
+                'sortino_ratio': 0.00,
+                'net_profit': 0.00,
+                'annualized_return': 0.00
+            }
         
-        return results
+        return {
+            'symbol': symbol,
+            'name': name,
+            'price': current_price,
+            'price_change': price_change,
+            'price_change_pct': price_change_pct,
+            'prev_close': prev_price,
+            'indicators': indicators,
+            'patterns': patterns,
+            'advice': advice,
+            'backtest': backtest_results
+        }
     
     def generate_report(self, results: List[Dict], title: str = "股票分析报告") -> str:
         """
@@ -242,33 +426,84 @@ class StockAnalyzer:
         # 调用报告生成模块
         return generate_html_report(results, title, output_dir=self.results_path)
     
-    def analyze_and_report(self, symbols: List[str], names: Dict[str, str] = None, title: str = "股票分析报告") -> str:
+    def analyze_and_report(self, symbols: List[str], names: Dict[str, str] = None, title: str = "股票分析报告",
+                           prefetch: bool = False, workers: int = 1,
+                           progress_callback: Optional[ProgressCallback] = None,
+                           cancel_event: Optional[threading.Event] = None,
+                           report_writer: Optional[HTMLReportWriter] = None) -> str:
         """
         分析股票并生成报告
         
+        传入report_writer时，每只股票分析完成后立即把结果写入报告文件，不在内存中保留全部结果，
+        报告在分析过程中即可读取。
+        
         参数:
             symbols: 股票代码列表
             names: 股票名称字典，格式为 {代码: 名称}
             title: 报告标题
+            prefetch: 是否在分析开始前批量获取全部股票的历史数据
+            workers: 分析进程数
+            progress_callback: 进度回调，见analyze_stocks；生成报告前另有stage为report的事件
+            cancel_event: 取消分析的事件，分析被取消时不生成报告
+            report_writer: 流式报告写入器，分析被取消或没有结果时删除已写入的文件
             
         返回:
-            str: HTML报告文件路径
+            str: HTML报告文件路径，没有结果或已取消时返回None
         """
-        results = self.analyze_stocks(symbols, names)
+        if report_writer is not None:
+            return self._analyze_and_stream_report(symbols, names, prefetch, workers, progress_callback,
+                                                   cancel_event, report_writer)
+        
+        results = self.analyze_stocks(symbols, names, prefetch=prefetch, workers=workers,
+                                      progress_callback=progress_callback, cancel_event=cancel_event)
+        if cancel_event is not None and cancel_event.is_set():
+            print("❌ 分析已取消，不生成报告")
+            return None
         if not results:
             print("❌ 没有可用的分析结果")
             return None
         
         print("\n生成分析报告...")
+        self._notify(progress_callback, 'stage', symbol=None, index=len(symbols), total=len(symbols), stage='report')
         report_path = self.generate_report(results, title)
         print(f"✅ 报告已生成: {report_path}")
         
         return report_path
     
+    def _analyze_and_stream_report(self, symbols: List[str], names: Optional[Dict[str, str]], prefetch: bool,
+                                   workers: int, progress_callback: Optional[ProgressCallback],
+                                   cancel_event: Optional[threading.Event],
+                                   report_writer: HTMLReportWriter) -> Optional[str]:
+        print("\n分析结果将实时写入报告: " + str(report_writer.path))
+        # 报告随分析结果逐步写入，写入开始时即进入报告阶段
+        self._notify(progress_callback, 'stage', symbol=None, index=0, total=len(symbols), stage='report')
+        results = self.iter_analyze_stocks(symbols, names, prefetch=prefetch, workers=workers,
+                                           progress_callback=progress_callback, cancel_event=cancel_event)
+        try:
+            report_path = report_writer.write(results)
+        except BaseException:
+            # 分析中途失败（如进程池损坏）时删除写了一半的报告，避免被当作完整报告编入索引
+            report_writer.discard()
+            raise
+        if cancel_event is not None and cancel_event.is_set():
+            print("❌ 分析已取消，不生成报告")
+            report_writer.discard()
+            return None
+        if report_writer.stock_count == 0:
+            print("❌ 没有可用的分析结果")
+            report_writer.discard()
+            return None
+        
+        print(f"✅ 报告已生成: {report_path}")
+        
+        return report_path
+    
     def clean_reports(self, days_threshold: int = 30):
         """
         清理旧的报告文件
         
+        待删除的报告从报告索引中查询，不遍历报告目录。
+        
         参数:
             days_threshold: 保留的天数阈值，默认30天。如果为None，则删除所有报告。
         """
@@ -283,80 +518,63 @@ class StockAnalyzer:
         print(f"开始清理报告，阈值: {days_threshold if days_threshold is not None else '全部删除'}天")
         print(f"报告目录: {self.results_path}")
         
-        # 检查stocks子目录
-        stocks_path = self.results_path / "stocks"
-        if stocks_path.exists():
-            print(f"股票报告目录: {stocks_path}")
-        
-        # 递归遍历目录，找出所有HTML文件
-        all_files = []
-        
-        # 主报告目录中的HTML文件
-        main_html_files = list(self.results_path.glob("*.html"))
-        all_files.extend(main_html_files)
-        
-        # stocks子目录中的HTML文件
-        if stocks_path.exists():
-            stocks_html_files = list(stocks_path.glob("*.html"))
-            all_files.extend(stocks_html_files)
-            
-            # 递归查找子目录中的文件
-            for subdir in stocks_path.glob("**/"):
-                if subdir != stocks_path:  # 避免重复
-                    subdir_files = list(subdir.glob("*.html"))
-                    all_files.extend(subdir_files)
+        # 已满days_threshold + 1天的报告超过阈值
+        catalog = get_catalog(self.results_path)
+        cutoff = None if days_threshold is None else now - timedelta(days=days_threshold + 1)
+        entries = catalog.older_than(cutoff)
         
-        print(f"找到 {len(all_files)} 个报告文件")
+        print(f"找到 {len(entries)} 个需要清理的报告文件")
         
-        for file in all_files:
+        for entry in entries:
+            file = self.results_path / entry['name']
             try:
-                file_time = datetime.fromtimestamp(file.stat().st_mtime)
-                days_old = (now - file_time).days
+                file_time = datetime.fromtimestamp(entry['created'])
+                print(f"删除文件: {file}, 创建于: {file_time}, 已有 {(now - file_time).days} 天")
                 
-                print(f"检查文件: {file.name}, 创建于: {file_time}, 已有 {days_old} 天")
+                # 确保文件存在且可写
+                if not file.exists():
+                    print(f"文件不存在: {file}")
+                    catalog.remove(entry['name'])
+                    continue
                 
-                # 如果days_threshold为None或者文件超过阈值天数，则删除
-                if days_threshold is None or days_old > days_threshold:
-                    print(f"删除文件: {file}")
-                    # 确保文件存在且可写
-                    if file.exists():
+                try:
+                    # 使用os.remove而不是Path.unlink，可能更可靠
+                    os.remove(str(file))
+                    count += 1
+                    catalog.remove(entry['name'])
+                    print(f"已删除文件: {file}")
+                except PermissionError:
+                    # 尝试修改权限后再删除
+                    try:
+                        os.chmod(str(file), 0o666)  # 设置读写权限
+                        os.remove(str(file))
+                        count += 1
+                        catalog.remove(entry['name'])
+                        print(f"修改权限后已删除文件: {file}")
+                    except Exception as e2:
+                        print(f"修改权限后仍无法删除文件 {file}: {str(e2)}")
+                        
+                        # 尝试使用系统命令删除
                         try:
-                            # 使用os.remove而不是Path.unlink，可能更可靠
-                            os.remove(str(file))
-                            count += 1
-                            print(f"已删除文件: {file}")
-                        except PermissionError:
-                            # 尝试修改权限后再删除
-                            try:
-                                os.chmod(str(file), 0o666)  # 设置读写权限
-                                os.remove(str(file))
+                            import subprocess
+                            if os.name == 'nt':  # Windows
+                                cmd = f'del /F /Q "{file}"'
+                            else:  # Unix/Linux/Mac
+                                cmd = f'rm -f "{file}"'
+                            
+                            print(f"尝试使用系统命令删除: {cmd}")
+                            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+                            
+                            if result.returncode == 0:
                                 count += 1
-                                print(f"修改权限后已删除文件: {file}")
-                            except Exception as e2:
-                                print(f"修改权限后仍无法删除文件 {file}: {str(e2)}")
-                                
-                                # 尝试使用系统命令删除
-                                try:
-                                    import subprocess
-                                    if os.name == 'nt':  # Windows
-                                        cmd = f'del /F /Q "{file}"'
-                                    else:  # Unix/Linux/Mac
-                                        cmd = f'rm -f "{file}"'
-                                    
-                                    print(f"尝试使用系统命令删除: {cmd}")
-                                    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-                                    
-                                    if result.returncode == 0:
-                                        count += 1
-                                        print(f"使用系统命令成功删除文件: {file}")
-                                    else:
-                                        print(f"系统命令删除失败: {result.stderr}")
-                                except Exception as e3:
-                                    print(f"使用系统命令删除失败: {str(e3)}")
-                        except Exception as e:
-                            print(f"删除文件失败: {str(e)}")
-                    else:
-                        print(f"文件不存在: {file}")
+                                catalog.remove(entry['name'])
+                                print(f"使用系统命令成功删除文件: {file}")
+                            else:
+                                print(f"系统命令删除失败: {result.stderr}")
+                        except Exception as e3:
+                            print(f"使用系统命令删除失败: {str(e3)}")
+                except Exception as e:
+                    print(f"删除文件失败: {str(e)}")
             except Exception as e:
                 print(f"处理文件 {file} 时出错: {str(e)}")
                 self.logger.error(f"处理文件 {file} 时出错: {str(e)}")
@@ -499,13 +717,38 @@ class StockAnalyzer:
             Dict: 股票信息
         """
         try:
-            stock = yf.Ticker(symbol)
-            info = stock.info
-            return info
+            provider = get_data_provider()
+            if provider is not None:
+                return session_info(symbol, lambda: provider.get_info(symbol))
+            return session_info(symbol, lambda: yf.Ticker(symbol).info)
         except Exception as e:
             self.logger.error(f"获取 {symbol} 的信息时出错: {str(e)}")
             return {'shortName': symbol}
 
+    def prefetch_stock_data(self, symbols: List[str]) -> None:
+        """
+        批量获取股票历史数据，供之后的get_stock_data使用
+        
+        结果保存在当前运行的请求合并层中，只对本次运行有效，不同运行之间不会互相取用；
+        不在合并层范围内调用时不保留结果。
+        
+        参数:
+            symbols: 股票代码列表
+        """
+        try:
+            print(f"批量获取 {len(symbols)} 只股票的历史数据...")
+            # 与get_stock_data获取相同的数据：所有股票都从Yahoo获取3年数据
+            results = get_us_stock_data_batch(symbols, period="3y")
+            # 没有获取到数据的股票不记录，由get_stock_data单独获取（包括最大可用数据的回退）
+            session = get_session()
+            if session is not None:
+                for symbol, data in results.items():
+                    if not data.empty:
+                        session.store_history(symbol, "3y", "1d", data)
+        except Exception as e:
+            # 批量获取失败时在分析过程中逐个获取
+            self.logger.warning(f"批量获取历史数据失败: {str(e)}")
+    
     def get_stock_data(self, symbol: str) -> pd.DataFrame:
         """
         获取股票历史数据
@@ -516,18 +759,32 @@ class StockAnalyzer:
         返回:
             pd.DataFrame: 股票历史数据
         """
-        try:
+        def fetch():
             # 获取更长时间的历史数据，确保有足够的数据进行回测
             stock = yf.Ticker(symbol)
             # 从2年的数据改为3年，确保有足够的数据进行回测
-            hist = stock.history(period="3y")
+            # 请求速率由Yahoo共享的限流器控制
+            hist = rate_limited('yahoo', stock.history, period="3y")
             
-            if hist.empty or len(hist) < 100:  # 确保至少有100个交易日的数据
+            if hist.empty:
+                # 3年数据不足100个交易日时已是全部历史，只有完全没有数据时才尝试获取最大可用数据
                 print(f"⚠️ {symbol} 的历史数据不足，尝试获取最大可用数据")
-                # 尝试获取最大可用数据
-                hist = stock.history(period="max")
+                hist = rate_limited('yahoo', stock.history, period="max")
             
             return hist
+        
+        def fetch_since(start):
+            return rate_limited('yahoo', yf.Ticker(symbol).history, start=start.strftime('%Y-%m-%d'))
+        
+        try:
+            # 设置了数据源时从数据源读取
+            provider = get_data_provider()
+            if provider is not None:
+                return session_history(symbol, "3y", "1d", lambda: provider.get_history(symbol, "3y", "1d"))
+            
+            # 启用缓存时优先读取本地缓存，同一次运行中只获取一次（包括批量预取的数据）
+            return session_history(symbol, "3y", "1d",
+                                   lambda: cached_history(symbol, "3y", "1d", fetch, fetch_since=fetch_since))
         except Exception as e:
             self.logger.error(f"获取 {symbol} 的历史数据时出错: {str(e)}")
             print(f"❌ 获取 {symbol} 的历史数据失败: {str(e)}")
@@ -537,63 +794,17 @@ class StockAnalyzer:
         """
         计算技术指标
         
+        共享的中间量只计算一次，各指标在首次访问时生成。返回的IndicatorFrame
+        可按原指标字典的方式读取，也可直接传给generate_signals获取完整序列。
+        
         参数:
             data: 股票历史数据
             
         返回:
-            Dict: 技术指标字典
+            Dict: 技术指标集合（IndicatorFrame）
         """
         try:
-            # 计算RSI
-            rsi = calculate_rsi(data['Close'])
-            
-            # 计算动态RSI阈值
-            dynamic_rsi, oversold, overbought, volatility = calculate_dynamic_rsi_thresholds(
-                data['High'], data['Low'], data['Close']
-            )
-            
-            # 计算MACD
-            macd, signal, hist_macd = calculate_macd(data['Close'])
-            
-            # 计算KDJ
-            k, d, j = calculate_kdj(data['High'], data['Low'], data['Close'])
-            
-            # 计算布林带
-            bb_upper, bb_middle, bb_lower, bb_width, bb_percent = calculate_bollinger_bands(data['Close'])
-            
-            # 计算移动平均线
-            sma5 = data['Close'].rolling(window=5).mean()
-            sma10 = data['Close'].rolling(window=10).mean()
-            sma20 = data['Close'].rolling(window=20).mean()
-            sma50 = data['Close'].rolling(window=50).mean()
-            sma200 = data['Close'].rolling(window=200).mean()
-            
-            # 构建指标字典
-            indicators = {
-                'rsi': rsi,
-                'dynamic_rsi': {
-                    'rsi': dynamic_rsi,
-                    'oversold': oversold,
-                    'overbought': overbought,
-                    'volatility': volatility
-                },
-                'macd': {'macd': macd, 'signal': signal, 'hist': hist_macd},
-                'kdj': {'k': k, 'd': d, 'j': j},
-                'bollinger': {
-                    'upper': bb_upper, 
-                    'middle': bb_middle, 
-                    'lower': bb_lower,
-                    'bandwidth': bb_width,
-                    'percent_b': bb_percent
-                },
-                'sma5': sma5,
-                'sma10': sma10,
-                'sma20': sma20,
-                'sma50': sma50,
-                'sma200': sma200
-            }
-            
-            return indicators
+            return IndicatorFrame(data)
         except Exception as e:
             self.logger.error(f"计算技术指标时出错: {str(e)}")
             print(f"❌ 计算技术指标失败: {str(e)}")
@@ -7,7 +7,7 @@
 
 import pandas as pd
 import numpy as np
-from trademind.core.indicators import calculate_rsi
+from trademind.core.indicators import calculate_rsi, rolling_percentile
 
 def dynamic_atr_rsi(price_data, rsi_period=14, atr_period=14, lookback_period=252):
     """
@@ -49,9 +49,7 @@ def dynamic_atr_rsi(price_data, rsi_period=14, atr_period=14, lookback_period=25
     atr_pct = (atr / close) * 100
     
     # 计算波动率的历史百分位
-    volatility_percentile = atr_pct.rolling(window=lookback_period).apply(
-        lambda x: pd.Series(x).rank(pct=True).iloc[-1]
-    )
+    volatility_percentile = rolling_percentile(atr_pct, lookback_period)
     
     # 平滑地调整RSI阈值
     base_oversold = 30
@@ -0,0 +1,294 @@
+"""
+TradeMind Lite（轻量版）- 指标集合模块
+
+本模块提供IndicatorFrame，对单只股票的OHLCV数据一次性准备收盘价差分、真实波动幅度、
+滚动最值/均值/标准差等共享中间量，并按需生成各技术指标的float64列。
+
+IndicatorFrame同时实现只读映射接口，键与StockAnalyzer.calculate_indicators原有的
+指标字典一致，交易建议、信号生成和报告卡片可以直接使用同一个对象。
+"""
+
+from collections.abc import Mapping
+from typing import Dict, Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+
+from trademind.core.indicators import (
+    _adjust_rsi_thresholds,
+    _bollinger_from_stats,
+    _kdj_from_range,
+    _latest_volatility_percentile,
+    _macd,
+    _true_range,
+    _wilder_rsi_from_delta,
+)
+
+
+class IndicatorFrame(Mapping):
+    """
+    单只股票的技术指标集合
+
+    共享中间量在首次使用时计算并缓存，指标列在首次访问时才生成，
+    同一组内的列（如MACD线、信号线和柱状图）一起生成。
+
+    可用列:
+        rsi, macd, macd_signal, macd_hist, k, d, j,
+        bb_upper, bb_middle, bb_lower, bb_bandwidth, bb_percent_b,
+        true_range, atr, atr_pct, sma5, sma10, sma20, sma50, sma200
+    """
+
+    _COLUMN_BUILDERS = {
+        'rsi': '_build_rsi',
+        'macd': '_build_macd',
+        'macd_signal': '_build_macd',
+        'macd_hist': '_build_macd',
+        'k': '_build_kdj',
+        'd': '_build_kdj',
+        'j': '_build_kdj',
+        'bb_upper': '_build_bollinger',
+        'bb_middle': '_build_bollinger',
+        'bb_lower': '_build_bollinger',
+        'bb_bandwidth': '_build_bollinger',
+        'bb_percent_b': '_build_bollinger',
+        'true_range': '_build_atr',
+        'atr': '_build_atr',
+        'atr_pct': '_build_atr',
+    }
+
+    def __init__(self, data: pd.DataFrame, rsi_period: int = 14, kdj_period: int = 9,
+                 bollinger_window: int = 20, bollinger_std: float = 2.0,
+                 atr_period: int = 14, lookback_period: int = 252, max_adjustment: float = 15.0,
+                 sma_windows: Tuple[int, ...] = (5, 10, 20, 50, 200)):
+        """
+        初始化指标集合
+
+        参数:
+            data: 包含High、Low、Close列的DataFrame
+            rsi_period: RSI周期
+            kdj_period: KDJ周期
+            bollinger_window: 布林带窗口
+            bollinger_std: 布林带标准差倍数
+            atr_period: ATR周期
+            lookback_period: 波动率百分位的历史回溯期
+            max_adjustment: 动态RSI阈值的最大调整幅度
+            sma_windows: 需要提供的简单移动平均线窗口
+        """
+        self.index = data.index
+        self.close = np.ascontiguousarray(data['Close'].to_numpy(dtype=np.float64))
+        self.high = np.ascontiguousarray(data['High'].to_numpy(dtype=np.float64))
+        self.low = np.ascontiguousarray(data['Low'].to_numpy(dtype=np.float64))
+
+        self.rsi_period = rsi_period
+        self.kdj_period = kdj_period
+        self.bollinger_window = bollinger_window
+        self.bollinger_std = bollinger_std
+        self.atr_period = atr_period
+        self.lookback_period = lookback_period
+        self.max_adjustment = max_adjustment
+        self.sma_windows = tuple(sma_windows)
+
+        self._keys = ('rsi', 'rsi_series', 'dynamic_rsi', 'macd', 'kdj', 'bollinger') + \
+            tuple(f'sma{window}' for window in self.sma_windows)
+        self._columns: Dict[str, np.ndarray] = {}
+        self._intermediates: Dict[tuple, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __getitem__(self, key: str):
+        if key == 'rsi':
+            return self.latest('rsi') if len(self.close) > self.rsi_period else 50.0
+        if key == 'rsi_series':
+            return self.series('rsi')
+        if key == 'dynamic_rsi':
+            return self.dynamic_rsi()
+        if key == 'macd':
+            if len(self.close) < 26:
+                return {'macd': 0.0, 'signal': 0.0, 'hist': 0.0}
+            return {
+                'macd': self.latest('macd'),
+                'signal': self.latest('macd_signal'),
+                'hist': self.latest('macd_hist')
+            }
+        if key == 'kdj':
+            return {'k': self.latest('k'), 'd': self.latest('d'), 'j': self.latest('j')}
+        if key == 'bollinger':
+            if len(self.close) < self.bollinger_window:
+                return {'upper': 0.0, 'middle': 0.0, 'lower': 0.0, 'bandwidth': 0.0, 'percent_b': 0.0}
+            return {
+                'upper': self.latest('bb_upper'),
+                'middle': self.latest('bb_middle'),
+                'lower': self.latest('bb_lower'),
+                'bandwidth': self.latest('bb_bandwidth'),
+                'percent_b': self.latest('bb_percent_b')
+            }
+        if key in self._keys:
+            return self.series(key)
+        raise KeyError(key)
+
+    def __repr__(self) -> str:
+        return f"IndicatorFrame(rows={len(self.close)}, materialized={sorted(self._columns)})"
+
+    # ---------- 列访问 ----------
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        获取指标列，首次访问时生成
+
+        参数:
+            name: 列名
+
+        返回:
+            np.ndarray: 与输入数据等长的连续float64数组
+        """
+        if name not in self._columns:
+            if name.startswith('sma') and name[3:].isdigit():
+                self._columns[name] = self._rolling('mean', int(name[3:]))
+            elif name in self._COLUMN_BUILDERS:
+                getattr(self, self._COLUMN_BUILDERS[name])()
+            else:
+                raise KeyError(f"未知的指标列: {name}")
+        return self._columns[name]
+
+    def series(self, name: str) -> pd.Series:
+        """
+        以pd.Series形式获取指标列，索引与输入数据一致
+        """
+        return pd.Series(self.column(name), index=self.index, name=name)
+
+    def latest(self, name: str) -> float:
+        """
+        获取指标列的最新值
+        """
+        return float(self.column(name)[-1])
+
+    @property
+    def materialized(self) -> Tuple[str, ...]:
+        """
+        已生成的指标列名
+        """
+        return tuple(self._columns)
+
+    def dynamic_rsi(self) -> Dict[str, float]:
+        """
+        计算动态RSI阈值，与calculate_dynamic_rsi_thresholds结果一致
+
+        返回:
+            Dict: 包含rsi、oversold、overbought、volatility的字典
+        """
+        if len(self.close) <= max(self.rsi_period, self.atr_period, self.lookback_period):
+            return {'rsi': 50.0, 'oversold': 30.0, 'overbought': 70.0, 'volatility': 0.5}
+
+        volatility = _latest_volatility_percentile(self.column('atr_pct'), self.lookback_period)
+        oversold, overbought = _adjust_rsi_thresholds(volatility, self.max_adjustment)
+        return {
+            'rsi': self['rsi'],
+            'oversold': float(oversold),
+            'overbought': float(overbought),
+            'volatility': float(volatility)
+        }
+
+    def signal_inputs(self) -> Dict:
+        """
+        生成供generate_signals使用的指标字典，趋势类指标均为完整序列
+
+        返回:
+            Dict: 与指标字典结构相同，但MACD、布林带等取值为pd.Series
+        """
+        inputs = {
+            'rsi_series': self.series('rsi'),
+            'dynamic_rsi': self.dynamic_rsi(),
+            'macd': {
+                'macd': self.series('macd'),
+                'signal': self.series('macd_signal'),
+                'hist': self.series('macd_hist')
+            },
+            'bollinger': {
+                'upper': self.series('bb_upper'),
+                'middle': self.series('bb_middle'),
+                'lower': self.series('bb_lower')
+            }
+        }
+        for window in self.sma_windows:
+            inputs[f'sma{window}'] = self.series(f'sma{window}')
+        return inputs
+
+    def to_dict(self) -> Dict:
+        """
+        生成全部指标并转换为普通字典
+        """
+        return {key: self[key] for key in self._keys}
+
+    def latest_values(self) -> Dict:
+        """
+        只包含最新指标值的精简字典，不含完整序列，便于跨进程传递
+
+        返回:
+            Dict: 包含rsi、dynamic_rsi、macd、kdj、bollinger的字典
+        """
+        return {key: self[key] for key in ('rsi', 'dynamic_rsi', 'macd', 'kdj', 'bollinger')}
+
+    # ---------- 共享中间量 ----------
+
+    def _close_diff(self) -> np.ndarray:
+        key = ('diff',)
+        if key not in self._intermediates:
+            self._intermediates[key] = np.diff(self.close)
+        return self._intermediates[key]
+
+    def _rolling(self, kind: str, window: int, source: str = 'close') -> np.ndarray:
+        """
+        获取滚动统计量（mean/std/min/max），相同窗口只计算一次
+        """
+        key = (kind, window, source)
+        if key not in self._intermediates:
+            rolling = pd.Series(getattr(self, source)).rolling(window=window)
+            self._intermediates[key] = np.ascontiguousarray(getattr(rolling, kind)().to_numpy(dtype=np.float64))
+        return self._intermediates[key]
+
+    # ---------- 指标生成 ----------
+
+    def _build_rsi(self) -> None:
+        self._columns['rsi'] = _wilder_rsi_from_delta(self._close_diff(), self.rsi_period)
+
+    def _build_macd(self) -> None:
+        macd_line, signal_line, histogram = _macd(self.close)
+        self._columns['macd'] = macd_line
+        self._columns['macd_signal'] = signal_line
+        self._columns['macd_hist'] = histogram
+
+    def _build_kdj(self) -> None:
+        k, d, j = _kdj_from_range(
+            self.close,
+            self._rolling('min', self.kdj_period, 'low'),
+            self._rolling('max', self.kdj_period, 'high'),
+            self.kdj_period
+        )
+        self._columns['k'] = k
+        self._columns['d'] = d
+        self._columns['j'] = j
+
+    def _build_bollinger(self) -> None:
+        upper, middle, lower, bandwidth, percent_b = _bollinger_from_stats(
+            self.close,
+            self._rolling('mean', self.bollinger_window),
+            self._rolling('std', self.bollinger_window),
+            self.bollinger_std
+        )
+        self._columns['bb_upper'] = upper
+        self._columns['bb_middle'] = middle
+        self._columns['bb_lower'] = lower
+        self._columns['bb_bandwidth'] = bandwidth
+        self._columns['bb_percent_b'] = percent_b
+
+    def _build_atr(self) -> None:
+        tr = _true_range(self.high, self.low, self.close)
+        atr = pd.Series(tr).rolling(window=self.atr_period).mean().to_numpy(dtype=np.float64)
+        self._columns['true_range'] = tr
+        self._columns['atr'] = atr
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self._columns['atr_pct'] = (atr / self.close) * 100
@@ -12,20 +12,18 @@ import pandas as pd
 import numpy as np
 
 
-def calculate_macd(prices: pd.Series) -> tuple:
+def _macd(prices: np.ndarray) -> tuple:
     """
-    计算MACD指标
+    基于NumPy数组计算完整的MACD序列
     
     参数:
-        prices: 价格序列，通常使用收盘价
+        prices: 价格数组
         
     返回:
-        tuple: (MACD线, 信号线, 柱状图)
+        tuple: (MACD线数组, 信号线数组, 柱状图数组)，预热期为NaN
     """
-    # 确保数据足够长
-    if len(prices) < 26:
-        return 0.0, 0.0, 0.0
-        
+    prices = pd.Series(prices, dtype=np.float64)
+    
     # 计算快速和慢速EMA
     ema12 = prices.ewm(span=12, adjust=False, min_periods=12).mean()
     ema26 = prices.ewm(span=26, adjust=False, min_periods=26).mean()
@@ -39,7 +37,121 @@ def calculate_macd(prices: pd.Series) -> tuple:
     # 计算柱状图 (MACD Histogram)
     histogram = macd_line - signal_line
     
-    return float(macd_line.iloc[-1]), float(signal_line.iloc[-1]), float(histogram.iloc[-1])
+    return macd_line.to_numpy(), signal_line.to_numpy(), histogram.to_numpy()
+
+
+def calculate_macd(prices: pd.Series) -> tuple:
+    """
+    计算MACD指标
+    
+    参数:
+        prices: 价格序列，通常使用收盘价
+        
+    返回:
+        tuple: (MACD线, 信号线, 柱状图)
+    """
+    # 确保数据足够长
+    if len(prices) < 26:
+        return 0.0, 0.0, 0.0
+    
+    macd_line, signal_line, histogram = _macd(prices.to_numpy(dtype=np.float64))
+    
+    return float(macd_line[-1]), float(signal_line[-1]), float(histogram[-1])
+
+
+def _recursive_filter(values: np.ndarray, alpha: float, initial: float) -> np.ndarray:
+    """
+    一阶递归滤波 y[t] = (1 - alpha) * y[t-1] + alpha * x[t]，其中y[-1] = initial
+    
+    将初始值放在序列首位后交由pandas的ewm(adjust=False)一次完成递推，
+    避免逐元素的Python循环。
+    
+    参数:
+        values: 一维输入数组
+        alpha: 平滑系数
+        initial: 递推的初始值
+        
+    返回:
+        np.ndarray: 与输入等长的滤波结果
+    """
+    seeded = np.empty(len(values) + 1)
+    seeded[0] = initial
+    seeded[1:] = values
+    return pd.Series(seeded).ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:]
+
+
+def _kdj(high: np.ndarray, low: np.ndarray, close: np.ndarray, n: int = 9) -> tuple:
+    """
+    基于NumPy数组计算完整的K、D、J序列
+    
+    K、D的递推平滑 K[i] = 2/3 * K[i-1] + 1/3 * RSV[i] 作为一阶IIR滤波一次完成。
+    
+    参数:
+        high: 最高价数组
+        low: 最低价数组
+        close: 收盘价数组
+        n: 周期，默认9日
+        
+    返回:
+        tuple: (K数组, D数组, J数组)，均已裁剪到0-100
+    """
+    low_list = pd.Series(low, dtype=np.float64).rolling(window=n).min().to_numpy()
+    high_list = pd.Series(high, dtype=np.float64).rolling(window=n).max().to_numpy()
+    return _kdj_from_range(close, low_list, high_list, n)
+
+
+def _kdj_from_range(close: np.ndarray, low_list: np.ndarray, high_list: np.ndarray, n: int = 9) -> tuple:
+    """
+    基于n日最低价和最高价计算K、D、J序列
+    
+    参数:
+        close: 收盘价数组
+        low_list: n日滚动最低价数组
+        high_list: n日滚动最高价数组
+        n: 周期，默认9日
+        
+    返回:
+        tuple: (K数组, D数组, J数组)，均已裁剪到0-100
+    """
+    close = np.asarray(close, dtype=np.float64)
+    length = len(close)
+    
+    # 计算RSV值 (Raw Stochastic Value)，避免除以零错误
+    rsv = np.zeros(length)
+    valid_idx = high_list != low_list
+    rsv[valid_idx] = (close[valid_idx] - low_list[valid_idx]) / (high_list[valid_idx] - low_list[valid_idx]) * 100
+    
+    # 前n个位置保持初始值50，之后递推
+    k = np.full(length, 50.0)
+    d = np.full(length, 50.0)
+    if length > n:
+        k[n:] = _recursive_filter(rsv[n:], 1 / 3, 50.0)
+        d[n:] = _recursive_filter(k[n:], 1 / 3, 50.0)
+    
+    j = 3 * k - 2 * d
+    
+    # 处理极端值
+    return np.clip(k, 0, 100), np.clip(d, 0, 100), np.clip(j, 0, 100)
+
+
+def calculate_kdj_series(high: pd.Series, low: pd.Series, close: pd.Series, n: int = 9) -> tuple:
+    """
+    计算完整的KDJ序列
+    
+    参数:
+        high: 最高价序列
+        low: 最低价序列
+        close: 收盘价序列
+        n: 周期，默认9日
+        
+    返回:
+        tuple: (K序列, D序列, J序列)，与close索引对齐
+    """
+    k, d, j = _kdj(high.to_numpy(dtype=np.float64), low.to_numpy(dtype=np.float64),
+                   close.to_numpy(dtype=np.float64), n)
+    return (pd.Series(k, index=close.index),
+            pd.Series(d, index=close.index),
+            pd.Series(j, index=close.index))
 
 
 def calculate_kdj(high: pd.Series, low: pd.Series, close: pd.Series, n: int = 9) -> tuple:
@@ -55,32 +167,97 @@ def calculate_kdj(high: pd.Series, low: pd.Series, close: pd.Series, n: int = 9)
     返回:
         tuple: (K值, D值, J值)
     """
-    # 计算RSV值 (Raw Stochastic Value)
-    low_list = low.rolling(window=n).min()
-    high_list = high.rolling(window=n).max()
+    k, d, j = _kdj(high.to_numpy(dtype=np.float64), low.to_numpy(dtype=np.float64),
+                   close.to_numpy(dtype=np.float64), n)
     
-    # 避免除以零错误
-    rsv = pd.Series(0.0, index=close.index)
-    valid_idx = high_list != low_list
-    rsv[valid_idx] = (close[valid_idx] - low_list[valid_idx]) / (high_list[valid_idx] - low_list[valid_idx]) * 100
+    return float(k[-1]), float(d[-1]), float(j[-1])
+
+
+def _wilder_smooth(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    Wilder平滑（递归滤波）
     
-    # 初始化K、D值
-    k = pd.Series(50.0, index=close.index)
-    d = pd.Series(50.0, index=close.index)
+    以前period个值的简单平均作为初始值，之后按
+    avg[t] = (avg[t-1] * (period - 1) + x[t]) / period 递推，
+    即alpha=1/period的一阶递归滤波。
     
-    # 计算K、D、J值
-    for i in range(n, len(close)):
-        k.iloc[i] = 2/3 * k.iloc[i-1] + 1/3 * rsv.iloc[i]
-        d.iloc[i] = 2/3 * d.iloc[i-1] + 1/3 * k.iloc[i]
+    参数:
+        values: 一维数组
+        period: 平滑周期
+        
+    返回:
+        np.ndarray: 与输入等长的数组，前period-1个位置为NaN
+    """
+    values = np.asarray(values, dtype=np.float64)
+    smoothed = np.full(len(values), np.nan)
+    if len(values) < period:
+        return smoothed
+    
+    # 以前period个值的平均作为种子，其后的值参与递推
+    smoothed[period - 1] = values[:period].mean()
+    smoothed[period:] = _recursive_filter(values[period:], 1.0 / period, smoothed[period - 1])
+    return smoothed
+
+
+def _wilder_rsi(prices: np.ndarray, period: int = 14) -> np.ndarray:
+    """
+    基于NumPy数组计算完整的Wilder RSI序列
     
-    j = 3 * k - 2 * d
+    参数:
+        prices: 价格数组
+        period: 周期，默认14日
+        
+    返回:
+        np.ndarray: RSI数组，前period个位置为NaN
+    """
+    return _wilder_rsi_from_delta(np.diff(np.asarray(prices, dtype=np.float64)), period)
+
+
+def _wilder_rsi_from_delta(delta: np.ndarray, period: int = 14) -> np.ndarray:
+    """
+    基于价格变化数组计算Wilder RSI序列
     
-    # 处理极端值
-    k = k.clip(0, 100)
-    d = d.clip(0, 100)
-    j = j.clip(0, 100)
+    参数:
+        delta: 相邻收盘价之差，长度比价格少1
+        period: 周期，默认14日
+        
+    返回:
+        np.ndarray: 与价格等长的RSI数组，前period个位置为NaN
+    """
+    rsi = np.full(len(delta) + 1, np.nan)
+    if len(delta) < period:
+        return rsi
     
-    return float(k.iloc[-1]), float(d.iloc[-1]), float(j.iloc[-1])
+    # 分离上涨和下跌
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    
+    avg_gain = _wilder_smooth(gain, period)[period - 1:]
+    avg_loss = _wilder_smooth(loss, period)[period - 1:]
+    
+    # 平均跌幅为零时RSI记为100
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain / avg_loss
+        values = 100 - (100 / (1 + rs))
+    rsi[period:] = np.where(avg_loss == 0, 100.0, values)
+    
+    return rsi
+
+
+def calculate_rsi_series(prices: pd.Series, period: int = 14) -> pd.Series:
+    """
+    计算完整的相对强弱指数(RSI)序列
+    
+    使用Wilder平滑方法，结果的最后一个值与calculate_rsi一致。
+    
+    参数:
+        prices: 价格序列，通常使用收盘价
+        period: 周期，默认14日
+        
+    返回:
+        pd.Series: 与prices索引对齐的RSI序列，数据不足的位置为NaN
+    """
+    return pd.Series(_wilder_rsi(prices.to_numpy(dtype=np.float64), period), index=prices.index)
 
 
 def calculate_rsi(prices: pd.Series, period: int = 14) -> float:
@@ -97,35 +274,8 @@ def calculate_rsi(prices: pd.Series, period: int = 14) -> float:
     # 确保数据足够长
     if len(prices) <= period:
         return 50.0  # 数据不足时返回中性值
-        
-    # 计算价格变化
-    delta = prices.diff().dropna()
-    
-    # 分离上涨和下跌
-    gain = delta.copy()
-    loss = delta.copy()
-    gain[gain < 0] = 0
-    loss[loss > 0] = 0
-    loss = abs(loss)
     
-    # 计算初始平均值
-    avg_gain = gain.rolling(window=period).mean().iloc[period-1]
-    avg_loss = loss.rolling(window=period).mean().iloc[period-1]
-    
-    # 使用Wilder平滑方法计算后续值
-    for i in range(period, len(delta)):
-        avg_gain = (avg_gain * (period - 1) + gain.iloc[i]) / period
-        avg_loss = (avg_loss * (period - 1) + loss.iloc[i]) / period
-    
-    # 避免除以零
-    if avg_loss == 0:
-        return 100.0
-        
-    # 计算相对强度和RSI
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    
-    return float(rsi)
+    return float(_wilder_rsi(prices.to_numpy(dtype=np.float64), period)[-1])
 
 
 def calculate_dynamic_rsi_thresholds(high: pd.Series, low: pd.Series, close: pd.Series, 
@@ -154,35 +304,98 @@ def calculate_dynamic_rsi_thresholds(high: pd.Series, low: pd.Series, close: pd.
     rsi = calculate_rsi(close, rsi_period)
     
     # 计算ATR
-    tr1 = high - low
-    tr2 = abs(high - close.shift())
-    tr3 = abs(low - close.shift())
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-    
+    tr = pd.Series(_true_range(high.to_numpy(dtype=np.float64), low.to_numpy(dtype=np.float64),
+                               close.to_numpy(dtype=np.float64)), index=close.index)
     atr = tr.rolling(window=atr_period).mean()
     
     # 计算ATR占价格的百分比
     atr_pct = (atr / close) * 100
     
     # 计算波动率的历史百分位
-    volatility_percentile = 0.5  # 默认值
+    volatility_percentile = _latest_volatility_percentile(atr_pct.to_numpy(dtype=np.float64), lookback_period)
+    
+    oversold, overbought = _adjust_rsi_thresholds(volatility_percentile, max_adjustment)
+    
+    return float(rsi), float(oversold), float(overbought), float(volatility_percentile)
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """
+    计算真实波动幅度(TR)
+    
+    TR取当日振幅、当日最高价与前收盘价之差、当日最低价与前收盘价之差三者的最大值，
+    首日没有前收盘价时取当日振幅。
+    
+    参数:
+        high: 最高价数组
+        low: 最低价数组
+        close: 收盘价数组
+        
+    返回:
+        np.ndarray: TR数组
+    """
+    prev_close = np.empty(np.shape(close))
+    prev_close[:1] = np.nan
+    prev_close[1:] = close[:-1]
+    
+    tr = np.fmax(high - low, np.abs(high - prev_close))
+    return np.fmax(tr, np.abs(low - prev_close))
+
+
+def _latest_volatility_percentile(atr_pct: np.ndarray, lookback_period: int = 252) -> float:
+    """
+    计算最新ATR百分比在最近lookback_period日中的百分位
     
-    if len(atr_pct.dropna()) > lookback_period:
-        recent_window = atr_pct.iloc[-lookback_period:]
-        current_atr_pct = atr_pct.iloc[-1]
+    参数:
+        atr_pct: ATR占价格百分比的数组
+        lookback_period: 历史回溯期
         
-        # 计算当前ATR百分比在历史数据中的百分位
-        volatility_percentile = (recent_window < current_atr_pct).mean()
+    返回:
+        float: 低于当前值的比例，有效数据不足时返回0.5
+    """
+    if np.count_nonzero(~np.isnan(atr_pct)) <= lookback_period:
+        return 0.5  # 默认值
+    
+    # 只需要最后一个窗口的百分位，一次比较即可
+    recent_window = atr_pct[-lookback_period:]
+    return float((recent_window < atr_pct[-1]).mean())
+
+
+def rolling_percentile(values: pd.Series, window: int) -> pd.Series:
+    """
+    计算每个位置的值在最近window个值（含自身）中的百分位
+    
+    基于pandas的滚动排名（有序跳表维护窗口），复杂度为O(n log w)，
+    避免对每个窗口重新构造Series并完整排序。
+    
+    参数:
+        values: 输入序列
+        window: 窗口长度
+        
+    返回:
+        pd.Series: 平均排名/窗口长度，与rolling(window).apply(lambda x: pd.Series(x).rank(pct=True).iloc[-1])一致，
+                   前window-1个位置和窗口内有NaN时为NaN
+    """
+    return pd.Series(values, dtype=np.float64).rolling(window=window).rank(pct=True)
+
+
+def _adjust_rsi_thresholds(volatility_percentile, max_adjustment: float = 15.0) -> tuple:
+    """
+    根据波动率百分位平滑调整RSI超卖/超买阈值
     
-    # 平滑地调整RSI阈值
+    参数:
+        volatility_percentile: 波动率百分位，标量或数组
+        max_adjustment: 最大阈值调整幅度
+        
+    返回:
+        tuple: (超卖阈值, 超买阈值)
+    """
     base_oversold = 30
     base_overbought = 70
     
-    # 根据波动率百分位平滑调整阈值
     oversold = base_oversold - (volatility_percentile * max_adjustment)
     overbought = base_overbought + (volatility_percentile * max_adjustment)
-    
-    return float(rsi), float(oversold), float(overbought), float(volatility_percentile)
+    return oversold, overbought
 
 
 def calculate_bollinger_bands(prices: pd.Series, window: int = 20, num_std: float = 2.0) -> tuple:
@@ -200,28 +413,326 @@ def calculate_bollinger_bands(prices: pd.Series, window: int = 20, num_std: floa
     # 确保数据足够长
     if len(prices) < window:
         return 0.0, 0.0, 0.0, 0.0, 0.0
-        
-    # 计算中轨(简单移动平均线)
-    middle = prices.rolling(window=window).mean()
     
-    # 计算标准差
-    std = prices.rolling(window=window).std()
+    # 计算中轨(简单移动平均线)和标准差
+    rolling = prices.rolling(window=window)
+    middle = rolling.mean().to_numpy(dtype=np.float64)
+    std = rolling.std().to_numpy(dtype=np.float64)
+    
+    upper, middle, lower, bandwidth, percent_b = _bollinger_from_stats(
+        prices.to_numpy(dtype=np.float64), middle, std, num_std
+    )
+    
+    # 获取最新值
+    return float(upper[-1]), float(middle[-1]), float(lower[-1]), float(bandwidth[-1]), float(percent_b[-1])
+
+
+def _bollinger_from_stats(prices: np.ndarray, middle: np.ndarray, std: np.ndarray, num_std: float = 2.0) -> tuple:
+    """
+    基于滚动均值和标准差计算布林带序列
     
+    参数:
+        prices: 价格数组
+        middle: 滚动均值数组（中轨）
+        std: 滚动标准差数组
+        num_std: 标准差倍数
+        
+    返回:
+        tuple: (上轨, 中轨, 下轨, 带宽, 百分比B) 数组
+    """
     # 计算上下轨
     upper = middle + (std * num_std)
     lower = middle - (std * num_std)
     
-    # 计算带宽 (Bandwidth)
-    bandwidth = (upper - lower) / middle
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # 计算带宽 (Bandwidth)
+        bandwidth = (upper - lower) / middle
+        
+        # 计算百分比B (%B)
+        percent_b = (prices - lower) / (upper - lower)
     
-    # 计算百分比B (%B)
-    percent_b = (prices - lower) / (upper - lower)
+    return upper, middle, lower, bandwidth, percent_b
+
+
+# ---------- 多股票面板指标 ----------
+#
+# 面板为日期×股票的二维数据，每列对应一只股票。上市较晚的股票在前面以NaN填充，
+# 各列的递推从该列第一个有效值开始，结果与对单只股票去掉这些NaN后的计算一致。
+
+
+def _as_panel(values) -> pd.DataFrame:
+    """
+    将面板数据转换为float64的DataFrame
+    """
+    if isinstance(values, pd.DataFrame):
+        return values.astype(np.float64)
+    return pd.DataFrame(np.asarray(values, dtype=np.float64))
+
+
+def _wrap_panel(values: np.ndarray, like: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame(values, index=like.index, columns=like.columns)
+
+
+def _seeded_filter_panel(values: np.ndarray, seed: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    按列执行带种子的一阶递归滤波
     
-    # 获取最新值
-    latest_upper = float(upper.iloc[-1])
-    latest_middle = float(middle.iloc[-1])
-    latest_lower = float(lower.iloc[-1])
-    latest_bandwidth = float(bandwidth.iloc[-1])
-    latest_percent_b = float(percent_b.iloc[-1])
+    每列在seed首个有效的位置以seed为初始值，之后按
+    y[t] = (1 - alpha) * y[t-1] + alpha * x[t] 递推，x为NaN时保持上一值，
+    种子之前的位置为NaN。循环只沿时间轴进行，每一步同时处理所有股票。
     
-    return latest_upper, latest_middle, latest_lower, latest_bandwidth, latest_percent_b 
\ No newline at end of file
+    参数:
+        values: 日期×股票的二维数组
+        seed: 与values同形的种子数组，每列只使用首个有效值
+        alpha: 平滑系数
+        
+    返回:
+        np.ndarray: 滤波结果
+    """
+    result = np.full(values.shape, np.nan)
+    current = np.full(values.shape[1], np.nan)
+    
+    for t in range(values.shape[0]):
+        x = values[t]
+        updated = (1 - alpha) * current + alpha * x
+        current = np.where(np.isnan(x), current, updated)
+        current = np.where(np.isnan(current), seed[t], current)
+        result[t] = current
+    return result
+
+
+def _ema_panel(values: np.ndarray, span: int, min_periods: int = 0) -> np.ndarray:
+    """
+    按列计算EMA，与pandas的ewm(span, adjust=False, min_periods)一致
+    """
+    ema = _seeded_filter_panel(values, values, 2.0 / (span + 1))
+    counts = np.cumsum(~np.isnan(values), axis=0)
+    ema[counts < min_periods] = np.nan
+    return ema
+
+
+def _rolling_mean_panel(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    按列计算滚动均值，窗口内存在NaN时结果为NaN
+    
+    使用累加和相减实现，各列先减去首个有效值以减小累加和的量级。
+    """
+    result = np.full(values.shape, np.nan)
+    if values.shape[0] < window:
+        return result
+    
+    valid = ~np.isnan(values)
+    first = valid.argmax(axis=0)
+    reference = values[first, np.arange(values.shape[1])]
+    reference = np.where(np.isnan(reference), 0.0, reference)
+    
+    totals = np.zeros((values.shape[0] + 1, values.shape[1]))
+    counts = np.zeros((values.shape[0] + 1, values.shape[1]))
+    np.cumsum(np.where(valid, values - reference, 0.0), axis=0, out=totals[1:])
+    np.cumsum(valid, axis=0, out=counts[1:])
+    
+    window_total = totals[window:] - totals[:-window]
+    window_count = counts[window:] - counts[:-window]
+    result[window - 1:] = np.where(window_count == window, window_total / window + reference, np.nan)
+    return result
+
+
+def _rolling_panel(values: np.ndarray, window: int, how: str) -> np.ndarray:
+    """
+    按列计算滚动最小值、最大值或样本标准差，窗口内存在NaN时结果为NaN
+    """
+    result = np.full(values.shape, np.nan)
+    if values.shape[0] < window:
+        return result
+    
+    windows = np.lib.stride_tricks.sliding_window_view(values, window, axis=0)
+    if how == 'min':
+        result[window - 1:] = windows.min(axis=-1)
+    elif how == 'max':
+        result[window - 1:] = windows.max(axis=-1)
+    elif how == 'std':
+        result[window - 1:] = windows.std(axis=-1, ddof=1)
+    else:
+        raise ValueError(f"不支持的滚动统计: {how}")
+    return result
+
+
+def _wilder_smooth_panel(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    按列执行Wilder平滑，以各列前period个有效值的简单平均作为初始值
+    """
+    return _seeded_filter_panel(values, _rolling_mean_panel(values, period), 1.0 / period)
+
+
+def calculate_rsi_panel(close, period: int = 14) -> pd.DataFrame:
+    """
+    计算面板中每只股票的RSI序列
+    
+    参数:
+        close: 收盘价面板（日期×股票的DataFrame或二维数组）
+        period: 周期，默认14日
+        
+    返回:
+        pd.DataFrame: RSI面板，预热期为NaN
+    """
+    close = _as_panel(close)
+    prices = close.to_numpy()
+    delta = np.full(prices.shape, np.nan)
+    delta[1:] = np.diff(prices, axis=0)
+    
+    avg_gain = _wilder_smooth_panel(np.where(delta > 0, delta, np.where(np.isnan(delta), np.nan, 0.0)), period)
+    avg_loss = _wilder_smooth_panel(np.where(delta < 0, -delta, np.where(np.isnan(delta), np.nan, 0.0)), period)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(avg_loss == 0, 100.0, 100 - 100 / (1 + avg_gain / avg_loss))
+    rsi[np.isnan(avg_loss)] = np.nan
+    return _wrap_panel(rsi, close)
+
+
+def calculate_macd_panel(close) -> tuple:
+    """
+    计算面板中每只股票的MACD序列
+    
+    参数:
+        close: 收盘价面板（日期×股票的DataFrame或二维数组）
+        
+    返回:
+        tuple: (MACD线, 信号线, 柱状图) 面板
+    """
+    close = _as_panel(close)
+    prices = close.to_numpy()
+    macd_line = _ema_panel(prices, 12, 12) - _ema_panel(prices, 26, 26)
+    signal_line = _ema_panel(macd_line, 9, 9)
+    return _wrap_panel(macd_line, close), _wrap_panel(signal_line, close), _wrap_panel(macd_line - signal_line, close)
+
+
+def calculate_kdj_panel(high, low, close, n: int = 9) -> tuple:
+    """
+    计算面板中每只股票的KDJ序列
+    
+    参数:
+        high: 最高价面板
+        low: 最低价面板
+        close: 收盘价面板
+        n: 周期，默认9日
+        
+    返回:
+        tuple: (K, D, J) 面板，均已裁剪到0-100
+    """
+    high, low, close = _as_panel(high), _as_panel(low), _as_panel(close)
+    prices = close.to_numpy()
+    low_list = _rolling_panel(low.to_numpy(), n, 'min')
+    high_list = _rolling_panel(high.to_numpy(), n, 'max')
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsv = np.where(high_list != low_list, (prices - low_list) / (high_list - low_list) * 100, 0.0)
+    
+    # 各列在第n个有效值处以50为初始值，之后按RSV递推，此前保持50
+    seed = np.where(np.isnan(low_list), np.nan, 50.0)
+    listed = np.logical_or.accumulate(~np.isnan(prices), axis=0)
+    
+    k = _seeded_filter_panel(rsv, seed, 1 / 3)
+    d = _seeded_filter_panel(k, seed, 1 / 3)
+    k = np.where(listed, np.where(np.isnan(k), 50.0, k), np.nan)
+    d = np.where(listed, np.where(np.isnan(d), 50.0, d), np.nan)
+    j = 3 * k - 2 * d
+    return tuple(_wrap_panel(np.clip(values, 0, 100), close) for values in (k, d, j))
+
+
+def calculate_bollinger_panel(close, window: int = 20, num_std: float = 2.0) -> tuple:
+    """
+    计算面板中每只股票的布林带序列
+    
+    参数:
+        close: 收盘价面板
+        window: 移动平均窗口，默认20日
+        num_std: 标准差倍数，默认2.0
+        
+    返回:
+        tuple: (上轨, 中轨, 下轨, 带宽, 百分比B) 面板
+    """
+    close = _as_panel(close)
+    prices = close.to_numpy()
+    bands = _bollinger_from_stats(
+        prices,
+        _rolling_mean_panel(prices, window),
+        _rolling_panel(prices, window, 'std'),
+        num_std
+    )
+    return tuple(_wrap_panel(values, close) for values in bands)
+
+
+def calculate_atr_panel(high, low, close, period: int = 14) -> pd.DataFrame:
+    """
+    计算面板中每只股票的Wilder ATR序列，与回测引擎中的ATR计算一致
+    
+    参数:
+        high: 最高价面板
+        low: 最低价面板
+        close: 收盘价面板
+        period: 周期，默认14日
+        
+    返回:
+        pd.DataFrame: ATR面板，预热期为NaN
+    """
+    high, low, close = _as_panel(high), _as_panel(low), _as_panel(close)
+    tr = _true_range(high.to_numpy(), low.to_numpy(), close.to_numpy())
+    return _wrap_panel(_wilder_smooth_panel(tr, period), close)
+
+
+def align_panel(histories: dict, fields: tuple = ('Open', 'High', 'Low', 'Close', 'Volume')) -> dict:
+    """
+    将多只股票的历史数据按日期对齐为面板
+    
+    参数:
+        histories: {股票代码: 历史数据DataFrame} 字典
+        fields: 需要对齐的列
+        
+    返回:
+        dict: {列名: 日期×股票的DataFrame}
+    """
+    panels = {}
+    for field in fields:
+        columns = {symbol: data[field] for symbol, data in histories.items()
+                   if data is not None and not data.empty and field in data.columns}
+        if columns:
+            panels[field] = pd.concat(columns, axis=1).sort_index()
+    return panels
+
+
+def calculate_panel_indicators(high, low, close, rsi_period: int = 14, kdj_period: int = 9,
+                               bollinger_window: int = 20, bollinger_std: float = 2.0,
+                               atr_period: int = 14,
+                               sma_windows: tuple = (5, 10, 20, 50, 200)) -> dict:
+    """
+    对整个股票池一次性计算全部技术指标
+    
+    所有计算均为二维NumPy运算，递推只沿时间轴循环、每一步同时处理所有股票，
+    解释器开销由整个股票池分摊，而不是每只股票各付一次。
+    
+    参数:
+        high: 最高价面板（日期×股票的DataFrame或二维数组）
+        low: 最低价面板
+        close: 收盘价面板
+        rsi_period: RSI周期
+        kdj_period: KDJ周期
+        bollinger_window: 布林带窗口
+        bollinger_std: 布林带标准差倍数
+        atr_period: ATR周期
+        sma_windows: 简单移动平均线窗口
+        
+    返回:
+        dict: {指标列名: 面板}，列名与IndicatorFrame一致
+    """
+    high, low, close = _as_panel(high), _as_panel(low), _as_panel(close)
+    
+    panels = {'rsi': calculate_rsi_panel(close, rsi_period)}
+    panels['macd'], panels['macd_signal'], panels['macd_hist'] = calculate_macd_panel(close)
+    panels['k'], panels['d'], panels['j'] = calculate_kdj_panel(high, low, close, kdj_period)
+    (panels['bb_upper'], panels['bb_middle'], panels['bb_lower'],
+     panels['bb_bandwidth'], panels['bb_percent_b']) = calculate_bollinger_panel(close, bollinger_window, bollinger_std)
+    panels['atr'] = calculate_atr_panel(high, low, close, atr_period)
+    prices = close.to_numpy()
+    for window in sma_windows:
+        panels[f'sma{window}'] = _wrap_panel(_rolling_mean_panel(prices, window), close)
+    return panels
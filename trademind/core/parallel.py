@@ -0,0 +1,164 @@
+"""
+TradeMind Lite（轻量版）- 多进程分析模块
+
+本模块支持把多只股票的分析分散到进程池中执行。主进程把每只股票的OHLCV数据写入一块共享内存，
+任务只携带共享内存的描述信息；工作进程读取数据后调用StockAnalyzer.analyze_history，
+并把指标集合换成只含最新值的精简字典后返回，避免在进程间传递完整的指标序列。
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+from typing import Dict, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+from trademind.core.indicator_frame import IndicatorFrame
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+# 工作进程中的分析器实例
+_worker_analyzer = None
+
+
+def share_history(data: pd.DataFrame) -> Tuple[shared_memory.SharedMemory, Dict]:
+    """
+    把历史数据的数值列写入共享内存
+
+    共享内存的前len(data)个int64为日期索引，其后是形状为(列数, 行数)的float64矩阵。
+    非数值列不参与分析，不会写入。
+
+    参数:
+        data: OHLCV历史数据
+
+    返回:
+        Tuple[SharedMemory, Dict]: 共享内存块和工作进程读取数据所需的描述信息（可序列化）
+    """
+    numeric = data.select_dtypes(include='number')
+    rows = len(numeric)
+    columns = list(numeric.columns)
+    block = shared_memory.SharedMemory(create=True, size=max((len(columns) + 1) * rows * 8, 1))
+
+    descriptor = {
+        'name': block.name,
+        'rows': rows,
+        'columns': columns,
+        'dtypes': [str(dtype) for dtype in numeric.dtypes],
+        'index_name': data.index.name,
+        'tz': None,
+        'unit': None,
+        'index': None
+    }
+    if isinstance(data.index, pd.DatetimeIndex):
+        np.ndarray((rows,), dtype=np.int64, buffer=block.buf)[:] = data.index.asi8
+        descriptor['tz'] = str(data.index.tz) if data.index.tz is not None else None
+        descriptor['unit'] = data.index.unit
+    else:
+        descriptor['index'] = list(data.index)
+
+    if columns:
+        matrix = np.ndarray((len(columns), rows), dtype=np.float64, buffer=block.buf, offset=rows * 8)
+        matrix[:] = numeric.to_numpy(dtype=np.float64, na_value=np.nan).T
+        del matrix
+    return block, descriptor
+
+
+def attach_history(descriptor: Dict) -> pd.DataFrame:
+    """
+    从共享内存读取share_history写入的历史数据
+
+    数据会被复制出来，返回后即可释放共享内存。
+
+    参数:
+        descriptor: share_history返回的描述信息
+
+    返回:
+        pd.DataFrame: 历史数据
+    """
+    rows = descriptor['rows']
+    columns = descriptor['columns']
+    # 工作进程与主进程共用同一个resource_tracker，共享内存由主进程负责释放
+    block = shared_memory.SharedMemory(name=descriptor['name'])
+    try:
+        if descriptor['unit'] is not None:
+            timestamps = np.ndarray((rows,), dtype=np.int64, buffer=block.buf).copy()
+            index = pd.DatetimeIndex(timestamps.view(f"M8[{descriptor['unit']}]"))
+            if descriptor['tz'] is not None:
+                index = index.tz_localize('UTC').tz_convert(descriptor['tz'])
+        else:
+            index = pd.Index(descriptor['index'])
+        index.name = descriptor['index_name']
+
+        if columns:
+            values = np.ndarray((len(columns), rows), dtype=np.float64, buffer=block.buf,
+                                offset=rows * 8).T.copy()
+        else:
+            values = np.empty((rows, 0))
+    finally:
+        block.close()
+
+    data = pd.DataFrame(values, index=index, columns=columns)
+    return data.astype(dict(zip(columns, descriptor['dtypes'])))
+
+
+def release_history(block: shared_memory.SharedMemory) -> None:
+    """
+    释放share_history创建的共享内存
+    """
+    block.close()
+    block.unlink()
+
+
+def compact_result(result: Dict) -> Dict:
+    """
+    把分析结果中的指标集合替换为只含最新值的字典
+    """
+    indicators = result.get('indicators')
+    if isinstance(indicators, IndicatorFrame):
+        result = dict(result, indicators=indicators.latest_values())
+    return result
+
+
+def _init_worker() -> None:
+    """
+    工作进程初始化：创建分析器
+    """
+    global _worker_analyzer
+    from trademind.core.analyzer import StockAnalyzer
+
+    _worker_analyzer = StockAnalyzer()
+
+
+def analyze_shared(symbol: str, name: str, descriptor: Dict) -> Dict:
+    """
+    在工作进程中分析共享内存中的一只股票
+
+    参数:
+        symbol: 股票代码
+        name: 股票名称
+        descriptor: share_history返回的描述信息
+
+    返回:
+        Dict: 精简后的分析结果
+    """
+    hist = attach_history(descriptor)
+    return compact_result(_worker_analyzer.analyze_history(symbol, name, hist))
+
+
+def create_analysis_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    创建分析用的进程池
+
+    使用spawn方式启动工作进程：主进程中同时运行着获取数据的线程，
+    fork可能复制其他线程持有的锁；spawn在各平台上的行为也保持一致。
+
+    参数:
+        workers: 工作进程数
+
+    返回:
+        ProcessPoolExecutor: 进程池
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'),
+                               initializer=_init_worker)
@@ -6,6 +6,7 @@ TradeMind Lite（轻量版）- 形态识别模块
 
 from dataclasses import dataclass
 from typing import List
+import numpy as np
 import pandas as pd
 
 
@@ -24,6 +25,108 @@ class TechnicalPattern:
     description: str
 
 
+# 形态名称、描述，顺序与识别结果中的顺序一致
+PATTERN_DESCRIPTIONS = {
+    "看跌十字星": "开盘价和收盘价接近，位于上升趋势之后，可能预示着反转",
+    "看涨十字星": "开盘价和收盘价接近，位于下降趋势之后，可能预示着反转",
+    "十字星": "开盘价和收盘价接近，表示市场犹豫不决",
+    "锤子线": "下影线较长，可能预示着底部反转",
+    "吊颈线": "上影线较长，可能预示着顶部反转",
+    "启明星": "三日反转形态，预示着可能的底部反转",
+    "黄昏星": "三日反转形态，预示着可能的顶部反转",
+    "看涨吞没": "两日反转形态，当天阳线吞没前一天阴线，预示着可能的底部反转",
+    "看跌吞没": "两日反转形态，当天阴线吞没前一天阳线，预示着可能的顶部反转",
+}
+
+# 看涨和看跌形态，便于将形态矩阵转换为回测信号
+BULLISH_PATTERNS = ("看涨十字星", "锤子线", "启明星", "看涨吞没")
+BEARISH_PATTERNS = ("看跌十字星", "吊颈线", "黄昏星", "看跌吞没")
+
+
+def _shift(values: np.ndarray, periods: int) -> np.ndarray:
+    """将数组向后平移periods位，空出的位置填充NaN"""
+    shifted = np.full(len(values), np.nan)
+    if periods < len(values):
+        shifted[periods:] = values[:len(values) - periods]
+    return shifted
+
+
+def scan_candlestick_patterns(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    在全部历史K线上识别蜡烛图形态。
+    
+    每根K线都按与identify_candlestick_patterns相同的规则判断，以该K线及其之前
+    的K线作为上下文，全部使用平移后的NumPy数组一次完成，可直接作为回测输入。
+    
+    参数:
+        data: 包含OHLC数据的DataFrame
+        
+    返回:
+        pd.DataFrame: 与data同索引的形态矩阵，每列对应一种形态，
+                      取值为置信度（0表示未出现），前4根K线上下文不足，均为0
+    """
+    open_price = data['Open'].to_numpy(dtype=np.float64)
+    close = data['Close'].to_numpy(dtype=np.float64)
+    high = data['High'].to_numpy(dtype=np.float64)
+    low = data['Low'].to_numpy(dtype=np.float64)
+    
+    prev_open, prev_close = _shift(open_price, 1), _shift(close, 1)
+    prev2_open, prev2_close = _shift(open_price, 2), _shift(close, 2)
+    
+    body = np.abs(open_price - close)
+    upper_shadow = high - np.maximum(open_price, close)
+    lower_shadow = np.minimum(open_price, close) - low
+    total_length = high - low
+    
+    # 最近5根K线的平均波动范围，以及最近5日与之前5日（不足时取已有数据）的平均收盘价
+    close_series = pd.Series(close)
+    # min_periods=1使窗口内的NaN被跳过，与Series.mean()一致
+    avg_range = pd.Series(total_length).rolling(window=5, min_periods=1).mean().to_numpy()
+    recent_mean = close_series.rolling(window=5, min_periods=1).mean().to_numpy()
+    earlier_mean = close_series.rolling(window=5, min_periods=1).mean().shift(5).to_numpy()
+    
+    bullish = close > open_price
+    bearish = close < open_price
+    prev_bullish = prev_close > prev_open
+    prev_bearish = prev_close < prev_open
+    
+    matrix = {}
+    
+    # 十字星形态
+    doji = (body <= total_length * 0.15) & (total_length >= avg_range * 0.8)
+    bearish_doji = doji & prev_bullish & bearish
+    bullish_doji = doji & ~bearish_doji & prev_bearish & bullish
+    matrix["看跌十字星"] = np.where(bearish_doji, 80, 0)
+    matrix["看涨十字星"] = np.where(bullish_doji, 80, 0)
+    matrix["十字星"] = np.where(doji & ~bearish_doji & ~bullish_doji, 70, 0)
+    
+    # 锤子线和吊颈线，趋势与形态含义相反时降低置信度
+    hammer = (lower_shadow > body * 2) & (upper_shadow < body * 0.3) & (body > 0)
+    matrix["锤子线"] = np.where(hammer, np.where(recent_mean > earlier_mean, 60, 85), 0)
+    hanging_man = (upper_shadow > body * 2) & (lower_shadow < body * 0.3) & (body > 0)
+    matrix["吊颈线"] = np.where(hanging_man, np.where(recent_mean < earlier_mean, 60, 85), 0)
+    
+    # 启明星和黄昏星
+    small_middle = np.abs(prev_close - prev_open) < np.abs(prev2_close - prev2_open) * 0.5
+    first_midpoint = (prev2_open + prev2_close) / 2
+    morning_star = (prev2_close < prev2_open) & small_middle & bullish & (close > first_midpoint)
+    evening_star = (prev2_close > prev2_open) & small_middle & bearish & (close < first_midpoint)
+    matrix["启明星"] = np.where(morning_star, 85, 0)
+    matrix["黄昏星"] = np.where(evening_star, 85, 0)
+    
+    # 吞没形态
+    bullish_engulfing = prev_bearish & bullish & (open_price < prev_close) & (close > prev_open)
+    bearish_engulfing = prev_bullish & bearish & (open_price > prev_close) & (close < prev_open)
+    matrix["看涨吞没"] = np.where(bullish_engulfing, 80, 0)
+    matrix["看跌吞没"] = np.where(bearish_engulfing, 80, 0)
+    
+    result = pd.DataFrame(matrix, index=data.index, columns=list(PATTERN_DESCRIPTIONS)).astype(np.uint8)
+    
+    # 至少需要5根K线的上下文
+    result.iloc[:4] = 0
+    return result
+
+
 def identify_candlestick_patterns(data: pd.DataFrame) -> List[TechnicalPattern]:
     """
     识别K线图中的蜡烛图形态。
@@ -32,130 +135,15 @@ def identify_candlestick_patterns(data: pd.DataFrame) -> List[TechnicalPattern]:
         data: 包含OHLC数据的DataFrame，至少需要5根K线
         
     返回:
-        List[TechnicalPattern]: 识别出的形态列表
+        List[TechnicalPattern]: 最新一根K线上识别出的形态列表
     """
-    patterns = []
-    
     if len(data) < 5:  # 增加到5根K线以获取更多上下文
-        return patterns
-    
-    # 获取最近的K线数据
-    latest = data.iloc[-1]
-    prev = data.iloc[-2]
-    prev2 = data.iloc[-3]
-    prev3 = data.iloc[-4]
-    prev4 = data.iloc[-5]
-    
-    open_price = latest['Open']
-    close = latest['Close']
-    high = latest['High']
-    low = latest['Low']
-    
-    body = abs(open_price - close)
-    upper_shadow = high - max(open_price, close)
-    lower_shadow = min(open_price, close) - low
-    total_length = high - low
+        return []
     
-    # 计算前几天的平均波动范围作为参考
-    avg_range = (data['High'] - data['Low']).iloc[-5:].mean()
-    
-    # 十字星形态 - 改进判断标准
-    if body <= total_length * 0.15 and total_length >= avg_range * 0.8:
-        # 增加位置判断，提高准确性
-        if prev['Close'] > prev['Open'] and close < open_price:  # 可能是看跌十字星
-            patterns.append(TechnicalPattern(
-                name="看跌十字星",
-                confidence=80,
-                description="开盘价和收盘价接近，位于上升趋势之后，可能预示着反转"
-            ))
-        elif prev['Close'] < prev['Open'] and close > open_price:  # 可能是看涨十字星
-            patterns.append(TechnicalPattern(
-                name="看涨十字星",
-                confidence=80,
-                description="开盘价和收盘价接近，位于下降趋势之后，可能预示着反转"
-            ))
-        else:
-            patterns.append(TechnicalPattern(
-                name="十字星",
-                confidence=70,
-                description="开盘价和收盘价接近，表示市场犹豫不决"
-            ))
-    
-    # 锤子线 - 改进判断标准
-    if (lower_shadow > body * 2) and (upper_shadow < body * 0.3) and (body > 0):
-        # 增加趋势确认
-        if data['Close'].iloc[-5:].mean() > data['Close'].iloc[-10:-5].mean():
-            confidence = 60  # 在上升趋势中出现锤子线，降低置信度
-        else:
-            confidence = 85  # 在下降趋势中出现锤子线，提高置信度
-            
-        patterns.append(TechnicalPattern(
-            name="锤子线",
-            confidence=confidence,
-            description="下影线较长，可能预示着底部反转"
-        ))
-    
-    # 吊颈线 - 改进判断标准
-    if (upper_shadow > body * 2) and (lower_shadow < body * 0.3) and (body > 0):
-        # 增加趋势确认
-        if data['Close'].iloc[-5:].mean() < data['Close'].iloc[-10:-5].mean():
-            confidence = 60  # 在下降趋势中出现吊颈线，降低置信度
-        else:
-            confidence = 85  # 在上升趋势中出现吊颈线，提高置信度
-            
-        patterns.append(TechnicalPattern(
-            name="吊颈线",
-            confidence=confidence,
-            description="上影线较长，可能预示着顶部反转"
-        ))
-    
-    # 增加启明星形态识别
-    if (len(data) >= 5 and 
-        prev2['Close'] < prev2['Open'] and  # 第一天是阴线
-        abs(prev['Close'] - prev['Open']) < abs(prev2['Close'] - prev2['Open']) * 0.5 and  # 第二天是小实体
-        close > open_price and  # 第三天是阳线
-        close > (prev2['Open'] + prev2['Close']) / 2):  # 第三天收盘价高于第一天实体中点
-        
-        patterns.append(TechnicalPattern(
-            name="启明星",
-            confidence=85,
-            description="三日反转形态，预示着可能的底部反转"
-        ))
-    
-    # 增加黄昏星形态识别
-    if (len(data) >= 5 and 
-        prev2['Close'] > prev2['Open'] and  # 第一天是阳线
-        abs(prev['Close'] - prev['Open']) < abs(prev2['Close'] - prev2['Open']) * 0.5 and  # 第二天是小实体
-        close < open_price and  # 第三天是阴线
-        close < (prev2['Open'] + prev2['Close']) / 2):  # 第三天收盘价低于第一天实体中点
-        
-        patterns.append(TechnicalPattern(
-            name="黄昏星",
-            confidence=85,
-            description="三日反转形态，预示着可能的顶部反转"
-        ))
-    
-    # 增加吞没形态识别
-    if (prev['Close'] < prev['Open'] and  # 前一天是阴线
-        close > open_price and  # 当天是阳线
-        open_price < prev['Close'] and  # 当天开盘价低于前一天收盘价
-        close > prev['Open']):  # 当天收盘价高于前一天开盘价
-        
-        patterns.append(TechnicalPattern(
-            name="看涨吞没",
-            confidence=80,
-            description="两日反转形态，当天阳线吞没前一天阴线，预示着可能的底部反转"
-        ))
-    
-    if (prev['Close'] > prev['Open'] and  # 前一天是阳线
-        close < open_price and  # 当天是阴线
-        open_price > prev['Close'] and  # 当天开盘价高于前一天收盘价
-        close < prev['Open']):  # 当天收盘价低于前一天开盘价
-        
-        patterns.append(TechnicalPattern(
-            name="看跌吞没",
-            confidence=80,
-            description="两日反转形态，当天阴线吞没前一天阳线，预示着可能的顶部反转"
-        ))
+    # 最近10根K线足以覆盖最新一根K线的全部上下文
+    latest = scan_candlestick_patterns(data.iloc[-10:]).iloc[-1]
     
-    return patterns 
\ No newline at end of file
+    return [
+        TechnicalPattern(name=name, confidence=int(confidence), description=PATTERN_DESCRIPTIONS[name])
+        for name, confidence in latest.items() if confidence > 0
+    ]
@@ -8,6 +8,7 @@ from typing import Dict, List, Optional, Tuple
 import pandas as pd
 import numpy as np
 from .patterns import TechnicalPattern
+from .indicator_frame import IndicatorFrame
 
 
 def generate_signals(data: pd.DataFrame, indicators: Dict) -> pd.DataFrame:
@@ -16,11 +17,15 @@ def generate_signals(data: pd.DataFrame, indicators: Dict) -> pd.DataFrame:
     
     参数:
         data: 包含OHLCV数据的DataFrame
-        indicators: 包含各种技术指标的字典
+        indicators: 包含各种技术指标的字典，或IndicatorFrame
         
     返回:
         pd.DataFrame: 包含买入和卖出信号的DataFrame
     """
+    if isinstance(indicators, IndicatorFrame):
+        # 使用完整的指标序列，使MACD、布林带和均线的交叉判断基于逐日数值
+        indicators = indicators.signal_inputs()
+    
     if data.empty or len(data) < 10:
         signals = pd.DataFrame(index=data.index if not data.empty else [pd.Timestamp.now()])
         signals['close'] = 100.0
@@ -48,8 +53,8 @@ def generate_signals(data: pd.DataFrame, indicators: Dict) -> pd.DataFrame:
     low = data['Low']
     volume = data.get('Volume', pd.Series(np.nan, index=close.index))
     
-    # 提取技术指标
-    rsi = indicators.get('rsi', pd.Series(np.nan, index=close.index))
+    # 提取技术指标，优先使用完整的RSI序列，使交叉判断基于逐日数值
+    rsi = indicators.get('rsi_series', indicators.get('rsi', pd.Series(np.nan, index=close.index)))
     
     # 提取动态RSI阈值（如果有）
     dynamic_rsi = indicators.get('dynamic_rsi', {})
@@ -0,0 +1,386 @@
+"""
+TradeMind Lite（轻量版）- 增量指标模块
+
+本模块提供可恢复的指标状态对象，包括MACD的EMA、Wilder RSI均值、KDJ的K/D值、
+布林带滚动和以及ATR。状态可以序列化后与缓存数据一起保存，收盘后只需输入新增的K线，
+即可得到与trademind.core.indicators一致的最新指标值。
+"""
+
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def _clip(value: float) -> float:
+    return float(min(max(value, 0.0), 100.0))
+
+
+@dataclass
+class EMAState:
+    """指数移动平均状态，与pandas的ewm(span, adjust=False)递推一致"""
+    span: int
+    value: float = float('nan')
+    count: int = 0
+
+    def update(self, price: float) -> float:
+        alpha = 2.0 / (self.span + 1)
+        if self.count == 0:
+            self.value = float(price)
+        else:
+            self.value = (1 - alpha) * self.value + alpha * price
+        self.count += 1
+        return self.value if self.count >= self.span else float('nan')
+
+
+@dataclass
+class MACDState:
+    """MACD状态，与calculate_macd一致"""
+    fast: EMAState = field(default_factory=lambda: EMAState(12))
+    slow: EMAState = field(default_factory=lambda: EMAState(26))
+    signal: EMAState = field(default_factory=lambda: EMAState(9))
+    macd: float = float('nan')
+    signal_value: float = float('nan')
+
+    def update(self, price: float) -> None:
+        fast = self.fast.update(price)
+        slow = self.slow.update(price)
+        self.macd = fast - slow
+        # 信号线从第一个有效的MACD值开始递推
+        if not np.isnan(self.macd):
+            self.signal_value = self.signal.update(self.macd)
+
+    def value(self) -> tuple:
+        """
+        返回:
+            tuple: (MACD线, 信号线, 柱状图)，数据不足26个时返回0
+        """
+        if self.slow.count < 26:
+            return 0.0, 0.0, 0.0
+        return float(self.macd), float(self.signal_value), float(self.macd - self.signal_value)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'MACDState':
+        data = dict(data)
+        for key in ('fast', 'slow', 'signal'):
+            data[key] = EMAState(**data[key])
+        return cls(**data)
+
+
+@dataclass
+class RSIState:
+    """Wilder RSI状态，与calculate_rsi一致"""
+    period: int = 14
+    prev_close: float = float('nan')
+    count: int = 0
+    gain_sum: float = 0.0
+    loss_sum: float = 0.0
+    avg_gain: float = float('nan')
+    avg_loss: float = float('nan')
+
+    def update(self, price: float) -> None:
+        if self.count > 0:
+            delta = price - self.prev_close
+            gain = max(delta, 0.0)
+            loss = max(-delta, 0.0)
+            if self.count <= self.period:
+                # 前period个变化取简单平均作为初始值
+                self.gain_sum += gain
+                self.loss_sum += loss
+                if self.count == self.period:
+                    self.avg_gain = self.gain_sum / self.period
+                    self.avg_loss = self.loss_sum / self.period
+            else:
+                alpha = 1.0 / self.period
+                self.avg_gain = (1 - alpha) * self.avg_gain + alpha * gain
+                self.avg_loss = (1 - alpha) * self.avg_loss + alpha * loss
+        self.prev_close = float(price)
+        self.count += 1
+
+    def value(self) -> float:
+        """
+        返回:
+            float: 最新RSI值，数据不足时返回50
+        """
+        if self.count <= self.period:
+            return 50.0
+        if self.avg_loss == 0:
+            return 100.0
+        return float(100 - 100 / (1 + self.avg_gain / self.avg_loss))
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'RSIState':
+        return cls(**data)
+
+
+@dataclass
+class KDJState:
+    """KDJ状态，与calculate_kdj一致"""
+    n: int = 9
+    highs: deque = field(default_factory=deque)
+    lows: deque = field(default_factory=deque)
+    count: int = 0
+    k: float = 50.0
+    d: float = 50.0
+
+    def update(self, high: float, low: float, close: float) -> None:
+        self.highs.append(float(high))
+        self.lows.append(float(low))
+        if len(self.highs) > self.n:
+            self.highs.popleft()
+            self.lows.popleft()
+
+        if self.count >= self.n:
+            high_n = max(self.highs)
+            low_n = min(self.lows)
+            rsv = (close - low_n) / (high_n - low_n) * 100 if high_n != low_n else 0.0
+            self.k = 2 / 3 * self.k + 1 / 3 * rsv
+            self.d = 2 / 3 * self.d + 1 / 3 * self.k
+        self.count += 1
+
+    def value(self) -> tuple:
+        """
+        返回:
+            tuple: (K值, D值, J值)，均已裁剪到0-100
+        """
+        return _clip(self.k), _clip(self.d), _clip(3 * self.k - 2 * self.d)
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data['highs'] = list(self.highs)
+        data['lows'] = list(self.lows)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'KDJState':
+        data = dict(data)
+        data['highs'] = deque(data['highs'])
+        data['lows'] = deque(data['lows'])
+        return cls(**data)
+
+
+@dataclass
+class BollingerState:
+    """
+    布林带状态，与calculate_bollinger_bands一致
+
+    维护窗口内价格相对参考价的滚动和与平方和，每滚动一个完整窗口从窗口数据重新求和
+    并更新参考价，避免长期累加和大数相减带来的浮点误差。
+    """
+    window: int = 20
+    num_std: float = 2.0
+    prices: deque = field(default_factory=deque)
+    shift: float = float('nan')
+    total: float = 0.0
+    total_sq: float = 0.0
+    since_resum: int = 0
+    last_price: float = float('nan')
+
+    def update(self, price: float) -> None:
+        price = float(price)
+        if np.isnan(self.shift):
+            self.shift = price
+        self.prices.append(price)
+        deviation = price - self.shift
+        self.total += deviation
+        self.total_sq += deviation * deviation
+        if len(self.prices) > self.window:
+            old = self.prices.popleft() - self.shift
+            self.total -= old
+            self.total_sq -= old * old
+
+        self.since_resum += 1
+        if self.since_resum >= self.window:
+            values = np.fromiter(self.prices, dtype=np.float64)
+            self.shift = float(values.mean())
+            deviations = values - self.shift
+            self.total = float(deviations.sum())
+            self.total_sq = float((deviations * deviations).sum())
+            self.since_resum = 0
+        self.last_price = price
+
+    def value(self) -> tuple:
+        """
+        返回:
+            tuple: (上轨, 中轨, 下轨, 带宽, 百分比B)，数据不足时返回0
+        """
+        if len(self.prices) < self.window:
+            return 0.0, 0.0, 0.0, 0.0, 0.0
+
+        n = self.window
+        mean_deviation = self.total / n
+        middle = np.float64(self.shift + mean_deviation)
+        variance = max((self.total_sq - n * mean_deviation * mean_deviation) / (n - 1), 0.0)
+        std = np.sqrt(variance)
+
+        upper = middle + std * self.num_std
+        lower = middle - std * self.num_std
+        with np.errstate(divide='ignore', invalid='ignore'):
+            bandwidth = (upper - lower) / middle
+            percent_b = (self.last_price - lower) / (upper - lower)
+        return float(upper), float(middle), float(lower), float(bandwidth), float(percent_b)
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data['prices'] = list(self.prices)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'BollingerState':
+        data = dict(data)
+        data['prices'] = deque(data['prices'])
+        return cls(**data)
+
+
+@dataclass
+class ATRState:
+    """Wilder ATR状态，与回测引擎中的ATR计算一致"""
+    period: int = 14
+    prev_close: float = float('nan')
+    count: int = 0
+    tr_sum: float = 0.0
+    atr: float = float('nan')
+
+    def update(self, high: float, low: float, close: float) -> None:
+        tr = high - low
+        if self.count > 0:
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+
+        if self.count < self.period:
+            self.tr_sum += tr
+            if self.count == self.period - 1:
+                self.atr = self.tr_sum / self.period
+        else:
+            self.atr = (self.atr * (self.period - 1) + tr) / self.period
+        self.prev_close = float(close)
+        self.count += 1
+
+    def value(self) -> float:
+        """
+        返回:
+            float: 最新ATR值，数据不足时为NaN
+        """
+        return float(self.atr)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ATRState':
+        return cls(**data)
+
+
+class IndicatorState:
+    """
+    单只股票的增量指标状态集合
+
+    记录已处理的最后一根K线时间，重复输入已处理过的K线会被跳过，
+    因此可以直接传入包含重叠部分的新数据。
+    """
+
+    def __init__(self, macd: Optional[MACDState] = None, rsi: Optional[RSIState] = None,
+                 kdj: Optional[KDJState] = None, bollinger: Optional[BollingerState] = None,
+                 atr: Optional[ATRState] = None, last_timestamp: Optional[pd.Timestamp] = None):
+        self.macd = macd or MACDState()
+        self.rsi = rsi or RSIState()
+        self.kdj = kdj or KDJState()
+        self.bollinger = bollinger or BollingerState()
+        self.atr = atr or ATRState()
+        self.last_timestamp = last_timestamp
+
+    def update_bar(self, high: float, low: float, close: float) -> None:
+        """
+        输入一根新K线
+
+        参数:
+            high: 最高价
+            low: 最低价
+            close: 收盘价
+        """
+        self.macd.update(close)
+        self.rsi.update(close)
+        self.kdj.update(high, low, close)
+        self.bollinger.update(close)
+        self.atr.update(high, low, close)
+
+    def update(self, data: pd.DataFrame) -> int:
+        """
+        输入新增的K线数据，已处理过的K线会被跳过
+
+        参数:
+            data: 包含High、Low、Close列、按时间升序排列的DataFrame
+
+        返回:
+            int: 实际处理的K线数量
+        """
+        if self.last_timestamp is not None:
+            data = data[data.index > self.last_timestamp]
+        if data.empty:
+            return 0
+
+        for high, low, close in zip(data['High'].to_numpy(dtype=np.float64),
+                                    data['Low'].to_numpy(dtype=np.float64),
+                                    data['Close'].to_numpy(dtype=np.float64)):
+            self.update_bar(high, low, close)
+        self.last_timestamp = data.index[-1]
+        return len(data)
+
+    def snapshot(self) -> Dict:
+        """
+        获取最新指标值
+
+        返回:
+            Dict: 与指标字典结构一致的rsi、macd、kdj、bollinger，以及atr
+        """
+        macd, signal, hist = self.macd.value()
+        k, d, j = self.kdj.value()
+        upper, middle, lower, bandwidth, percent_b = self.bollinger.value()
+        return {
+            'rsi': self.rsi.value(),
+            'macd': {'macd': macd, 'signal': signal, 'hist': hist},
+            'kdj': {'k': k, 'd': d, 'j': j},
+            'bollinger': {
+                'upper': upper,
+                'middle': middle,
+                'lower': lower,
+                'bandwidth': bandwidth,
+                'percent_b': percent_b
+            },
+            'atr': self.atr.value()
+        }
+
+    def to_dict(self) -> Dict:
+        """
+        序列化为可写入JSON的字典
+        """
+        return {
+            'macd': asdict(self.macd),
+            'rsi': asdict(self.rsi),
+            'kdj': self.kdj.to_dict(),
+            'bollinger': self.bollinger.to_dict(),
+            'atr': asdict(self.atr),
+            'last_timestamp': self.last_timestamp.isoformat() if self.last_timestamp is not None else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'IndicatorState':
+        """
+        从to_dict的结果恢复状态
+        """
+        last_timestamp = data.get('last_timestamp')
+        return cls(
+            macd=MACDState.from_dict(data['macd']),
+            rsi=RSIState.from_dict(data['rsi']),
+            kdj=KDJState.from_dict(data['kdj']),
+            bollinger=BollingerState.from_dict(data['bollinger']),
+            atr=ATRState.from_dict(data['atr']),
+            last_timestamp=pd.Timestamp(last_timestamp) if last_timestamp else None
+        )
+
+    @classmethod
+    def from_history(cls, data: pd.DataFrame) -> 'IndicatorState':
+        """
+        基于完整历史数据建立状态
+        """
+        state = cls()
+        state.update(data)
+        return state
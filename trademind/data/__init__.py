@@ -6,10 +6,52 @@ TradeMind Lite（轻量版）- 数据加载模块
 
 from trademind.data.loader import (
     get_stock_data,
-    get_stock_info
+    get_stock_info,
+    get_stock_data_many,
+    get_us_stock_data_batch
+)
+from trademind.data.cache import (
+    OHLCVCache,
+    configure_cache,
+    get_cache
+)
+from trademind.data.metadata import (
+    MetadataStore,
+    configure_metadata_store,
+    get_metadata_store
+)
+from trademind.data.providers import (
+    DataProvider,
+    LiveProvider,
+    ReplayProvider,
+    RecordingProvider,
+    set_data_provider,
+    get_data_provider
+)
+from trademind.data.session import (
+    FetchSession,
+    fetch_session,
+    iter_in_session
 )
 
 __all__ = [
     'get_stock_data',
-    'get_stock_info'
+    'get_stock_info',
+    'get_stock_data_many',
+    'get_us_stock_data_batch',
+    'OHLCVCache',
+    'configure_cache',
+    'get_cache',
+    'MetadataStore',
+    'configure_metadata_store',
+    'get_metadata_store',
+    'DataProvider',
+    'LiveProvider',
+    'ReplayProvider',
+    'RecordingProvider',
+    'set_data_provider',
+    'get_data_provider',
+    'FetchSession',
+    'fetch_session',
+    'iter_in_session'
 ] 
\ No newline at end of file
@@ -0,0 +1,639 @@
+"""
+TradeMind Lite（轻量版）- 行情数据缓存模块
+
+本模块提供本地OHLCV数据缓存。每只股票的每种数据间隔对应一个NumPy结构化数组文件（.npy，
+可内存映射读取）和一个JSON元数据文件。缓存是否新鲜由交易时段决定：休市期间只要在最近一次
+收盘后获取过数据即可直接使用，交易时段内则按数据间隔设置较短的有效期。
+
+缓存旁还可以保存增量指标状态（trademind.core.streaming.IndicatorState，.state.json文件）。
+状态首次通过indicator_state建立，之后每次增量更新只把新增的K线输入状态，收盘后的更新
+只需O(新增K线)的计算即可得到最新指标值。
+
+缓存默认关闭，由命令行和Web入口调用configure_cache启用。
+"""
+
+from datetime import datetime, time, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Tuple
+import json
+import logging
+import os
+import re
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytz
+
+if TYPE_CHECKING:
+    from trademind.core.streaming import IndicatorState
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+# 默认缓存目录
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent.parent / 'cache' / 'ohlcv'
+
+# 各市场的时区和交易时段（开盘、收盘）
+MARKET_SESSIONS = {
+    'US': ('America/New_York', time(9, 30), time(16, 0)),
+    'CN': ('Asia/Shanghai', time(9, 30), time(15, 0)),
+}
+
+# 收盘后等待数据源更新完毕的时间
+SETTLE_DELAY = timedelta(minutes=15)
+
+# 交易时段内各数据间隔的缓存有效期，未列出的间隔使用DEFAULT_SESSION_TTL
+SESSION_TTL = {
+    '1m': timedelta(minutes=1),
+    '2m': timedelta(minutes=2),
+    '5m': timedelta(minutes=5),
+    '15m': timedelta(minutes=15),
+    '30m': timedelta(minutes=30),
+    '60m': timedelta(hours=1),
+    '90m': timedelta(minutes=90),
+    '1h': timedelta(hours=1),
+}
+DEFAULT_SESSION_TTL = timedelta(minutes=15)
+
+# 数据周期对应的天数，用于判断缓存的数据范围是否覆盖请求
+PERIOD_DAYS = {
+    '1d': 1,
+    '5d': 5,
+    '1mo': 30,
+    '3mo': 90,
+    '6mo': 180,
+    '1y': 365,
+    '2y': 365 * 2,
+    '3y': 365 * 3,
+    '5y': 365 * 5,
+    '10y': 365 * 10,
+    'max': None,
+}
+
+# 增量更新时与缓存重叠的K线数，用于核对复权价格是否变化
+OVERLAP_BARS = 5
+ADJUSTMENT_TOLERANCE = 1e-6
+
+# 结构化数组中存放时间索引的字段名
+INDEX_FIELD = '_timestamp'
+
+_cache: Optional['OHLCVCache'] = None
+
+
+def symbol_market(symbol: str) -> str:
+    """
+    根据股票代码判断所属市场
+
+    参数:
+        symbol: 股票代码
+
+    返回:
+        str: A股返回'CN'，其余返回'US'
+    """
+    upper = symbol.upper()
+    # 带有.SH、.SZ、.BJ后缀或SH、SZ、BJ前缀加6位数字（SHOP、SHW、BJ等美股代码不算）
+    if upper.endswith(('.SH', '.SZ', '.BJ')):
+        return 'CN'
+    if re.fullmatch(r'(SH|SZ|BJ)\d{6}', upper):
+        return 'CN'
+    # 纯数字代码按交易所代码规则判断
+    if symbol.isdigit() and symbol.startswith((
+        '600', '601', '603', '605', '688',  # 上海证券交易所
+        '000', '001', '002', '003', '300', '301',  # 深圳证券交易所
+        '430', '83', '87', '88', '89'  # 北京证券交易所
+    )):
+        return 'CN'
+    return 'US'
+
+
+def _session_bounds(market: str, day) -> Tuple[datetime, datetime]:
+    """
+    返回指定日期的开盘和收盘时间（UTC）
+    """
+    tz_name, open_time, close_time = MARKET_SESSIONS[market]
+    tz = pytz.timezone(tz_name)
+    session_open = tz.localize(datetime.combine(day, open_time)).astimezone(pytz.utc)
+    session_close = tz.localize(datetime.combine(day, close_time)).astimezone(pytz.utc)
+    return session_open, session_close
+
+
+def is_market_open(market: str, now: Optional[datetime] = None) -> bool:
+    """
+    判断当前是否处于交易时段（不考虑节假日）
+
+    参数:
+        market: 市场代码，'US'或'CN'
+        now: 当前时间，默认为系统时间
+
+    返回:
+        bool: 是否处于交易时段
+    """
+    now = now or datetime.now(pytz.utc)
+    local_day = now.astimezone(pytz.timezone(MARKET_SESSIONS[market][0])).date()
+    if local_day.weekday() >= 5:
+        return False
+    session_open, session_close = _session_bounds(market, local_day)
+    return session_open <= now < session_close
+
+
+def last_session_close(market: str, now: Optional[datetime] = None) -> datetime:
+    """
+    返回不晚于当前时间的最近一次收盘时间（UTC，不考虑节假日）
+
+    参数:
+        market: 市场代码，'US'或'CN'
+        now: 当前时间，默认为系统时间
+
+    返回:
+        datetime: 最近一次收盘时间
+    """
+    now = now or datetime.now(pytz.utc)
+    day = now.astimezone(pytz.timezone(MARKET_SESSIONS[market][0])).date()
+    while True:
+        if day.weekday() < 5:
+            session_close = _session_bounds(market, day)[1]
+            if session_close <= now:
+                return session_close
+        day -= timedelta(days=1)
+
+
+def _period_start(period: str, now: datetime) -> Optional[pd.Timestamp]:
+    """
+    返回数据周期对应的起始时间，'max'或无法识别的周期返回None
+    """
+    if period == 'ytd':
+        return pd.Timestamp(year=now.year, month=1, day=1, tz=pytz.utc)
+    days = PERIOD_DAYS.get(period)
+    if days is None:
+        return None
+    return pd.Timestamp(now) - pd.Timedelta(days=days)
+
+
+def _slice_period(data: pd.DataFrame, period: str, now: datetime) -> pd.DataFrame:
+    """
+    截取数据周期内的数据
+    """
+    start = _period_start(period, now)
+    if start is None:
+        return data
+    if data.index.tz is None:
+        start = start.tz_convert(None)
+    return data[data.index >= start]
+
+
+def _period_covers(cached: str, requested: str) -> bool:
+    """
+    判断缓存时使用的数据周期是否覆盖请求的数据周期
+    """
+    if cached == requested or cached == 'max':
+        return True
+    if requested == 'ytd':
+        return cached in PERIOD_DAYS and PERIOD_DAYS[cached] is not None and PERIOD_DAYS[cached] >= 366
+    if cached not in PERIOD_DAYS or requested not in PERIOD_DAYS or PERIOD_DAYS[requested] is None:
+        return False
+    return PERIOD_DAYS[cached] >= PERIOD_DAYS[requested]
+
+
+def _merge_bars(cached: pd.DataFrame, data: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """
+    用新获取的数据替换缓存中对应时间段的K线，保留新数据之前的缓存数据
+
+    用重叠部分的收盘价核对复权价格，不一致（拆股、分红后重新复权）或没有重叠时返回None。
+    缓存的最后一根K线可能是交易时段内获取的未完成K线，收盘价不参与核对，由新数据直接替换。
+    """
+    if data.index.tz is not None and cached.index.tz is not None:
+        data = data.tz_convert(cached.index.tz)
+    elif (data.index.tz is None) != (cached.index.tz is None):
+        return None
+
+    overlap = cached.index.intersection(data.index)
+    settled = overlap[overlap < cached.index[-1]]
+    if len(overlap) == 0 or not np.allclose(cached.loc[settled, 'Close'].to_numpy(dtype=np.float64),
+                                            data.loc[settled, 'Close'].to_numpy(dtype=np.float64),
+                                            rtol=ADJUSTMENT_TOLERANCE, atol=0.0, equal_nan=True):
+        return None
+
+    data = data[~data.index.duplicated(keep='last')]
+    return pd.concat([cached[cached.index < data.index[0]], data[cached.columns.intersection(data.columns)]])
+
+
+def _atomic_write(path: Path, write: Callable) -> None:
+    """
+    先写入同目录下的临时文件再替换目标文件，避免读取到写了一半的缓存
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class OHLCVCache:
+    """
+    本地OHLCV数据缓存
+
+    数据按 <缓存目录>/<数据间隔>/<股票代码>.npy 存放，只保存数值列，时间索引以UTC纳秒存放在
+    INDEX_FIELD字段中，时区、索引名和获取时间等信息写在同名的.json元数据文件里。
+
+    指标状态保存在同名的.state.json文件中，只包含最后OVERLAP_BARS根K线之前的数据：
+    增量更新会替换这几根K线，状态因此不会包含之后可能被修正的数据。
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else DEFAULT_CACHE_DIR
+
+    def paths(self, symbol: str, interval: str) -> Tuple[Path, Path]:
+        """
+        返回数据文件和元数据文件的路径
+        """
+        name = re.sub(r'[^A-Za-z0-9._-]', '_', symbol.upper())
+        directory = self.cache_dir / interval
+        return directory / f'{name}.npy', directory / f'{name}.json'
+
+    def state_path(self, symbol: str, interval: str) -> Path:
+        """
+        返回指标状态文件的路径
+        """
+        return self.paths(symbol, interval)[0].with_suffix('.state.json')
+
+    def _read_state(self, symbol: str, interval: str) -> Optional['IndicatorState']:
+        from trademind.core.streaming import IndicatorState
+
+        path = self.state_path(symbol, interval)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return IndicatorState.from_dict(json.load(f))
+        except Exception as e:
+            logger.warning(f"读取 {symbol} 的指标状态失败: {str(e)}")
+            return None
+
+    def _advance_state(self, symbol: str, interval: str, data: pd.DataFrame,
+                       state: Optional['IndicatorState']) -> 'IndicatorState':
+        """
+        把状态推进到data中最后OVERLAP_BARS根K线之前并保存
+
+        状态处理过的最后一根K线不在这部分数据中（数据已被替换或有缺口）时，从这部分数据重新建立状态。
+        """
+        from trademind.core.streaming import IndicatorState
+
+        settled = data.iloc[:max(len(data) - OVERLAP_BARS, 0)]
+        if state is None or (state.last_timestamp is not None and state.last_timestamp not in settled.index):
+            state = IndicatorState.from_history(settled)
+        else:
+            state.update(settled)
+
+        try:
+            content = json.dumps(state.to_dict()).encode('utf-8')
+            _atomic_write(self.state_path(symbol, interval), lambda f: f.write(content))
+        except Exception as e:
+            logger.warning(f"写入 {symbol} 的指标状态失败: {str(e)}")
+        return state
+
+    def indicator_state(self, symbol: str, interval: str = '1d') -> Optional['IndicatorState']:
+        """
+        返回与缓存数据对应的增量指标状态，已处理到缓存的最后一根K线
+
+        没有保存的状态时从缓存数据建立并保存，之后的增量更新会自动维护状态。
+
+        参数:
+            symbol: 股票代码
+            interval: 数据间隔
+
+        返回:
+            Optional[IndicatorState]: 指标状态，没有缓存数据时返回None
+        """
+        data, _ = self.read(symbol, interval)
+        if data is None:
+            return None
+        state = self._advance_state(symbol, interval, data, self._read_state(symbol, interval))
+        # 最后几根K线只输入内存中的状态，不保存
+        state.update(data)
+        return state
+
+    def read(self, symbol: str, interval: str = '1d') -> Tuple[Optional[pd.DataFrame], Optional[Dict]]:
+        """
+        读取缓存数据，不检查是否新鲜
+
+        参数:
+            symbol: 股票代码
+            interval: 数据间隔
+
+        返回:
+            Tuple[Optional[pd.DataFrame], Optional[Dict]]: 缓存数据和元数据，没有缓存或读取失败时为(None, None)
+        """
+        data_path, meta_path = self.paths(symbol, interval)
+        if not data_path.exists() or not meta_path.exists():
+            return None, None
+
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            records = np.load(data_path, mmap_mode='r')
+            index = pd.DatetimeIndex(np.asarray(records[INDEX_FIELD]).astype('datetime64[ns]'),
+                                     name=meta.get('index_name'))
+            if meta.get('tz'):
+                index = index.tz_localize('UTC').tz_convert(meta['tz'])
+            data = pd.DataFrame({column: np.array(records[column]) for column in meta['columns']}, index=index)
+            return data, meta
+        except Exception as e:
+            logger.warning(f"读取 {symbol} 的缓存失败: {str(e)}")
+            return None, None
+
+    def write(self, symbol: str, data: pd.DataFrame, period: str, interval: str = '1d',
+              fetched_at: Optional[datetime] = None) -> bool:
+        """
+        写入缓存，覆盖已有数据
+
+        参数:
+            symbol: 股票代码
+            data: 以日期为索引的历史数据，非数值列不会被缓存
+            period: 获取数据时使用的周期
+            interval: 数据间隔
+            fetched_at: 数据获取时间，默认为当前时间
+
+        返回:
+            bool: 是否写入成功
+        """
+        if data is None or data.empty or not isinstance(data.index, pd.DatetimeIndex):
+            return False
+
+        columns = [column for column in data.columns
+                   if isinstance(column, str) and pd.api.types.is_numeric_dtype(data[column])]
+        tz = str(data.index.tz) if data.index.tz is not None else None
+        index = data.index.tz_convert('UTC').tz_localize(None) if tz else data.index
+
+        records = np.empty(len(data), dtype=[(INDEX_FIELD, np.int64)] +
+                           [(column, data[column].dtype) for column in columns])
+        records[INDEX_FIELD] = index.as_unit('ns').asi8
+        for column in columns:
+            records[column] = data[column].to_numpy()
+
+        meta = {
+            'symbol': symbol,
+            'interval': interval,
+            'period': period,
+            'columns': columns,
+            'tz': tz,
+            'index_name': data.index.name,
+            'fetched_at': (fetched_at or datetime.now(pytz.utc)).isoformat(),
+        }
+
+        data_path, meta_path = self.paths(symbol, interval)
+        try:
+            data_path.parent.mkdir(parents=True, exist_ok=True)
+            _atomic_write(data_path, lambda f: np.save(f, records))
+            _atomic_write(meta_path, lambda f: f.write(json.dumps(meta, ensure_ascii=False).encode('utf-8')))
+            # 数据被整体替换后原有的指标状态不再对应，下次使用时重新建立
+            state_path = self.state_path(symbol, interval)
+            if state_path.exists():
+                state_path.unlink()
+            return True
+        except Exception as e:
+            logger.warning(f"写入 {symbol} 的缓存失败: {str(e)}")
+            return False
+
+    def store(self, symbol: str, data: pd.DataFrame, period: str, interval: str = '1d',
+              now: Optional[datetime] = None) -> bool:
+        """
+        写入完整获取的数据，已缓存更长周期的数据时合并而不是覆盖
+
+        较短周期的数据替换缓存中对应时间段的K线，缓存仍保留原来的周期，因此不同周期的请求
+        不会互相覆盖对方的缓存。复权价格已变化时无法合并，直接覆盖。
+
+        参数:
+            symbol: 股票代码
+            data: 以日期为索引的历史数据
+            period: 获取数据时使用的周期
+            interval: 数据间隔
+            now: 当前时间，默认为系统时间
+
+        返回:
+            bool: 是否写入成功
+        """
+        if data is None or data.empty or not isinstance(data.index, pd.DatetimeIndex):
+            return False
+
+        now = now or datetime.now(pytz.utc)
+        cached, meta = self.read(symbol, interval)
+        if cached is not None and not _period_covers(period, meta.get('period')):
+            merged = _merge_bars(cached, data)
+            if merged is not None:
+                return self.write(symbol, _slice_period(merged, meta['period'], now), meta['period'], interval,
+                                  fetched_at=now)
+            logger.info(f"{symbol} 的复权数据已变化，使用 {period} 的数据覆盖缓存")
+        return self.write(symbol, data, period, interval, fetched_at=now)
+
+    def is_fresh(self, meta: Dict, market: str = 'US', now: Optional[datetime] = None) -> bool:
+        """
+        根据交易时段判断缓存是否新鲜
+
+        交易时段内按数据间隔的有效期判断；休市期间只要在最近一次收盘（加上数据源更新时间）
+        之后获取过数据即视为新鲜。
+
+        参数:
+            meta: 缓存元数据
+            market: 市场代码，'US'或'CN'
+            now: 当前时间，默认为系统时间
+
+        返回:
+            bool: 缓存是否新鲜
+        """
+        now = now or datetime.now(pytz.utc)
+        fetched_at = datetime.fromisoformat(meta['fetched_at'])
+        if is_market_open(market, now):
+            return now - fetched_at < SESSION_TTL.get(meta.get('interval'), DEFAULT_SESSION_TTL)
+        return fetched_at >= last_session_close(market, now - SETTLE_DELAY) + SETTLE_DELAY
+
+    def get(self, symbol: str, period: str = '1y', interval: str = '1d', market: Optional[str] = None,
+            now: Optional[datetime] = None, allow_stale: bool = False) -> Optional[pd.DataFrame]:
+        """
+        获取新鲜且覆盖请求周期的缓存数据
+
+        参数:
+            symbol: 股票代码
+            period: 数据周期
+            interval: 数据间隔
+            market: 市场代码，默认根据股票代码判断
+            now: 当前时间，默认为系统时间
+            allow_stale: 为True时忽略是否新鲜，用于数据源不可用时回退
+
+        返回:
+            Optional[pd.DataFrame]: 截取到请求周期的缓存数据，缓存不可用时返回None
+        """
+        data, meta = self.read(symbol, interval)
+        if data is None or not _period_covers(meta.get('period'), period):
+            return None
+
+        now = now or datetime.now(pytz.utc)
+        if not allow_stale and not self.is_fresh(meta, market or symbol_market(symbol), now):
+            return None
+
+        # 缓存的周期比请求的更长时只返回请求的部分
+        if meta.get('period') != period:
+            data = _slice_period(data, period, now)
+        return data
+
+    def delta_start(self, symbol: str, period: str, interval: str = '1d') -> Optional[pd.Timestamp]:
+        """
+        返回增量更新时请求数据的起始时间
+
+        参数:
+            symbol: 股票代码
+            period: 数据周期
+            interval: 数据间隔
+
+        返回:
+            Optional[pd.Timestamp]: 缓存末尾往前OVERLAP_BARS根K线的时间，缓存无法增量更新时返回None
+        """
+        cached, meta = self.read(symbol, interval)
+        if cached is None or len(cached) < OVERLAP_BARS or not _period_covers(meta.get('period'), period):
+            return None
+        return cached.index[-OVERLAP_BARS]
+
+    def update(self, symbol: str, period: str, interval: str, fetch_since: Callable[[pd.Timestamp], pd.DataFrame],
+               market: Optional[str] = None, now: Optional[datetime] = None) -> Optional[pd.DataFrame]:
+        """
+        增量更新缓存：只获取缓存末尾之后的K线并追加
+
+        从缓存末尾往前OVERLAP_BARS根K线开始请求数据，用重叠部分的收盘价核对复权价格。
+        数据源的复权历史发生变化（拆股、分红）时放弃增量更新，由调用方重新获取完整数据。
+        已保存指标状态时只把新增的K线输入状态。
+
+        参数:
+            symbol: 股票代码
+            period: 数据周期
+            interval: 数据间隔
+            fetch_since: 获取指定时间之后数据的函数
+            market: 市场代码，默认根据股票代码判断
+            now: 当前时间，默认为系统时间
+
+        返回:
+            Optional[pd.DataFrame]: 截取到请求周期的最新数据，无法增量更新时返回None
+        """
+        cached, meta = self.read(symbol, interval)
+        if cached is None or len(cached) < OVERLAP_BARS or not _period_covers(meta.get('period'), period):
+            return None
+
+        now = now or datetime.now(pytz.utc)
+        start = cached.index[-OVERLAP_BARS]
+        delta = fetch_since(start)
+        if delta is None or delta.empty or not isinstance(delta.index, pd.DatetimeIndex):
+            return None
+
+        # 重叠部分的复权收盘价不一致说明历史数据已重新复权
+        merged = _merge_bars(cached, delta)
+        if merged is None:
+            logger.info(f"{symbol} 的复权数据已变化，重新获取完整数据")
+            return None
+        # 只保留缓存周期内的数据，避免文件无限增长
+        merged = _slice_period(merged, meta['period'], now)
+        state = self._read_state(symbol, interval)
+        if not self.write(symbol, merged, meta['period'], interval, fetched_at=now):
+            return None
+        if state is not None:
+            self._advance_state(symbol, interval, merged, state)
+        logger.debug(f"{symbol} 增量更新 {len(delta.index.difference(cached.index))} 根K线")
+        return merged if meta['period'] == period else _slice_period(merged, period, now)
+
+    def clear(self, symbol: Optional[str] = None, interval: str = '1d') -> None:
+        """
+        删除缓存
+
+        参数:
+            symbol: 股票代码，为None时删除该数据间隔下的全部缓存
+            interval: 数据间隔
+        """
+        if symbol is not None:
+            targets = list(self.paths(symbol, interval)) + [self.state_path(symbol, interval)]
+        else:
+            directory = self.cache_dir / interval
+            targets = list(directory.glob('*.npy')) + list(directory.glob('*.json')) if directory.exists() else []
+        for path in targets:
+            if path.exists():
+                path.unlink()
+
+
+def configure_cache(cache_dir=None) -> OHLCVCache:
+    """
+    启用行情数据缓存
+
+    参数:
+        cache_dir: 缓存目录，默认为项目根目录下的cache/ohlcv
+
+    返回:
+        OHLCVCache: 全局缓存对象
+    """
+    global _cache
+    _cache = OHLCVCache(cache_dir)
+    return _cache
+
+
+def disable_cache() -> None:
+    """
+    关闭行情数据缓存
+    """
+    global _cache
+    _cache = None
+
+
+def get_cache() -> Optional[OHLCVCache]:
+    """
+    返回全局缓存对象，未启用时返回None
+    """
+    return _cache
+
+
+def cached_history(symbol: str, period: str, interval: str, fetch: Callable[[], pd.DataFrame],
+                   market: Optional[str] = None,
+                   fetch_since: Optional[Callable[[pd.Timestamp], pd.DataFrame]] = None) -> pd.DataFrame:
+    """
+    优先读取缓存，缓存过期时增量更新，无法增量更新时调用fetch获取完整数据并写入缓存
+
+    参数:
+        symbol: 股票代码
+        period: 数据周期
+        interval: 数据间隔
+        fetch: 从数据源获取完整数据的函数
+        market: 市场代码，默认根据股票代码判断
+        fetch_since: 从数据源获取指定时间之后数据的函数，未提供时不做增量更新
+
+    返回:
+        pd.DataFrame: 历史数据
+    """
+    cache = _cache
+    if cache is None:
+        return fetch()
+
+    data = cache.get(symbol, period, interval, market)
+    if data is not None:
+        logger.debug(f"使用 {symbol} 的缓存数据")
+        return data
+
+    if fetch_since is not None:
+        try:
+            data = cache.update(symbol, period, interval, fetch_since, market)
+        except Exception as e:
+            logger.warning(f"增量获取 {symbol} 的数据失败: {str(e)}")
+            data = None
+        if data is not None:
+            return data
+
+    data = fetch()
+    if data is not None and not data.empty:
+        # 已缓存更长周期的数据时合并，避免不同周期的请求互相覆盖
+        cache.store(symbol, data, period, interval)
+        return data
+
+    # 数据源没有返回数据时回退到过期的缓存
+    stale = cache.get(symbol, period, interval, market, allow_stale=True)
+    if stale is not None:
+        logger.warning(f"获取 {symbol} 的数据失败，使用过期的缓存数据")
+        return stale
+    return data
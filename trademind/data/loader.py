@@ -6,7 +6,6 @@ TradeMind Lite（轻量版）- 数据加载器
 
 import os
 import json
-import time
 import logging
 import yfinance as yf
 import pandas as pd
@@ -19,6 +18,12 @@ from datetime import datetime, timedelta
 import toml
 from pathlib import Path
 
+from trademind.data.cache import cached_history, get_cache, symbol_market
+from trademind.data.metadata import cached_info, is_valid_info
+from trademind.data.providers import get_data_provider
+from trademind.data.session import get_session, session_history, session_info
+from trademind.data.scheduler import DEFAULT_FETCH_WORKERS, fetch_many, get_limiter, map_concurrent, rate_limited
+
 # 设置日志
 logger = logging.getLogger(__name__)
 
@@ -42,6 +47,9 @@ if TUSHARE_TOKEN:
 else:
     logger.warning("未设置Tushare Token，部分A股数据获取功能可能受限")
 
+# 批量获取美股数据时每组的股票数，同组股票一起检查缓存和增量更新，下载时再按限流器容量分批
+BATCH_CHUNK_SIZE = 50
+
 # 股票分类规则
 STOCK_CATEGORIES = {
     # A股主板
@@ -187,6 +195,24 @@ STOCK_CATEGORIES = {
 
 def get_us_stock_data(symbol: str, period: str = "1y", interval: str = "1d", max_retries: int = 3) -> pd.DataFrame:
     """
+    获取美股股票历史数据，启用缓存时优先读取本地缓存
+    
+    参数:
+        symbol: 股票代码
+        period: 数据周期，如1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max
+        interval: 数据间隔，如1m, 2m, 5m, 15m, 30m, 60m, 90m, 1h, 1d, 5d, 1wk, 1mo, 3mo
+        max_retries: 最大重试次数
+        
+    返回:
+        pd.DataFrame: 股票历史数据
+    """
+    return cached_history(symbol, period, interval,
+                          lambda: _fetch_us_stock_data(symbol, period, interval, max_retries), market='US',
+                          fetch_since=lambda start: _fetch_us_stock_data(symbol, period, interval, max_retries, start))
+
+def _fetch_us_stock_data(symbol: str, period: str = "1y", interval: str = "1d", max_retries: int = 3,
+                         start: Optional[datetime] = None) -> pd.DataFrame:
+    """
     获取美股股票历史数据，带有重试机制
     
     参数:
@@ -194,27 +220,34 @@ def get_us_stock_data(symbol: str, period: str = "1y", interval: str = "1d", max
         period: 数据周期，如1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max
         interval: 数据间隔，如1m, 2m, 5m, 15m, 30m, 60m, 90m, 1h, 1d, 5d, 1wk, 1mo, 3mo
         max_retries: 最大重试次数
+        start: 起始时间，指定时只获取该时间之后的数据，忽略period
         
     返回:
         pd.DataFrame: 股票历史数据
     """
+    # 请求速率由Yahoo共享的令牌桶控制，限流时自适应退避，不再固定等待
+    limiter = get_limiter('yahoo')
     for attempt in range(max_retries):
+        limiter.acquire()
         try:
             stock = yf.Ticker(symbol)
-            hist = stock.history(period=period, interval=interval)
+            if start is not None:
+                hist = stock.history(start=start.strftime('%Y-%m-%d'), interval=interval)
+            else:
+                hist = stock.history(period=period, interval=interval)
             
             if hist.empty:
                 logger.warning(f"获取 {symbol} 的数据为空，尝试重试 ({attempt + 1}/{max_retries})")
                 if attempt < max_retries - 1:
-                    time.sleep(5 * (attempt + 1))  # 递增等待时间
                     continue
+            else:
+                limiter.on_success()
             return hist
             
         except yf.exceptions.YFRateLimitError:
+            backoff = limiter.on_rate_limit()
             if attempt < max_retries - 1:
-                wait_time = 5 * (attempt + 1)  # 递增等待时间
-                logger.warning(f"请求频率限制，等待 {wait_time} 秒后重试 ({attempt + 1}/{max_retries})")
-                time.sleep(wait_time)
+                logger.warning(f"请求频率限制，暂停 {backoff:.1f} 秒后重试 ({attempt + 1}/{max_retries})")
             else:
                 logger.error(f"获取 {symbol} 的数据失败：达到最大重试次数")
                 raise
@@ -222,12 +255,179 @@ def get_us_stock_data(symbol: str, period: str = "1y", interval: str = "1d", max
         except Exception as e:
             logger.error(f"获取 {symbol} 的数据时出错: {str(e)}")
             if attempt < max_retries - 1:
-                time.sleep(3)  # 基本等待时间
                 continue
             raise
             
     return pd.DataFrame()  # 如果所有重试都失败，返回空DataFrame
 
+def _split_batch_download(data: pd.DataFrame, symbols: List[str]) -> Dict[str, pd.DataFrame]:
+    """
+    将yf.download按股票分组的结果拆分为与Ticker.history相同列布局的单只股票数据
+    """
+    frames = {}
+    if data is None or data.empty or not isinstance(data.columns, pd.MultiIndex):
+        return frames
+    
+    tickers = set(data.columns.get_level_values(0))
+    for symbol in symbols:
+        if symbol.upper() not in tickers:
+            continue
+        frame = data[symbol.upper()].dropna(how='all')
+        frame.columns.name = None
+        # 多只股票按日期对齐时成交量会变为浮点数，还原为整数
+        if 'Volume' in frame.columns and not frame['Volume'].isna().any():
+            frame = frame.astype({'Volume': np.int64})
+        frames[symbol] = frame
+    return frames
+
+def _download_us_batch(symbols: List[str], period: str = "1y", interval: str = "1d",
+                       start: Optional[datetime] = None) -> Dict[str, pd.DataFrame]:
+    """
+    使用yf.download批量获取多只美股的历史数据
+    
+    yf.download内部仍按股票逐个请求Yahoo，因此股票按Yahoo限流器的令牌桶容量分批下载，
+    每批按股票数获取令牌：同时发出的请求数不超过令牌桶容量，平均速率不超过限流速率。
+    某一批请求失败时记录日志，这些股票不在结果中，由调用方单独获取。
+    
+    参数:
+        symbols: 股票代码列表
+        period: 数据周期
+        interval: 数据间隔
+        start: 起始时间，指定时只获取该时间之后的数据，忽略period
+        
+    返回:
+        Dict[str, pd.DataFrame]: {股票代码: 历史数据}，请求失败的股票不在结果中
+    """
+    kwargs = {'start': start.strftime('%Y-%m-%d')} if start is not None else {'period': period}
+    step = max(1, int(get_limiter('yahoo').bucket.capacity))
+    frames = {}
+    for i in range(0, len(symbols), step):
+        part = symbols[i:i + step]
+        try:
+            # 显式复权，与Ticker.history和缓存中的复权价格一致，不依赖yfinance版本的默认值
+            data = rate_limited('yahoo', yf.download, part, tokens=len(part), interval=interval,
+                                group_by='ticker', actions=True, auto_adjust=True, ignore_tz=False,
+                                progress=False, **kwargs)
+        except Exception as e:
+            logger.warning(f"批量获取 {', '.join(part)} 的数据失败: {str(e)}")
+            continue
+        frames.update(_split_batch_download(data, part))
+    return frames
+
+def get_us_stock_data_batch(symbols: List[str], period: str = "1y", interval: str = "1d",
+                            chunk_size: int = BATCH_CHUNK_SIZE) -> Dict[str, pd.DataFrame]:
+    """
+    批量获取美股股票历史数据
+    
+    股票按chunk_size分组，每组使用一次多股票请求获取。启用缓存时新鲜的缓存直接使用，
+    过期的缓存合并为一次增量请求。批量请求失败或缺少某只股票时，只对这些股票单独获取。
+    
+    参数:
+        symbols: 股票代码列表
+        period: 数据周期，如1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max
+        interval: 数据间隔，如1d, 1wk, 1mo
+        chunk_size: 每次批量请求包含的股票数
+        
+    返回:
+        Dict[str, pd.DataFrame]: {股票代码: 历史数据}，获取失败的股票对应空DataFrame
+    """
+    # 设置了数据源时直接从数据源读取
+    provider = get_data_provider()
+    if provider is not None:
+        return {symbol: provider.get_history(symbol, period, interval) for symbol in dict.fromkeys(symbols)}
+    
+    cache = get_cache()
+    results = {}
+    pending = []
+    for symbol in dict.fromkeys(symbols):
+        cached = cache.get(symbol, period, interval, 'US') if cache is not None else None
+        if cached is not None:
+            results[symbol] = cached
+        else:
+            pending.append(symbol)
+    
+    for i in range(0, len(pending), chunk_size):
+        chunk = pending[i:i + chunk_size]
+        
+        # 有可增量更新缓存的股票合并为一次增量请求
+        starts = {}
+        if cache is not None:
+            for symbol in chunk:
+                start = cache.delta_start(symbol, period, interval)
+                if start is not None:
+                    starts[symbol] = start
+        if starts:
+            try:
+                frames = _download_us_batch(list(starts), period, interval, min(starts.values()))
+            except Exception as e:
+                logger.warning(f"批量增量获取数据失败: {str(e)}")
+                frames = {}
+            for symbol, frame in frames.items():
+                data = cache.update(symbol, period, interval,
+                                    lambda start, frame=frame: frame[frame.index >= start], 'US')
+                if data is not None:
+                    results[symbol] = data
+        
+        remaining = [symbol for symbol in chunk if symbol not in results]
+        if not remaining:
+            continue
+        try:
+            frames = _download_us_batch(remaining, period, interval)
+        except Exception as e:
+            logger.warning(f"批量获取数据失败，改为逐个获取: {str(e)}")
+            frames = {}
+        
+        missing = []
+        for symbol in remaining:
+            data = frames.get(symbol)
+            if data is None or data.empty:
+                missing.append(symbol)
+                continue
+            if cache is not None:
+                cache.store(symbol, data, period, interval)
+            results[symbol] = data
+        
+        # 批量结果中缺失的股票单独并发获取
+        fetched = fetch_many(missing, lambda symbol: get_us_stock_data(symbol, period, interval))
+        for symbol, data in fetched.items():
+            results[symbol] = data if data is not None else pd.DataFrame()
+    
+    return {symbol: results[symbol] for symbol in dict.fromkeys(symbols)}
+
+def get_stock_data_many(symbols: List[str], period: str = "1y", interval: str = "1d",
+                        max_workers: int = DEFAULT_FETCH_WORKERS) -> Dict[str, pd.DataFrame]:
+    """
+    获取多只股票的历史数据，美股批量请求，A股在线程池中并发请求
+    
+    参数:
+        symbols: 股票代码列表
+        period: 数据周期，如1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max
+        interval: 数据间隔，如1d, 1wk, 1mo
+        max_workers: A股并发请求的最大线程数
+        
+    返回:
+        Dict[str, pd.DataFrame]: 按输入顺序排列的{股票代码: 历史数据}，获取失败的股票对应空DataFrame
+    """
+    symbols = list(dict.fromkeys(symbols))
+    provider = get_data_provider()
+    if provider is not None:
+        # 设置了数据源时直接从数据源读取
+        results = {symbol: provider.get_history(symbol, period, interval) for symbol in symbols}
+    else:
+        results = get_us_stock_data_batch([s for s in symbols if symbol_market(s) == 'US'], period, interval)
+        cn_symbols = [s for s in symbols if symbol_market(s) == 'CN']
+        for symbol, data in fetch_many(cn_symbols, lambda symbol: get_cn_stock_data(symbol, period, interval),
+                                       max_workers).items():
+            results[symbol] = data if data is not None else pd.DataFrame()
+    
+    # 启用请求合并层时记录结果，之后对同一只股票的请求不再重复获取；没有获取到数据的股票之后单独重试
+    session = get_session()
+    if session is not None:
+        for symbol in symbols:
+            if not results[symbol].empty:
+                session.store_history(symbol, period, interval, results[symbol])
+    return {symbol: results[symbol] for symbol in symbols}
+
 def get_stock_data(symbol: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
     """
     获取股票历史数据，根据股票代码自动选择数据源
@@ -240,33 +440,19 @@ def get_stock_data(symbol: str, period: str = "1y", interval: str = "1d") -> pd.
     返回:
         pd.DataFrame: 股票历史数据
     """
-    try:
-        # 判断股票市场类型
-        is_cn_stock = False
-        
-        # 1. 检查是否带有.SH、.SZ、.BJ后缀
-        if any(suffix in symbol.upper() for suffix in ['.SH', '.SZ', '.BJ']):
-            is_cn_stock = True
-        # 2. 检查是否带有SH、SZ、BJ前缀
-        elif any(symbol.upper().startswith(prefix) for prefix in ['SH', 'SZ', 'BJ']):
-            is_cn_stock = True
-        # 3. 检查纯数字代码是否符合A股规则
-        elif symbol.isdigit():
-            if (
-                # 上海证券交易所
-                symbol.startswith(('600', '601', '603', '605', '688')) or
-                # 深圳证券交易所
-                symbol.startswith(('000', '001', '002', '003', '300', '301')) or
-                # 北京证券交易所
-                symbol.startswith(('430', '83', '87', '88', '89'))
-            ):
-                is_cn_stock = True
-        
-        # 根据市场类型选择数据源
-        if is_cn_stock:
+    def fetch():
+        # 设置了数据源时从数据源读取，否则根据市场类型选择数据源
+        provider = get_data_provider()
+        if provider is not None:
+            return provider.get_history(symbol, period, interval)
+        if symbol_market(symbol) == 'CN':
             return get_cn_stock_data(symbol, period, interval)
         else:
             return get_us_stock_data(symbol, period, interval)
+    
+    try:
+        # 启用请求合并层时同一只股票只获取一次
+        return session_history(symbol, period, interval, fetch)
             
     except Exception as e:
         logger.error(f"获取股票 {symbol} 的历史数据时出错: {str(e)}")
@@ -283,21 +469,46 @@ def get_stock_info(symbol: str) -> Dict:
         Dict: 股票信息
     """
     try:
-        stock = yf.Ticker(symbol)
-        info = stock.info
-        return info
+        return session_info(symbol, lambda: _fetch_info(symbol))
     except Exception as e:
         logger.error(f"获取 {symbol} 的信息时出错: {str(e)}")
         return {}
 
+def _fetch_info(symbol: str) -> Dict:
+    """
+    获取股票信息，设置了数据源时从数据源读取，否则请求Yahoo Finance
+    """
+    provider = get_data_provider()
+    if provider is not None:
+        return provider.get_info(symbol)
+    return rate_limited('yahoo', lambda: yf.Ticker(symbol).info)
+
 def get_cn_stock_data(symbol: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
     """
+    获取A股股票历史数据，启用缓存时优先读取本地缓存
+    
+    参数:
+        symbol: 股票代码（支持格式：000001.SZ、SZ000001、000001）
+        period: 数据周期，如1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max
+        interval: 数据间隔，如1d, 1wk, 1mo
+        
+    返回:
+        pd.DataFrame: 股票历史数据
+    """
+    return cached_history(symbol, period, interval,
+                          lambda: _fetch_cn_stock_data(symbol, period, interval), market='CN',
+                          fetch_since=lambda start: _fetch_cn_stock_data(symbol, period, interval, start))
+
+def _fetch_cn_stock_data(symbol: str, period: str = "1y", interval: str = "1d",
+                         start: Optional[datetime] = None) -> pd.DataFrame:
+    """
     获取A股股票历史数据，优先使用akshare，如果失败则尝试使用tushare
     
     参数:
         symbol: 股票代码（支持格式：000001.SZ、SZ000001、000001）
         period: 数据周期，如1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max
         interval: 数据间隔，如1d, 1wk, 1mo
+        start: 起始时间，指定时只获取该时间之后的数据，忽略period
         
     返回:
         pd.DataFrame: 股票历史数据
@@ -347,19 +558,31 @@ def get_cn_stock_data(symbol: str, period: str = "1y", interval: str = "1d") ->
             start_date = end_date - timedelta(days=365)
         elif period == "2y":
             start_date = end_date - timedelta(days=365*2)
+        elif period == "3y":
+            start_date = end_date - timedelta(days=365*3)
         elif period == "5y":
             start_date = end_date - timedelta(days=365*5)
+        elif period == "10y":
+            start_date = end_date - timedelta(days=365*10)
+        elif period == "ytd":
+            start_date = datetime(end_date.year, 1, 1)
+        elif period == "max":
+            start_date = datetime(1990, 1, 1)  # 沪深交易所开业之前
         else:
             start_date = end_date - timedelta(days=365)  # 默认一年
+        
+        # 增量更新时只请求起始时间之后的数据
+        if start is not None:
+            start_date = start
             
         start_date_str = start_date.strftime('%Y%m%d')
         end_date_str = end_date.strftime('%Y%m%d')
         
         # 尝试使用akshare获取数据
         try:
-            df = ak.stock_zh_a_hist(symbol=pure_symbol, period="daily", 
-                                  start_date=start_date_str, end_date=end_date_str,
-                                  adjust="qfq")
+            df = rate_limited('akshare', ak.stock_zh_a_hist, symbol=pure_symbol, period="daily",
+                              start_date=start_date_str, end_date=end_date_str,
+                              adjust="qfq")
             
             # 重命名列以匹配yfinance格式
             df = df.rename(columns={
@@ -395,9 +618,9 @@ def get_cn_stock_data(symbol: str, period: str = "1y", interval: str = "1d") ->
                 else:
                     ts_symbol = f"{code}.XSHG"
                 
-                df = ts.pro_bar(ts_code=symbol, adj='qfq',
-                              start_date=start_date_str,
-                              end_date=end_date_str)
+                df = rate_limited('tushare', ts.pro_bar, ts_code=symbol, adj='qfq',
+                                  start_date=start_date_str,
+                                  end_date=end_date_str)
                 
                 if df is not None and not df.empty:
                     # 重命名列以匹配yfinance格式
@@ -763,12 +986,12 @@ def validate_stock_code(code: str, translate: bool = True) -> dict:
                 "error": f"不支持期货合约，请输入普通股票代码"
             }
         
-        # 尝试获取股票信息
+        # 尝试获取股票信息，启用元数据缓存时有效期内不再重复请求
         try:
-            stock_info = yf.Ticker(yf_code).info
+            stock_info = cached_info(yf_code, lambda: _fetch_info(yf_code))
             
             # 检查是否获取到有效信息
-            if "symbol" not in stock_info or stock_info.get("regularMarketPrice") is None:
+            if not is_valid_info(stock_info):
                 return {
                     "code": code,
                     "valid": False,
@@ -1100,14 +1323,53 @@ def categorize_stock(symbol: str, stock_type: str = "stock") -> str:
     # 默认分类
     return "其他股票"
 
-def batch_validate_stock_codes(codes: List[str], market: str = "US", translate: bool = False) -> List[Dict]:
+def _validate_code_safely(code: str, translate: bool) -> Dict:
+    """
+    验证单个股票代码，出错时返回无效结果而不是抛出异常
+    """
+    try:
+        # 跳过空代码
+        if not code or not code.strip():
+            logger.warning("跳过空股票代码")
+            return {
+                "code": "",
+                "valid": False,
+                "error": "股票代码不能为空"
+            }
+            
+        # 验证单个股票代码
+        logger.debug(f"验证股票代码: {code}")
+        result = validate_stock_code(code, translate=translate)
+        
+        # 记录验证结果
+        if result.get("valid", False):
+            logger.debug(f"股票代码 {code} 验证有效")
+        else:
+            logger.debug(f"股票代码 {code} 验证无效: {result.get('error', '未知错误')}")
+        return result
+            
+    except Exception as e:
+        logger.error(f"验证股票代码 {code} 时出错: {str(e)}", exc_info=True)
+        return {
+            "code": code,
+            "valid": False,
+            "error": f"验证出错: {str(e)}"
+        }
+
+def batch_validate_stock_codes(codes: List[str], market: str = "US", translate: bool = False,
+                               max_workers: int = DEFAULT_FETCH_WORKERS,
+                               progress_callback=None) -> List[Dict]:
     """
     批量验证股票代码
     
+    多个代码在线程池中并发验证，请求速率由Yahoo共享的限流器控制，结果按输入顺序返回。
+    
     参数:
         codes: 股票代码列表
         market: 市场类型，US或HK
         translate: 是否翻译股票名称为中文
+        max_workers: 并发验证的最大线程数，为1时逐个验证
+        progress_callback: 每个代码验证完成时的回调，参数为(已完成数, 总数, 代码, 验证结果)
         
     返回:
         List[Dict]: 验证结果列表
@@ -1117,38 +1379,8 @@ def batch_validate_stock_codes(codes: List[str], market: str = "US", translate:
         return []
     
     logger.info(f"开始批量验证 {len(codes)} 个股票代码，市场: {market}, 翻译: {translate}")
-    results = []
-    
-    for code in codes:
-        try:
-            # 跳过空代码
-            if not code or not code.strip():
-                logger.warning("跳过空股票代码")
-                results.append({
-                    "code": "",
-                    "valid": False,
-                    "error": "股票代码不能为空"
-                })
-                continue
-                
-            # 验证单个股票代码
-            logger.debug(f"验证股票代码: {code}")
-            result = validate_stock_code(code, translate=translate)
-            results.append(result)
-            
-            # 记录验证结果
-            if result.get("valid", False):
-                logger.debug(f"股票代码 {code} 验证有效")
-            else:
-                logger.debug(f"股票代码 {code} 验证无效: {result.get('error', '未知错误')}")
-                
-        except Exception as e:
-            logger.error(f"验证股票代码 {code} 时出错: {str(e)}", exc_info=True)
-            results.append({
-                "code": code,
-                "valid": False,
-                "error": f"验证出错: {str(e)}"
-            })
+    results = map_concurrent(codes, lambda code: _validate_code_safely(code, translate),
+                             max_workers, progress_callback)
     
     # 记录验证结果统计
     valid_count = sum(1 for r in results if r.get("valid", False))
@@ -0,0 +1,190 @@
+"""
+TradeMind Lite（轻量版）- 股票元数据缓存模块
+
+本模块把验证股票代码时用到的基本信息（代码、类型、名称、币种和最新价格）保存在本地JSON文件中，
+在有效期内重复验证同一代码时不再请求Yahoo的info接口。请求失败或被限流时返回的不完整信息
+（缺少代码或最新价格）不会写入缓存。
+
+缓存默认关闭，由命令行和Web入口调用configure_metadata_store启用。
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Optional
+import json
+import logging
+import threading
+
+import pytz
+
+from trademind.data.cache import _atomic_write
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+# 默认缓存文件
+DEFAULT_METADATA_PATH = Path(__file__).parent.parent.parent / 'cache' / 'metadata.json'
+
+# 默认有效期
+DEFAULT_METADATA_TTL = timedelta(days=1)
+
+# 缓存的info字段
+METADATA_FIELDS = ('symbol', 'quoteType', 'shortName', 'longName', 'currency', 'regularMarketPrice')
+
+_store: Optional['MetadataStore'] = None
+
+
+class MetadataStore:
+    """
+    股票元数据缓存
+
+    所有代码的元数据保存在同一个JSON文件中，首次使用时读入内存，每次更新后整体写回。
+    """
+
+    def __init__(self, path=None, ttl: timedelta = DEFAULT_METADATA_TTL):
+        self.path = Path(path) if path is not None else DEFAULT_METADATA_PATH
+        self.ttl = ttl
+        self._entries: Optional[Dict[str, Dict]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict]:
+        if self._entries is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except FileNotFoundError:
+                self._entries = {}
+            except (OSError, ValueError) as e:
+                logger.warning(f"读取股票元数据缓存失败，将重新建立: {str(e)}")
+                self._entries = {}
+        return self._entries
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        content = json.dumps(self._entries, ensure_ascii=False, indent=2).encode('utf-8')
+        _atomic_write(self.path, lambda f: f.write(content))
+
+    def get(self, symbol: str, now: Optional[datetime] = None) -> Optional[Dict]:
+        """
+        读取未过期的元数据
+
+        参数:
+            symbol: Yahoo Finance格式的股票代码
+            now: 当前时间，默认为系统时间
+
+        返回:
+            Optional[Dict]: 只包含METADATA_FIELDS的info字典，没有缓存或已过期时返回None
+        """
+        now = now or datetime.now(pytz.utc)
+        with self._lock:
+            entry = self._load().get(symbol)
+        if entry is None:
+            return None
+        try:
+            fetched_at = datetime.fromisoformat(entry['fetched_at'])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if now - fetched_at > self.ttl:
+            return None
+        return dict(entry['info'])
+
+    def put(self, symbol: str, info: Dict, now: Optional[datetime] = None) -> Dict:
+        """
+        写入元数据
+
+        参数:
+            symbol: Yahoo Finance格式的股票代码
+            info: yf.Ticker(symbol).info返回的字典
+            now: 获取时间，默认为系统时间
+
+        返回:
+            Dict: 实际缓存的info字段
+        """
+        now = now or datetime.now(pytz.utc)
+        slim = {field: info.get(field) for field in METADATA_FIELDS if info.get(field) is not None}
+        with self._lock:
+            self._load()[symbol] = {'info': slim, 'fetched_at': now.isoformat()}
+            try:
+                self._save()
+            except OSError as e:
+                logger.warning(f"写入股票元数据缓存失败: {str(e)}")
+        return dict(slim)
+
+    def clear(self) -> None:
+        """
+        清空缓存
+        """
+        with self._lock:
+            self._entries = {}
+            if self.path.exists():
+                self.path.unlink()
+
+
+def configure_metadata_store(path=None, ttl: timedelta = DEFAULT_METADATA_TTL) -> MetadataStore:
+    """
+    启用股票元数据缓存
+
+    参数:
+        path: 缓存文件路径，默认为项目根目录下的cache/metadata.json
+        ttl: 缓存有效期
+
+    返回:
+        MetadataStore: 全局缓存对象
+    """
+    global _store
+    _store = MetadataStore(path, ttl)
+    return _store
+
+
+def disable_metadata_store() -> None:
+    """
+    关闭股票元数据缓存
+    """
+    global _store
+    _store = None
+
+
+def get_metadata_store() -> Optional[MetadataStore]:
+    """
+    返回全局缓存对象，未启用时返回None
+    """
+    return _store
+
+
+def is_valid_info(info: Optional[Dict]) -> bool:
+    """
+    判断info是否为有效的股票信息：包含代码和最新价格
+
+    参数:
+        info: info字典
+
+    返回:
+        bool: 是否有效
+    """
+    return isinstance(info, dict) and 'symbol' in info and info.get('regularMarketPrice') is not None
+
+
+def cached_info(symbol: str, fetch: Callable[[], Dict]) -> Dict:
+    """
+    优先读取未过期的元数据，没有时调用fetch获取，有效的结果写入缓存
+
+    参数:
+        symbol: Yahoo Finance格式的股票代码
+        fetch: 获取info字典的函数
+
+    返回:
+        Dict: info字典，来自缓存时只包含METADATA_FIELDS
+    """
+    store = get_metadata_store()
+    if store is None:
+        return fetch()
+
+    info = store.get(symbol)
+    if info is not None:
+        return info
+
+    info = fetch()
+    # 未知代码或被限流时返回的不完整信息不缓存，之后重新请求
+    if is_valid_info(info):
+        store.put(symbol, info)
+    return info
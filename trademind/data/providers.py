@@ -0,0 +1,194 @@
+"""
+TradeMind Lite（轻量版）- 数据源模块
+
+本模块定义可替换的数据源接口。get_stock_data、get_stock_info等入口在设置了数据源时
+从数据源读取历史数据和股票信息，未设置时保持原有的联网获取方式。
+
+ReplayProvider从本地目录读取录制好的OHLCV数据和股票信息快照，不访问网络，
+可用于离线分析和可重复的性能测试；RecordingProvider在联网获取的同时把结果录制到目录中。
+
+录制目录结构:
+    <目录>/ohlcv/<数据间隔>/<股票代码>.npy|.json   与OHLCVCache的格式相同
+    <目录>/info/<股票代码>.json                   yf.Ticker(symbol).info的快照
+"""
+
+from pathlib import Path
+from typing import Dict, Optional
+import json
+import logging
+import re
+
+import pandas as pd
+import pytz
+
+from trademind.data.cache import OHLCVCache, _atomic_write, _slice_period, symbol_market
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+_provider: Optional['DataProvider'] = None
+
+
+class DataProvider:
+    """
+    数据源接口
+    """
+
+    name = 'base'
+
+    def get_history(self, symbol: str, period: str = '1y', interval: str = '1d') -> pd.DataFrame:
+        """
+        获取历史数据
+
+        参数:
+            symbol: 股票代码
+            period: 数据周期，如1mo, 3mo, 6mo, 1y, 2y, 3y, 5y, 10y, ytd, max
+            interval: 数据间隔，如1d, 1wk, 1mo
+
+        返回:
+            pd.DataFrame: 以日期为索引的OHLCV数据，没有数据时为空DataFrame
+        """
+        raise NotImplementedError
+
+    def get_info(self, symbol: str) -> Dict:
+        """
+        获取股票信息
+
+        参数:
+            symbol: 股票代码
+
+        返回:
+            Dict: 与yf.Ticker(symbol).info结构相同的字典，没有数据时为空字典
+        """
+        raise NotImplementedError
+
+
+class LiveProvider(DataProvider):
+    """
+    联网数据源：美股使用Yahoo Finance，A股使用akshare/tushare
+    """
+
+    name = 'live'
+
+    def get_history(self, symbol: str, period: str = '1y', interval: str = '1d') -> pd.DataFrame:
+        from trademind.data.loader import get_cn_stock_data, get_us_stock_data
+
+        if symbol_market(symbol) == 'CN':
+            return get_cn_stock_data(symbol, period, interval)
+        return get_us_stock_data(symbol, period, interval)
+
+    def get_info(self, symbol: str) -> Dict:
+        import yfinance as yf
+        from trademind.data.scheduler import rate_limited
+
+        return rate_limited('yahoo', lambda: yf.Ticker(symbol).info)
+
+
+class ReplayProvider(DataProvider):
+    """
+    回放数据源：从录制目录读取数据，不访问网络
+
+    按周期截取数据时以录制数据的最后一根K线为基准，而不是当前时间，
+    因此同一份录制数据在任何时候回放的结果都相同。
+    """
+
+    name = 'replay'
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.store = OHLCVCache(self.directory / 'ohlcv')
+
+    def info_path(self, symbol: str) -> Path:
+        """
+        返回股票信息快照的路径
+        """
+        name = re.sub(r'[^A-Za-z0-9._-]', '_', symbol.upper())
+        return self.directory / 'info' / f'{name}.json'
+
+    def get_history(self, symbol: str, period: str = '1y', interval: str = '1d') -> pd.DataFrame:
+        data, _ = self.store.read(symbol, interval)
+        if data is None or data.empty:
+            logger.warning(f"回放目录中没有 {symbol} 的{interval}数据")
+            return pd.DataFrame()
+
+        last = data.index[-1]
+        end = last.tz_convert(pytz.utc) if last.tzinfo is not None else last.tz_localize(pytz.utc)
+        return _slice_period(data, period, end)
+
+    def get_info(self, symbol: str) -> Dict:
+        try:
+            with open(self.info_path(symbol), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            logger.warning(f"回放目录中没有 {symbol} 的股票信息")
+            return {}
+
+    def record_history(self, symbol: str, data: pd.DataFrame, period: str, interval: str = '1d') -> bool:
+        """
+        录制历史数据
+
+        参数:
+            symbol: 股票代码
+            data: 历史数据
+            period: 获取数据时使用的周期
+            interval: 数据间隔
+
+        返回:
+            bool: 是否写入成功
+        """
+        return self.store.write(symbol, data, period, interval)
+
+    def record_info(self, symbol: str, info: Dict) -> None:
+        """
+        录制股票信息，无法序列化为JSON的字段转为字符串
+        """
+        path = self.info_path(symbol)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        content = json.dumps(info, ensure_ascii=False, indent=2, default=str).encode('utf-8')
+        _atomic_write(path, lambda f: f.write(content))
+
+
+class RecordingProvider(DataProvider):
+    """
+    录制数据源：从source获取数据，并把结果录制到目录中供ReplayProvider回放
+
+    同一只股票多次录制时保留数据较多的一份。
+    """
+
+    name = 'record'
+
+    def __init__(self, directory, source: Optional[DataProvider] = None):
+        self.replay = ReplayProvider(directory)
+        self.source = source or LiveProvider()
+
+    def get_history(self, symbol: str, period: str = '1y', interval: str = '1d') -> pd.DataFrame:
+        data = self.source.get_history(symbol, period, interval)
+        if data is not None and not data.empty:
+            recorded, _ = self.replay.store.read(symbol, interval)
+            if recorded is None or len(recorded) <= len(data):
+                self.replay.record_history(symbol, data, period, interval)
+        return data
+
+    def get_info(self, symbol: str) -> Dict:
+        info = self.source.get_info(symbol)
+        if info:
+            self.replay.record_info(symbol, info)
+        return info
+
+
+def set_data_provider(provider: Optional[DataProvider]) -> None:
+    """
+    设置全局数据源，传入None时恢复联网获取
+
+    参数:
+        provider: 数据源
+    """
+    global _provider
+    _provider = provider
+
+
+def get_data_provider() -> Optional[DataProvider]:
+    """
+    返回全局数据源，未设置时返回None
+    """
+    return _provider
@@ -0,0 +1,341 @@
+"""
+TradeMind Lite（轻量版）- 数据请求调度模块
+
+本模块为各数据源提供共享的令牌桶限流器，并支持在有限大小的线程池中并发获取数据。
+每个数据源（Yahoo、akshare、tushare）有独立的请求预算；遇到限流错误时限流器暂停发放令牌
+并降低速率（指数退避），请求持续成功后逐步恢复到基础速率。
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+import logging
+import threading
+import time
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# 各数据源的基础速率（每秒请求数）和突发容量
+PROVIDER_LIMITS = {
+    'yahoo': (2.0, 5),
+    'akshare': (2.0, 4),
+    'tushare': (3.0, 5),  # tushare普通账户每分钟约200次
+}
+
+# 并发获取数据时的默认线程数
+DEFAULT_FETCH_WORKERS = 8
+
+# 退避参数：首次暂停时间、最长暂停时间、速率下限比例、每次成功后恢复的速率比例
+INITIAL_BACKOFF = 2.0
+MAX_BACKOFF = 60.0
+MIN_RATE_FRACTION = 0.1
+RECOVERY_FRACTION = 0.05
+
+
+class TokenBucket:
+    """
+    线程安全的令牌桶
+
+    令牌按rate匀速补充，最多累积capacity个。一次请求的令牌数可以超过容量，
+    此时等到桶满后扣除，余额变为负数，后续请求需要等待欠下的令牌补足。
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        start = max(self._updated, self._paused_until)
+        if now > start:
+            self._tokens = min(self.capacity, self._tokens + (now - start) * self.rate)
+        self._updated = max(now, self._updated)
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        获取令牌，令牌不足时阻塞等待
+
+        参数:
+            tokens: 需要的令牌数
+
+        返回:
+            float: 等待的秒数
+        """
+        waited = 0.0
+        needed = min(float(tokens), self.capacity)
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                # 容许浮点误差，避免余额差极小时反复等待
+                if now >= self._paused_until and self._tokens >= needed - 1e-9:
+                    self._tokens -= tokens
+                    return waited
+                wait = max(self._paused_until - now, 0.0) + max(needed - self._tokens, 0.0) / self.rate
+            self._sleep(wait)
+            waited += wait
+
+    def pause(self, seconds: float) -> None:
+        """
+        暂停发放令牌，暂停期间不补充令牌
+
+        参数:
+            seconds: 暂停的秒数
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = min(self._tokens, 0.0)
+
+
+class ProviderLimiter:
+    """
+    单个数据源的限流器：令牌桶加自适应退避
+
+    遇到限流时暂停令牌桶，暂停时间按INITIAL_BACKOFF指数增长，同时速率减半；
+    请求成功后重置暂停时间，并把速率逐步恢复到基础速率。
+    """
+
+    def __init__(self, name: str, rate: float, capacity: float, **bucket_kwargs):
+        self.name = name
+        self.base_rate = float(rate)
+        self.bucket = TokenBucket(rate, capacity, **bucket_kwargs)
+        self.backoff = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        获取请求令牌
+
+        参数:
+            tokens: 本次调用包含的请求数
+
+        返回:
+            float: 等待的秒数
+        """
+        return self.bucket.acquire(tokens)
+
+    def on_rate_limit(self) -> float:
+        """
+        记录一次限流，暂停发放令牌并降低速率
+
+        返回:
+            float: 本次暂停的秒数
+        """
+        with self._lock:
+            self.backoff = min(MAX_BACKOFF, self.backoff * 2 if self.backoff else INITIAL_BACKOFF)
+            self.bucket.rate = max(self.bucket.rate / 2, self.base_rate * MIN_RATE_FRACTION)
+            backoff = self.backoff
+        logger.warning(f"{self.name} 请求频率受限，暂停 {backoff:.1f} 秒，速率降为 {self.bucket.rate:.2f}/秒")
+        self.bucket.pause(backoff)
+        return backoff
+
+    def on_success(self) -> None:
+        """
+        记录一次成功请求，逐步恢复速率
+        """
+        with self._lock:
+            self.backoff = 0.0
+            if self.bucket.rate < self.base_rate:
+                self.bucket.rate = min(self.base_rate, self.bucket.rate + self.base_rate * RECOVERY_FRACTION)
+
+
+_limiters: Dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    """
+    返回数据源共享的限流器
+
+    参数:
+        provider: 数据源名称，取自PROVIDER_LIMITS
+
+    返回:
+        ProviderLimiter: 限流器
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            rate, capacity = PROVIDER_LIMITS[provider]
+            limiter = _limiters[provider] = ProviderLimiter(provider, rate, capacity)
+        return limiter
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    """
+    判断异常是否为限流错误
+    """
+    if type(error).__name__ == 'YFRateLimitError':
+        return True
+    message = str(error).lower()
+    return 'rate limit' in message or 'too many requests' in message or '429' in message
+
+
+def rate_limited(provider: str, fn: Callable[..., T], *args, tokens: float = 1.0,
+                 max_retries: int = 3, **kwargs) -> T:
+    """
+    在数据源限流器控制下调用函数，遇到限流错误时退避后重试
+
+    参数:
+        provider: 数据源名称
+        fn: 发起请求的函数
+        tokens: 本次调用包含的请求数
+        max_retries: 最大尝试次数
+
+    返回:
+        fn的返回值，重试次数用尽时抛出最后一次的限流错误
+    """
+    limiter = get_limiter(provider)
+    for attempt in range(max_retries):
+        limiter.acquire(tokens)
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if not _is_rate_limit_error(e):
+                raise
+            limiter.on_rate_limit()
+            if attempt == max_retries - 1:
+                raise
+            continue
+        limiter.on_success()
+        return result
+
+
+def _in_caller_context(fn: Callable[..., T]) -> Callable[..., T]:
+    """
+    包装在线程池中执行的函数，使其在调用方的上下文（如当前运行的请求合并层）中执行
+    """
+    context = copy_context()
+
+    def run(*args):
+        return context.copy().run(fn, *args)
+    return run
+
+
+def _safe_fetch(fetch: Callable[[str], T]) -> Callable[[str], Optional[T]]:
+    """
+    包装获取函数，出错时记录日志并返回None
+    """
+    def run(key):
+        try:
+            return fetch(key)
+        except Exception as e:
+            logger.error(f"获取 {key} 的数据失败: {str(e)}")
+            return None
+    return run
+
+
+def fetch_many(keys: Iterable[str], fetch: Callable[[str], T],
+               max_workers: int = DEFAULT_FETCH_WORKERS) -> Dict[str, Optional[T]]:
+    """
+    在有限大小的线程池中并发获取数据
+
+    限流由fetch内部使用的数据源限流器负责，线程数只决定同时进行中的请求上限。
+
+    参数:
+        keys: 股票代码等请求键
+        fetch: 获取单个键对应数据的函数
+        max_workers: 最大线程数
+
+    返回:
+        Dict[str, Optional[T]]: 按输入顺序排列的结果，获取失败的键对应None
+    """
+    keys = list(dict.fromkeys(keys))
+    if not keys:
+        return {}
+
+    run = _safe_fetch(fetch)
+    if max_workers <= 1 or len(keys) == 1:
+        return {key: run(key) for key in keys}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(keys))) as executor:
+        return dict(zip(keys, executor.map(_in_caller_context(run), keys)))
+
+
+def map_concurrent(items: Iterable[Any], fn: Callable[[Any], T], max_workers: int = DEFAULT_FETCH_WORKERS,
+                   on_result: Optional[Callable[[int, int, Any, T], None]] = None) -> List[T]:
+    """
+    在有限大小的线程池中对每一项调用fn，结果按输入顺序返回
+
+    与fetch_many不同，输入项不去重，fn抛出的异常会传给调用方。
+
+    参数:
+        items: 输入项
+        fn: 处理单个输入项的函数
+        max_workers: 最大线程数，为1时在调用线程中逐个处理
+        on_result: 每项完成时的回调，参数为(已完成数, 总数, 输入项, 结果)，
+                   回调依次调用，不会并发执行
+
+    返回:
+        List[T]: 与输入一一对应的结果
+    """
+    items = list(items)
+    total = len(items)
+    lock = threading.Lock()
+    completed = 0
+
+    def run(item):
+        nonlocal completed
+        result = fn(item)
+        if on_result is not None:
+            with lock:
+                completed += 1
+                try:
+                    on_result(completed, total, item, result)
+                except Exception as e:
+                    logger.warning(f"进度回调出错: {str(e)}")
+        return result
+
+    if max_workers <= 1 or total <= 1:
+        return [run(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, total)) as executor:
+        return list(executor.map(_in_caller_context(run), items))
+
+
+def iter_prefetched(keys: Iterable[str], fetch: Callable[[str], T],
+                    lookahead: int = DEFAULT_FETCH_WORKERS) -> Iterator[Tuple[str, Optional[T]]]:
+    """
+    按输入顺序逐个产出获取结果，同时在后台线程中提前获取后面的lookahead个键
+
+    调用方处理当前结果时，后续数据的网络请求已在进行，处理耗时与等待网络的时间相互重叠。
+
+    参数:
+        keys: 股票代码等请求键
+        fetch: 获取单个键对应数据的函数
+        lookahead: 同时进行中的请求数，为0时在调用线程中逐个获取
+
+    返回:
+        Iterator[Tuple[str, Optional[T]]]: (键, 结果)，获取失败的结果为None
+    """
+    run = _safe_fetch(fetch)
+    if lookahead <= 0:
+        for key in keys:
+            yield key, run(key)
+        return
+
+    run = _in_caller_context(run)
+    executor = ThreadPoolExecutor(max_workers=lookahead)
+    pending = deque()
+    try:
+        for key in keys:
+            pending.append((key, executor.submit(run, key)))
+            if len(pending) > lookahead:
+                key, future = pending.popleft()
+                yield key, future.result()
+        while pending:
+            key, future = pending.popleft()
+            yield key, future.result()
+    finally:
+        # 调用方提前结束时取消尚未开始的请求
+        executor.shutdown(wait=False, cancel_futures=True)
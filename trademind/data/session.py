@@ -0,0 +1,266 @@
+"""
+TradeMind Lite（轻量版）- 请求合并模块
+
+本模块提供单次分析运行内的请求合并层。同一只股票的历史数据和基本信息在一次运行中最多获取一次：
+较短周期的请求从已获取的最长周期数据中截取，同一请求并发到达时只有第一个真正发起请求，
+其余调用等待并共享它的结果。
+
+合并层只在fetch_session()的作用范围内生效，范围外的调用直接请求数据源。合并层保存在上下文变量中，
+同时进行的多次运行（如Web界面的多个分析任务）各自使用独立的合并层；scheduler的线程池会把调用方的
+上下文带到工作线程，后台获取数据的线程因此使用所属运行的合并层。
+"""
+
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from datetime import datetime
+from typing import Callable, Dict, Iterator, Optional, Tuple, TypeVar
+import logging
+import threading
+
+import pandas as pd
+import pytz
+
+from trademind.data.cache import _period_covers, _slice_period
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+_current_session: ContextVar[Optional['FetchSession']] = ContextVar('trademind_fetch_session', default=None)
+
+
+class FetchSession:
+    """
+    单次运行内的历史数据和股票信息合并层
+
+    历史数据按(股票代码, 数据间隔)保存已获取的最长周期；请求失败不会被记录，之后的调用会重新请求。
+    """
+
+    def __init__(self):
+        self._histories: Dict[Tuple[str, str], Tuple[str, pd.DataFrame]] = {}
+        self._infos: Dict[str, Dict] = {}
+        self._inflight: Dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+
+    def _serve(self, data: pd.DataFrame, held_period: str, period: str) -> pd.DataFrame:
+        """
+        按请求的周期返回数据副本，调用方修改结果不影响已保存的数据
+        """
+        if held_period != period and not data.empty:
+            data = _slice_period(data, period, datetime.now(pytz.utc))
+        return data.copy()
+
+    def _store_history(self, key: Tuple[str, str], period: str, data: pd.DataFrame) -> None:
+        held = self._histories.get(key)
+        # 已有数据时只用覆盖更长周期的非空数据替换
+        if held is None or (not data.empty and (held[1].empty or _period_covers(period, held[0]))):
+            self._histories[key] = (period, data)
+
+    def store_history(self, symbol: str, period: str, interval: str, data: pd.DataFrame) -> None:
+        """
+        记录在合并层之外获取的历史数据（如批量请求的结果）
+
+        参数:
+            symbol: 股票代码
+            period: 数据周期
+            interval: 数据间隔
+            data: 历史数据
+        """
+        if data is None:
+            return
+        with self._lock:
+            self._store_history((symbol, interval), period, data)
+
+    def history(self, symbol: str, period: str, interval: str,
+                fetch: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """
+        获取历史数据，优先从已获取或正在获取的更长周期数据中截取
+
+        参数:
+            symbol: 股票代码
+            period: 数据周期
+            interval: 数据间隔
+            fetch: 按period和interval请求数据源的函数
+
+        返回:
+            pd.DataFrame: 历史数据
+        """
+        key = (symbol, interval)
+        with self._lock:
+            held = self._histories.get(key)
+            if held is not None and _period_covers(held[0], period):
+                return self._serve(held[1], held[0], period)
+
+            for (kind, held_symbol, held_interval, held_period), future in self._inflight.items():
+                if kind == 'history' and (held_symbol, held_interval) == key and _period_covers(held_period, period):
+                    break
+            else:
+                held_period = period
+                future = None
+                request_key = ('history', symbol, interval, period)
+                self._inflight[request_key] = owner = Future()
+
+        if future is not None:
+            return self._serve(future.result(), held_period, period)
+
+        try:
+            data = fetch()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(request_key, None)
+            owner.set_exception(e)
+            raise
+
+        if data is None:
+            data = pd.DataFrame()
+        with self._lock:
+            self._inflight.pop(request_key, None)
+            self._store_history(key, period, data)
+        owner.set_result(data)
+        return data.copy()
+
+    def info(self, symbol: str, fetch: Callable[[], Dict]) -> Dict:
+        """
+        获取股票信息，同一只股票只请求一次
+
+        参数:
+            symbol: 股票代码
+            fetch: 请求股票信息的函数
+
+        返回:
+            Dict: 股票信息
+        """
+        request_key = ('info', symbol)
+        with self._lock:
+            if symbol in self._infos:
+                return dict(self._infos[symbol])
+            future = self._inflight.get(request_key)
+            if future is None:
+                self._inflight[request_key] = owner = Future()
+
+        if future is not None:
+            return dict(future.result())
+
+        try:
+            info = fetch()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(request_key, None)
+            owner.set_exception(e)
+            raise
+
+        with self._lock:
+            self._inflight.pop(request_key, None)
+            self._infos[symbol] = info
+        owner.set_result(info)
+        return dict(info)
+
+    def release(self, symbol: str) -> None:
+        """
+        释放股票已保存的历史数据（如分析完成后），之后的请求重新获取
+
+        参数:
+            symbol: 股票代码
+        """
+        with self._lock:
+            for key in [key for key in self._histories if key[0] == symbol]:
+                del self._histories[key]
+
+
+def get_session() -> Optional[FetchSession]:
+    """
+    返回当前上下文中生效的合并层，未在fetch_session()范围内时返回None
+    """
+    return _current_session.get()
+
+
+@contextmanager
+def fetch_session() -> Iterator[FetchSession]:
+    """
+    在作用范围内启用请求合并层
+
+    合并层只对当前上下文生效，其他线程中同时进行的运行不会共用。
+    嵌套调用时沿用外层的合并层，由最外层负责结束。
+
+    返回:
+        Iterator[FetchSession]: 当前生效的合并层
+    """
+    session = _current_session.get()
+    if session is not None:
+        yield session
+        return
+
+    session = FetchSession()
+    token = _current_session.set(session)
+    try:
+        yield session
+    finally:
+        _current_session.reset(token)
+
+
+def iter_in_session(make_iterator: Callable[[], Iterator[T]]) -> Iterator[T]:
+    """
+    在独立的合并层中逐个产出make_iterator()的结果
+
+    生成器在调用方的上下文中执行，直接在生成器中使用fetch_session()会让合并层在两次产出之间
+    泄漏到调用方。这里每一步都在复制的上下文中执行，合并层只对迭代过程本身生效。
+
+    参数:
+        make_iterator: 创建迭代器的函数，在合并层范围内调用
+
+    返回:
+        Iterator[T]: make_iterator()产出的结果
+    """
+    def run():
+        with fetch_session():
+            yield from make_iterator()
+
+    context = copy_context()
+    iterator = run()
+    try:
+        while True:
+            try:
+                item = context.run(next, iterator)
+            except StopIteration:
+                return
+            yield item
+    finally:
+        context.run(iterator.close)
+
+
+def session_history(symbol: str, period: str, interval: str, fetch: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+    """
+    通过当前合并层获取历史数据，未启用合并层时直接调用fetch
+
+    参数:
+        symbol: 股票代码
+        period: 数据周期
+        interval: 数据间隔
+        fetch: 请求数据源的函数
+
+    返回:
+        pd.DataFrame: 历史数据
+    """
+    session = get_session()
+    if session is None:
+        return fetch()
+    return session.history(symbol, period, interval, fetch)
+
+
+def session_info(symbol: str, fetch: Callable[[], Dict]) -> Dict:
+    """
+    通过当前合并层获取股票信息，未启用合并层时直接调用fetch
+
+    参数:
+        symbol: 股票代码
+        fetch: 请求股票信息的函数
+
+    返回:
+        Dict: 股票信息
+    """
+    session = get_session()
+    if session is None:
+        return fetch()
+    return session.info(symbol, fetch)
@@ -1,9 +1,10 @@
 """
 TradeMind Lite（轻量版）- 报告生成模块
 
-本模块包含生成分析报告和性能图表的功能。
+本模块包含生成分析报告和性能图表的功能，以及报告目录索引。
 """
 
+from trademind.reports.catalog import ReportCatalog, get_catalog
 from trademind.reports.generator import (
     generate_html_report,
     generate_performance_charts
@@ -11,5 +12,7 @@ from trademind.reports.generator import (
 
 __all__ = [
     'generate_html_report',
-    'generate_performance_charts'
+    'generate_performance_charts',
+    'ReportCatalog',
+    'get_catalog'
 ] 
\ No newline at end of file
@@ -0,0 +1,235 @@
+"""
+TradeMind Lite（轻量版）- 报告目录索引模块
+
+本模块用SQLite文件记录报告目录中的HTML报告（文件名、标题、生成时间、股票数和文件大小），
+generate_html_report写入报告时同步登记。列出报告、按文件名查找和按时间清理都只查询索引，
+不再遍历报告目录。
+
+索引文件保存在报告目录下的.report_catalog.sqlite3中。首次建立索引时导入目录中已有的报告；
+之后手动放入或删除的文件可调用sync重新对齐。
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+import logging
+import os
+import sqlite3
+import threading
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+# 索引文件名
+CATALOG_FILENAME = '.report_catalog.sqlite3'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    name TEXT PRIMARY KEY,
+    compact_name TEXT NOT NULL,
+    title TEXT,
+    created REAL NOT NULL,
+    stock_count INTEGER,
+    size INTEGER
+);
+CREATE INDEX IF NOT EXISTS reports_created ON reports (created);
+CREATE INDEX IF NOT EXISTS reports_compact_name ON reports (compact_name);
+"""
+
+_catalogs: Dict[Path, 'ReportCatalog'] = {}
+_catalogs_lock = threading.Lock()
+
+
+def _compact(name: str) -> str:
+    """
+    去掉文件名中的空格，用于忽略空格差异的查找
+    """
+    return name.replace(' ', '')
+
+
+class ReportCatalog:
+    """
+    报告目录索引
+
+    每次操作使用独立的SQLite连接，可以在多个线程中共用同一个对象。
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.path = self.directory / CATALOG_FILENAME
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        打开索引，首次打开或索引文件被删除后确保表已建立，表为空时导入目录中已有的报告
+
+        建表语句可以重复执行，索引文件由其他进程创建或上次建表前中断时也能补齐。
+        """
+        with self._lock:
+            # 索引文件被删除后重新建立
+            ready = self._ready and self.path.exists()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=10)
+            conn.row_factory = sqlite3.Row
+            if not ready:
+                try:
+                    conn.executescript(_SCHEMA)
+                    if conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0] == 0:
+                        self._import_directory(conn)
+                except Exception:
+                    conn.close()
+                    raise
+                self._ready = True
+        return conn
+
+    def _import_directory(self, conn: sqlite3.Connection) -> None:
+        rows = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith('.html'):
+                    stat = entry.stat()
+                    rows.append((entry.name, _compact(entry.name), None, stat.st_mtime, None, stat.st_size))
+        with conn:
+            conn.executemany("INSERT OR IGNORE INTO reports VALUES (?, ?, ?, ?, ?, ?)", rows)
+        if rows:
+            logger.info(f"报告索引导入了 {len(rows)} 个已有报告")
+
+    def add(self, report_path: Union[str, Path], title: Optional[str] = None,
+            stock_count: Optional[int] = None, created: Optional[datetime] = None) -> None:
+        """
+        登记报告，同名报告覆盖原记录
+
+        参数:
+            report_path: 报告文件路径，需位于索引目录中
+            title: 报告标题
+            stock_count: 报告包含的股票数
+            created: 生成时间，默认为文件修改时间
+        """
+        report_path = Path(report_path)
+        stat = report_path.stat()
+        timestamp = created.timestamp() if created is not None else stat.st_mtime
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?, ?)",
+                             (report_path.name, _compact(report_path.name), title, timestamp,
+                              stock_count, stat.st_size))
+        finally:
+            conn.close()
+
+    def find(self, name: str) -> Optional[Dict]:
+        """
+        按文件名查找报告，找不到时忽略空格差异再查找一次
+
+        参数:
+            name: 报告文件名
+
+        返回:
+            Optional[Dict]: 报告记录，不存在时返回None
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM reports WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                row = conn.execute("SELECT * FROM reports WHERE compact_name = ? ORDER BY created DESC",
+                                   (_compact(name),)).fetchone()
+        finally:
+            conn.close()
+        return dict(row) if row is not None else None
+
+    def list(self, offset: int = 0, limit: Optional[int] = None) -> Tuple[List[Dict], int]:
+        """
+        按生成时间从新到旧列出报告
+
+        参数:
+            offset: 跳过的报告数
+            limit: 返回的最大报告数，None表示全部
+
+        返回:
+            Tuple[List[Dict], int]: (报告记录列表, 报告总数)
+        """
+        conn = self._connect()
+        try:
+            total = conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+            rows = conn.execute("SELECT * FROM reports ORDER BY created DESC, name DESC LIMIT ? OFFSET ?",
+                                (-1 if limit is None else limit, offset)).fetchall()
+        finally:
+            conn.close()
+        return [dict(row) for row in rows], total
+
+    def older_than(self, cutoff: Optional[datetime]) -> List[Dict]:
+        """
+        列出生成时间不晚于cutoff的报告
+
+        参数:
+            cutoff: 截止时间，None表示全部报告
+
+        返回:
+            List[Dict]: 报告记录列表
+        """
+        conn = self._connect()
+        try:
+            if cutoff is None:
+                rows = conn.execute("SELECT * FROM reports").fetchall()
+            else:
+                rows = conn.execute("SELECT * FROM reports WHERE created <= ?", (cutoff.timestamp(),)).fetchall()
+        finally:
+            conn.close()
+        return [dict(row) for row in rows]
+
+    def remove(self, name: str) -> None:
+        """
+        删除报告记录（不删除文件）
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM reports WHERE name = ?", (name,))
+        finally:
+            conn.close()
+
+    def sync(self) -> Tuple[int, int]:
+        """
+        与报告目录对齐：登记未记录的报告，删除文件已不存在的记录
+
+        返回:
+            Tuple[int, int]: (新登记的报告数, 删除的记录数)
+        """
+        conn = self._connect()
+        try:
+            known = {row[0] for row in conn.execute("SELECT name FROM reports")}
+            present = set()
+            added = []
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith('.html'):
+                        present.add(entry.name)
+                        if entry.name not in known:
+                            stat = entry.stat()
+                            added.append((entry.name, _compact(entry.name), None, stat.st_mtime, None, stat.st_size))
+            missing = [(name,) for name in known - present]
+            with conn:
+                conn.executemany("INSERT OR IGNORE INTO reports VALUES (?, ?, ?, ?, ?, ?)", added)
+                conn.executemany("DELETE FROM reports WHERE name = ?", missing)
+        finally:
+            conn.close()
+        return len(added), len(missing)
+
+
+def get_catalog(directory: Union[str, Path]) -> ReportCatalog:
+    """
+    返回报告目录对应的索引，同一目录共用一个对象
+
+    参数:
+        directory: 报告目录
+
+    返回:
+        ReportCatalog: 报告目录索引
+    """
+    key = Path(directory).resolve()
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = _catalogs[key] = ReportCatalog(key)
+        return catalog
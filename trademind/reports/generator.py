@@ -4,7 +4,8 @@ TradeMind Lite（轻量版）- 报告生成模块
 本模块包含生成分析报告和性能图表的功能。
 """
 
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import logging
 import os
 import pandas as pd
 import numpy as np
@@ -14,45 +15,35 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
 
+from trademind.reports.catalog import get_catalog
 
-def generate_html_report(results: List[Dict], title: str = "股票分析报告", 
+# 设置日志
+logger = logging.getLogger(__name__)
+
+
+def generate_html_report(results: Iterable[Dict], title: str = "股票分析报告", 
                          output_dir: Optional[Union[str, Path]] = None) -> str:
     """
     生成HTML分析报告
     
+    报告由HTMLReportWriter逐段写入文件，不在内存中拼接整个文档。
+    
     参数:
-        results: 分析结果列表
+        results: 分析结果列表，也可以是逐个产出结果的迭代器
         title: 报告标题
         output_dir: 输出目录，如果为None则使用当前目录下的results文件夹
             
     返回:
         str: HTML报告文件路径
     """
-    # 设置输出目录
-    if output_dir is None:
-        output_dir = Path.cwd() / "results"
-    else:
-        output_dir = Path(output_dir)
-    
-    # 确保输出目录存在
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # 生成时间戳和文件名
-    la_time = datetime.now(pytz.timezone('America/Los_Angeles'))
-    # 判断是否为夏令时
-    is_dst = la_time.dst() != timedelta(0)
-    tz_suffix = "PDT" if is_dst else "PST"
-    
-    # 生成文件名时间戳
-    timestamp = la_time.strftime('%Y%m%d_%H%M%S')
-    # 确保文件名不包含空格
-    report_file = output_dir / f"stock_analysis_{timestamp}.html"
-    
-    # 格式化显示时间
-    formatted_time = la_time.strftime(f'%Y-%m-%d %H:%M:%S ({tz_suffix} Time)')
-    
-    # HTML头部
-    html = f"""
+    return HTMLReportWriter(title, output_dir).write(results)
+
+
+def _report_header(title: str, formatted_time: str) -> str:
+    """
+    生成报告头部：样式、标题栏和股票卡片网格的开始标签
+    """
+    return f"""
     <!DOCTYPE html>
     <html lang="zh-CN">
     <head>
@@ -308,24 +299,18 @@ def generate_html_report(results: List[Dict], title: str = "股票分析报告",
             
             <div class="stock-grid">
     """
-    
-    # 检查是否有结果数据
-    if not results:
-        html += """
+
+
+# 没有结果数据时的提示
+_REPORT_EMPTY = """
             </div>
             <div class="no-data">
                 <p>没有可用的分析数据</p>
             </div>
         """
-    else:
-        # 保持原始顺序生成股票卡片
-        for result in results:
-            # 使用generate_stock_card_html函数生成股票卡片
-            card = generate_stock_card_html(result)
-            html += card
-    
-    # HTML尾部 - 添加回测说明
-    html += """
+
+# HTML尾部 - 添加回测说明
+_REPORT_FOOTER = """
             </div>
             
             <div class="manual-card">
@@ -406,12 +391,138 @@ def generate_html_report(results: List[Dict], title: str = "股票分析报告",
     </body>
     </html>
     """
+
+
+class HTMLReportWriter:
+    """
+    流式HTML报告写入器
     
-    # 保存HTML报告
-    with open(report_file, 'w', encoding='utf-8') as f:
-        f.write(html)
+    依次输出报告头部、每只股票的卡片和尾部，每段输出后立即写入文件，
+    内存占用与股票数量无关。stream在写入文件的同时逐段产出内容，可直接作为HTTP响应体，
+    使浏览器在报告生成过程中就开始显示。
+    """
     
-    return str(report_file)
+    def __init__(self, title: str = "股票分析报告", output_dir: Optional[Union[str, Path]] = None):
+        # 设置输出目录
+        if output_dir is None:
+            output_dir = Path.cwd() / "results"
+        else:
+            output_dir = Path(output_dir)
+        
+        # 确保输出目录存在
+        os.makedirs(output_dir, exist_ok=True)
+        
+        # 生成时间戳和文件名
+        la_time = datetime.now(pytz.timezone('America/Los_Angeles'))
+        # 判断是否为夏令时
+        is_dst = la_time.dst() != timedelta(0)
+        tz_suffix = "PDT" if is_dst else "PST"
+        
+        # 生成文件名时间戳
+        timestamp = la_time.strftime('%Y%m%d_%H%M%S')
+        
+        self.title = title
+        self.output_dir = output_dir
+        self.created = la_time
+        # 确保文件名不包含空格；同一秒内创建的报告依次加上序号，创建时即占用文件名，
+        # 同时进行的分析任务不会写入或删除同一个文件
+        self.path = self._reserve(output_dir, f"stock_analysis_{timestamp}")
+        # 格式化显示时间
+        self.formatted_time = la_time.strftime(f'%Y-%m-%d %H:%M:%S ({tz_suffix} Time)')
+        self.stock_count = 0
+    
+    @staticmethod
+    def _reserve(output_dir: Path, stem: str) -> Path:
+        """
+        以独占方式创建空的报告文件，文件已存在时改用带序号的文件名
+        """
+        path = output_dir / f"{stem}.html"
+        suffix = 1
+        while True:
+            try:
+                with open(path, 'x', encoding='utf-8'):
+                    return path
+            except FileExistsError:
+                suffix += 1
+                path = output_dir / f"{stem}_{suffix}.html"
+    
+    def chunks(self, results: Iterable[Dict]) -> Iterator[str]:
+        """
+        逐段产出报告内容，不写入文件
+        
+        参数:
+            results: 分析结果列表或迭代器
+            
+        返回:
+            Iterator[str]: 头部、每只股票的卡片和尾部
+        """
+        self.stock_count = 0
+        yield _report_header(self.title, self.formatted_time)
+        
+        # 保持原始顺序生成股票卡片
+        for result in results:
+            self.stock_count += 1
+            yield generate_stock_card_html(result)
+        
+        # 检查是否有结果数据
+        if self.stock_count == 0:
+            yield _REPORT_EMPTY
+        
+        yield _REPORT_FOOTER
+    
+    def stream(self, results: Iterable[Dict]) -> Iterator[str]:
+        """
+        逐段写入报告文件并产出写入的内容，全部写完后登记到报告索引
+        
+        每段写入后立即刷新，正在生成的报告文件可以被其他线程边写边读。
+        
+        参数:
+            results: 分析结果列表或迭代器
+            
+        返回:
+            Iterator[str]: 已写入文件的报告内容
+        """
+        with open(self.path, 'w', encoding='utf-8') as f:
+            for chunk in self.chunks(results):
+                f.write(chunk)
+                f.flush()
+                yield chunk
+        
+        # 登记到报告索引，索引出错不影响报告生成
+        try:
+            get_catalog(self.output_dir).add(self.path, title=self.title, stock_count=self.stock_count,
+                                             created=self.created)
+        except Exception as e:
+            logger.warning(f"登记报告索引失败: {str(e)}")
+    
+    def write(self, results: Iterable[Dict]) -> str:
+        """
+        写入完整的报告
+        
+        参数:
+            results: 分析结果列表或迭代器
+            
+        返回:
+            str: HTML报告文件路径
+        """
+        for _ in self.stream(results):
+            pass
+        return str(self.path)
+    
+    def discard(self) -> None:
+        """
+        删除已写入的报告文件及其索引记录（如分析被取消时）
+        """
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"删除报告文件失败: {str(e)}")
+        try:
+            get_catalog(self.output_dir).remove(self.path.name)
+        except Exception as e:
+            logger.warning(f"删除报告索引记录失败: {str(e)}")
 
 
 def generate_performance_charts(trades: List[Dict], equity: List[float], 
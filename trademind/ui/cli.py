@@ -26,6 +26,8 @@ from rich.align import Align
 from rich.prompt import Prompt
 
 from trademind.core.analyzer import StockAnalyzer
+from trademind.data.cache import configure_cache
+from trademind.data.metadata import configure_metadata_store
 from trademind import compat
 from trademind import __version__
 
@@ -160,7 +162,7 @@ def analyze_stocks(symbols: List[str], names: Dict[str, str], analyzer: StockAna
     # 显示进度信息
     with console.status(f"[bold green]正在分析 {len(symbols)} 只股票...[/bold green]", spinner="dots"):
         # 分析股票
-        results = analyzer.analyze_stocks(symbols, names)
+        results = analyzer.analyze_stocks(symbols, names, prefetch=True)
     
     # 显示进度信息
     with console.status("[bold green]正在生成报告...[/bold green]", spinner="dots"):
@@ -185,6 +187,10 @@ def run_cli() -> None:
     # 设置日志
     logger = setup_logging(False)
     
+    # 启用本地行情缓存和股票元数据缓存
+    configure_cache()
+    configure_metadata_store()
+    
     # 创建分析器
     analyzer = StockAnalyzer()
     
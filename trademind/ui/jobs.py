@@ -0,0 +1,275 @@
+"""
+TradeMind Lite（轻量版）- 后台任务模块
+
+本模块为Web界面提供后台任务队列。每个任务有独立的任务ID和进度信息，由固定大小的线程池执行，
+超出线程数的任务排队等待，因此同时提交多个分析请求时不会无限创建线程，也不会互相覆盖进度。
+
+任务状态依次为 queued（排队中）、running（运行中），结束时为 done（完成）、failed（失败）
+或 cancelled（已取消）。排队中的任务取消后不再执行；运行中的任务通过 job.cancelled 检查取消请求并自行结束。
+
+任务函数可以通过 job.publish 发布事件，Web界面通过 job.wait_events 把事件推送给浏览器（Server-Sent Events），
+不需要反复轮询进度接口。
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+import threading
+import uuid
+
+# 设置日志
+logger = logging.getLogger(__name__)
+
+# 默认同时运行的任务数
+DEFAULT_JOB_WORKERS = 2
+
+# 默认保留的已结束任务数
+DEFAULT_JOB_HISTORY = 50
+
+# 每个任务保留的最近事件数
+DEFAULT_EVENT_HISTORY = 1000
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class Job:
+    """
+    后台任务
+
+    progress中的字段由任务函数通过update更新，内容由具体任务决定。
+    事件按发布顺序编号，只保留最近的event_history个。
+    """
+
+    def __init__(self, kind: str, progress: Optional[Dict] = None, event_history: int = DEFAULT_EVENT_HISTORY):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.state = QUEUED
+        self.progress: Dict[str, Any] = dict(progress or {})
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._events = deque(maxlen=event_history)
+        self._event_id = 0
+        self._future = None
+
+    @property
+    def cancelled(self) -> bool:
+        """
+        是否已请求取消
+        """
+        return self._cancel_event.is_set()
+
+    @property
+    def cancel_event(self) -> threading.Event:
+        """
+        取消请求事件，可直接传给支持cancel_event参数的函数
+        """
+        return self._cancel_event
+
+    @property
+    def finished(self) -> bool:
+        """
+        任务是否已结束
+        """
+        return self.state in FINISHED_STATES
+
+    def update(self, **fields) -> None:
+        """
+        更新进度信息
+
+        参数:
+            **fields: 要更新的进度字段
+        """
+        with self._lock:
+            self.progress.update(fields)
+
+    def publish(self, event: str, **data) -> Dict:
+        """
+        发布事件
+
+        参数:
+            event: 事件名称
+            **data: 事件内容，需要可以序列化为JSON
+
+        返回:
+            Dict: 包含id、event和data的事件
+        """
+        with self._changed:
+            self._event_id += 1
+            record = {'id': self._event_id, 'event': event, 'data': data}
+            self._events.append(record)
+            self._changed.notify_all()
+        return record
+
+    def wait_events(self, after: int = 0, timeout: Optional[float] = None) -> Tuple[List[Dict], bool]:
+        """
+        等待编号大于after的事件
+
+        参数:
+            after: 已收到的最后一个事件编号
+            timeout: 最长等待秒数，None表示一直等待
+
+        返回:
+            Tuple[List[Dict], bool]: (新事件列表, 任务是否已结束)，超时时事件列表为空
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self._event_id > after or self.finished, timeout)
+            events = [record for record in self._events if record['id'] > after]
+            return events, self.finished
+
+    def snapshot(self) -> Dict:
+        """
+        返回任务状态的副本，可直接序列化为JSON
+
+        返回:
+            Dict: 包含id、kind、state、progress、error、时间信息和result的字典
+        """
+        with self._lock:
+            elapsed = None
+            if self.started_at is not None:
+                elapsed = ((self.finished_at or datetime.now()) - self.started_at).total_seconds()
+            return {
+                'id': self.id,
+                'kind': self.kind,
+                'state': self.state,
+                'progress': dict(self.progress),
+                'result': self.result,
+                'error': self.error,
+                'created_at': self.created_at.isoformat(),
+                'started_at': self.started_at.isoformat() if self.started_at else None,
+                'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+                'elapsed_seconds': elapsed
+            }
+
+    def _set_state(self, state: str, **fields) -> None:
+        with self._changed:
+            self.state = state
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self._changed.notify_all()
+
+
+class JobManager:
+    """
+    后台任务管理器
+
+    任务由固定大小的线程池执行；已结束的任务只保留最近的history_size个。
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_JOB_WORKERS, history_size: int = DEFAULT_JOB_HISTORY):
+        self.max_workers = max_workers
+        self.history_size = history_size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='trademind-job')
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[[Job], Any], kind: str = 'job', progress: Optional[Dict] = None) -> Job:
+        """
+        提交任务
+
+        参数:
+            fn: 任务函数，接收Job对象，返回值保存为job.result
+            kind: 任务类型
+            progress: 初始进度信息
+
+        返回:
+            Job: 新建的任务
+        """
+        job = Job(kind, progress)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job._future = self._executor.submit(self._run, job, fn)
+        return job
+
+    def _run(self, job: Job, fn: Callable[[Job], Any]) -> None:
+        if job.cancelled:
+            job._set_state(CANCELLED, finished_at=datetime.now())
+            return
+
+        job._set_state(RUNNING, started_at=datetime.now())
+        try:
+            result = fn(job)
+        except Exception as e:
+            logger.exception(f"任务 {job.id} 执行失败: {str(e)}")
+            job._set_state(FAILED, error=str(e), finished_at=datetime.now())
+            return
+
+        state = CANCELLED if job.cancelled else DONE
+        job._set_state(state, result=result, finished_at=datetime.now())
+
+    def _prune(self) -> None:
+        finished = [job for job in self._jobs.values() if job.finished]
+        for job in finished[:max(0, len(finished) - self.history_size)]:
+            del self._jobs[job.id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        按任务ID查找任务，不存在时返回None
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, kind: Optional[str] = None) -> List[Job]:
+        """
+        按提交顺序返回任务列表
+
+        参数:
+            kind: 只返回指定类型的任务，默认返回全部
+        """
+        with self._lock:
+            return [job for job in self._jobs.values() if kind is None or job.kind == kind]
+
+    def latest(self, kind: Optional[str] = None) -> Optional[Job]:
+        """
+        返回最近提交的任务，没有任务时返回None
+        """
+        jobs = self.jobs(kind)
+        return jobs[-1] if jobs else None
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        取消任务。排队中的任务直接取消，运行中的任务在下一次检查取消请求时结束
+
+        参数:
+            job_id: 任务ID
+
+        返回:
+            bool: 任务存在且尚未结束时返回True
+        """
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+        job._cancel_event.set()
+        if job._future is not None and job._future.cancel():
+            job._set_state(CANCELLED, finished_at=datetime.now())
+        return True
+
+    def cancel_all(self) -> int:
+        """
+        取消所有未结束的任务
+
+        返回:
+            int: 取消的任务数
+        """
+        return sum(self.cancel(job.id) for job in self.jobs())
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        取消未结束的任务并关闭线程池
+        """
+        self.cancel_all()
+        self._executor.shutdown(wait=wait)
@@ -186,8 +186,150 @@ document.addEventListener('DOMContentLoaded', function() {
         resultMessage.appendChild(progressContainer);
         viewReportBtn.classList.add('d-none');
         
-        // 设置轮询进度的间隔
+        // 设置轮询进度的间隔和进度事件连接
         let progressInterval = null;
+        let progressSource = null;
+        
+        // 显示错误信息并结束本次分析
+        const showAnalysisError = (message) => {
+            // 停止接收进度
+            stopProgressUpdates();
+            
+            // 隐藏加载动画
+            analyzeBtn.disabled = false;
+            analyzeSpinner.classList.add('d-none');
+            
+            // 显示错误信息
+            resultCard.querySelector('.card-header').classList.remove('bg-primary');
+            resultCard.querySelector('.card-header').classList.remove('bg-success');
+            resultCard.querySelector('.card-header').classList.add('bg-danger');
+            resultCard.querySelector('.card-header h5').textContent = '分析失败';
+            resultMessage.innerHTML = '';
+            const errorAlert = document.createElement('div');
+            errorAlert.className = 'alert alert-danger';
+            errorAlert.textContent = '发生错误：' + message;
+            resultMessage.appendChild(errorAlert);
+            viewReportBtn.classList.add('d-none');
+        };
+        
+        // 各阶段的显示名称
+        const stageLabels = {
+            fetch: '获取数据',
+            indicators: '计算技术指标',
+            backtest: '执行策略回测',
+            report: '生成报告'
+        };
+        
+        // 更新进度条，完成前最多显示99%
+        const updateProgressBar = (fraction) => {
+            const percent = Math.min(Math.round(fraction * 100), 99);
+            progressBar.style.width = `${percent}%`;
+            progressBar.setAttribute('aria-valuenow', percent);
+            progressBar.textContent = `${percent}%`;
+        };
+        
+        // 停止接收进度
+        const stopProgressUpdates = () => {
+            if (progressInterval) {
+                clearInterval(progressInterval);
+                progressInterval = null;
+            }
+            if (progressSource) {
+                progressSource.close();
+                progressSource = null;
+            }
+        };
+        
+        // 根据任务进度更新页面
+        const handleProgress = (progress) => {
+            if (progress && progress.state === 'queued') {
+                statusText.textContent = '分析任务排队中，请稍候...';
+            } else if (progress && progress.in_progress) {
+                // 更新进度条
+                updateProgressBar(progress.percent);
+                
+                // 更新状态文本
+                if (progress.current_symbol) {
+                    statusText.textContent = `正在分析: ${progress.current_symbol} (${progress.current_index}/${progress.total})`;
+                }
+                
+                // 显示预计剩余时间（如果有）
+                if (progress.remaining_seconds) {
+                    const remainingMinutes = Math.round(progress.remaining_seconds / 60);
+                    if (remainingMinutes > 0) {
+                        statusText.textContent += ` - 预计剩余时间: ${remainingMinutes} 分钟`;
+                    } else {
+                        statusText.textContent += ` - 即将完成`;
+                    }
+                }
+            } else if (progress && progress.state !== 'done') {
+                // 分析失败或已取消
+                showAnalysisError(progress.state === 'cancelled' ? '分析已取消' : (progress.error || '分析失败'));
+            } else if (progress && !progress.in_progress) {
+                // 分析已完成，停止接收进度
+                stopProgressUpdates();
+                
+                // 更新进度条为100%
+                progressBar.style.width = '100%';
+                progressBar.setAttribute('aria-valuenow', '100');
+                progressBar.textContent = '100%';
+                progressBar.className = 'progress-bar bg-success';
+                
+                // 更新状态文本
+                statusText.textContent = '分析已完成，报告已生成！';
+                statusText.className = 'alert alert-success';
+                
+                // 显示报告链接
+                if (progress.report_url) {
+                    viewReportBtn.classList.remove('d-none');
+                    viewReportBtn.href = progress.report_url;
+                    
+                    // 显示报告路径和时间戳
+                    const reportPathElement = document.createElement('p');
+                    reportPathElement.innerHTML = `报告路径: <code>${progress.report_path}</code>`;
+                    resultMessage.appendChild(reportPathElement);
+                    
+                    // 显示时间戳（如果有）
+                    if (progress.timestamp) {
+                        const timestampElement = document.createElement('p');
+                        timestampElement.innerHTML = `生成时间: <code>${progress.timestamp}</code>`;
+                        resultMessage.appendChild(timestampElement);
+                    }
+                    
+                    // 显示回测结果说明
+                    const backTestExplanation = document.querySelector('.backtest-zero-notice');
+                    if (backTestExplanation) {
+                        backTestExplanation.style.display = 'block';
+                    }
+                    
+                    // 更新结果卡片
+                    resultCard.querySelector('.card-header').classList.remove('bg-primary');
+                    resultCard.querySelector('.card-header').classList.remove('bg-danger');
+                    resultCard.querySelector('.card-header').classList.remove('bg-success');
+                    resultCard.querySelector('.card-header h5').textContent = '分析成功';
+                    
+                    // 刷新报告列表
+                    loadRecentReports();
+                } else {
+                    // 没有生成报告，隐藏正在生成的报告链接
+                    viewReportBtn.classList.add('d-none');
+                }
+                
+                // 启用分析按钮
+                analyzeBtn.disabled = false;
+                analyzeSpinner.classList.add('d-none');
+            }
+        };
+        
+        // 轮询任务进度
+        const pollProgress = (jobId) => {
+            progressInterval = setInterval(() => {
+                fetch(`/api/progress/${jobId}`)
+                    .then(res => res.json())
+                    .then(data => handleProgress(data.progress))
+                    .catch(err => console.error('获取进度失败:', err));
+            }, 1000);
+        };
         
         // 发送AJAX请求
         fetch('/api/analyze', {
@@ -202,112 +344,60 @@ document.addEventListener('DOMContentLoaded', function() {
                 analyze_all: analyzeAll
             })
         })
-        .then(response => {
-            // 开始轮询进度
-            progressInterval = setInterval(() => {
-                fetch('/api/progress')
-                    .then(res => res.json())
-                    .then(data => {
-                        if (data.progress && data.progress.in_progress) {
-                            // 更新进度条
-                            const percent = Math.min(Math.round(data.progress.percent * 100), 99);
-                            progressBar.style.width = `${percent}%`;
-                            progressBar.setAttribute('aria-valuenow', percent);
-                            progressBar.textContent = `${percent}%`;
-                            
-                            // 更新状态文本
-                            if (data.progress.current_symbol) {
-                                statusText.textContent = `正在分析: ${data.progress.current_symbol} (${data.progress.current_index}/${data.progress.total})`;
-                            }
-                            
-                            // 显示预计剩余时间（如果有）
-                            if (data.progress.remaining_seconds) {
-                                const remainingMinutes = Math.round(data.progress.remaining_seconds / 60);
-                                if (remainingMinutes > 0) {
-                                    statusText.textContent += ` - 预计剩余时间: ${remainingMinutes} 分钟`;
-                                } else {
-                                    statusText.textContent += ` - 即将完成`;
-                                }
-                            }
-                        } else if (data.progress && !data.progress.in_progress) {
-                            // 分析已完成，停止轮询
-                            clearInterval(progressInterval);
-                            
-                            // 更新进度条为100%
-                            progressBar.style.width = '100%';
-                            progressBar.setAttribute('aria-valuenow', '100');
-                            progressBar.textContent = '100%';
-                            progressBar.className = 'progress-bar bg-success';
-                            
-                            // 更新状态文本
-                            statusText.textContent = '分析已完成，报告已生成！';
-                            statusText.className = 'alert alert-success';
-                            
-                            // 显示报告链接
-                            if (data.progress.report_url) {
-                                viewReportBtn.classList.remove('d-none');
-                                viewReportBtn.href = data.progress.report_url;
-                                
-                                // 显示报告路径和时间戳
-                                const reportPathElement = document.createElement('p');
-                                reportPathElement.innerHTML = `报告路径: <code>${data.progress.report_path}</code>`;
-                                resultMessage.appendChild(reportPathElement);
-                                
-                                // 显示时间戳（如果有）
-                                if (data.progress.timestamp) {
-                                    const timestampElement = document.createElement('p');
-                                    timestampElement.innerHTML = `生成时间: <code>${data.progress.timestamp}</code>`;
-                                    resultMessage.appendChild(timestampElement);
-                                }
-                                
-                                // 显示回测结果说明
-                                const backTestExplanation = document.querySelector('.backtest-zero-notice');
-                                if (backTestExplanation) {
-                                    backTestExplanation.style.display = 'block';
-                                }
-                                
-                                // 更新结果卡片
-                                resultCard.querySelector('.card-header').classList.remove('bg-primary');
-                                resultCard.querySelector('.card-header').classList.remove('bg-danger');
-                                resultCard.querySelector('.card-header').classList.remove('bg-success');
-                                resultCard.querySelector('.card-header h5').textContent = '分析成功';
-                                
-                                // 刷新报告列表
-                                loadRecentReports();
-                            }
-                            
-                            // 启用分析按钮
-                            analyzeBtn.disabled = false;
-                            analyzeSpinner.classList.add('d-none');
-                        }
-                    })
-                    .catch(err => console.error('获取进度失败:', err));
-            }, 1000);
-            
-            return response.json();
-        })
-        .catch(error => {
-            // 停止进度轮询
-            if (progressInterval) {
-                clearInterval(progressInterval);
+        .then(response => response.json())
+        .then(data => {
+            if (data.error || !data.job_id) {
+                throw new Error(data.error || '未能创建分析任务');
             }
             
-            // 隐藏加载动画
-            analyzeBtn.disabled = false;
-            analyzeSpinner.classList.add('d-none');
+            const jobId = data.job_id;
             
-            // 显示错误信息
-            resultCard.querySelector('.card-header').classList.remove('bg-primary');
-            resultCard.querySelector('.card-header').classList.remove('bg-success');
-            resultCard.querySelector('.card-header').classList.add('bg-danger');
-            resultCard.querySelector('.card-header h5').textContent = '分析失败';
-            resultMessage.innerHTML = '';
-            const errorAlert = document.createElement('div');
-            errorAlert.className = 'alert alert-danger';
-            errorAlert.textContent = '发生错误：' + error.message;
-            resultMessage.appendChild(errorAlert);
-            viewReportBtn.classList.add('d-none');
-        });
+            // 报告边生成边显示，分析完成后链接替换为正式报告
+            viewReportBtn.href = `/api/progress/${jobId}/report`;
+            viewReportBtn.classList.remove('d-none');
+            
+            // 浏览器支持时通过SSE接收进度事件，否则轮询进度接口
+            if (window.EventSource) {
+                progressSource = new EventSource(`/api/progress/${jobId}/stream`);
+                
+                progressSource.addEventListener('stage', event => {
+                    const stage = JSON.parse(event.data);
+                    if (stage.symbol) {
+                        statusText.textContent = `正在分析: ${stage.symbol} (${stage.index}/${stage.total}) - ${stageLabels[stage.stage] || stage.stage}`;
+                    } else {
+                        statusText.textContent = stageLabels[stage.stage] || stage.stage;
+                    }
+                });
+                
+                progressSource.addEventListener('symbol', event => {
+                    const completed = JSON.parse(event.data);
+                    updateProgressBar(completed.percent);
+                    
+                    // 根据已用时间估算剩余时间
+                    if (completed.percent > 0 && completed.percent < 1) {
+                        const remaining = completed.elapsed_seconds / completed.percent - completed.elapsed_seconds;
+                        const remainingMinutes = Math.round(remaining / 60);
+                        statusText.textContent = `已完成: ${completed.symbol} (${completed.index}/${completed.total})` +
+                            (remainingMinutes > 0 ? ` - 预计剩余时间: ${remainingMinutes} 分钟` : ' - 即将完成');
+                    }
+                });
+                
+                progressSource.addEventListener('end', event => {
+                    handleProgress(JSON.parse(event.data));
+                });
+                
+                progressSource.onerror = () => {
+                    // 连接失败时改为轮询
+                    if (progressSource && progressSource.readyState === EventSource.CLOSED) {
+                        progressSource = null;
+                        pollProgress(jobId);
+                    }
+                };
+            } else {
+                pollProgress(jobId);
+            }
+        })
+        .catch(error => showAnalysisError(error.message));
     }
     
     // 清理报告按钮点击
@@ -397,7 +487,7 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // 加载最近报告列表
     function loadRecentReports() {
-        fetch('/api/reports')
+        fetch('/api/reports?limit=5')
             .then(response => response.json())
             .then(data => {
                 if (data.success && data.reports && data.reports.length > 0) {
@@ -699,6 +699,25 @@ document.addEventListener('DOMContentLoaded', function() {
             validationProgressBar.setAttribute('aria-valuenow', percent);
             validationProgressBar.textContent = `${percent}%`;
             
+            // 请求处理期间按请求ID轮询服务端的逐个代码验证进度，不会读到其他验证请求的进度
+            const requestId = (window.crypto && crypto.randomUUID)
+                ? crypto.randomUUID()
+                : `${Date.now()}-${Math.random().toString(16).slice(2)}`;
+            const batchProgressInterval = setInterval(function() {
+                fetch(`/api/validate-stocks-progress?request_id=${encodeURIComponent(requestId)}`)
+                    .then(response => response.json())
+                    .then(progress => {
+                        if (isCancelled || !progress.in_progress) return;
+                        const done = processedCount + progress.completed;
+                        const livePercent = Math.min(Math.round((done / codes.length) * 100), 100);
+                        validationProgressBar.style.width = `${livePercent}%`;
+                        validationProgressBar.setAttribute('aria-valuenow', livePercent);
+                        validationProgressBar.textContent = `${livePercent}%`;
+                        validationCurrentStatus.textContent = `正在验证 ${progress.current_code}，已完成 ${done}/${codes.length} 个`;
+                    })
+                    .catch(() => {});
+            }, 300);
+            
             // 发送验证请求
             fetch('/api/validate-stocks', {
                 method: 'POST',
@@ -707,7 +726,8 @@ document.addEventListener('DOMContentLoaded', function() {
                 },
                 body: JSON.stringify({
                     codes: batchCodes,
-                    translate: shouldTranslate
+                    translate: shouldTranslate,
+                    request_id: requestId
                 })
             })
             .then(response => {
@@ -717,6 +737,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 return response.json();
             })
             .then(data => {
+                clearInterval(batchProgressInterval);
                 if (isCancelled) return;
                 
                 // 更新已处理数量
@@ -786,6 +807,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 }
             })
             .catch(error => {
+                clearInterval(batchProgressInterval);
                 console.error('验证请求错误:', error);
                 
                 // 显示错误信息
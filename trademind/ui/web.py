@@ -18,6 +18,7 @@ import platform
 import re
 import glob
 import traceback
+import uuid
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
@@ -31,16 +32,17 @@ import warnings
 import pytz
 import yfinance as yf
 
-from flask import Flask, render_template, request, jsonify, send_from_directory, redirect, url_for, session
+from flask import Flask, Response, render_template, request, jsonify, send_from_directory, redirect, url_for, session, stream_with_context
 from flask_cors import CORS
 
-from trademind.core.indicators import calculate_rsi, calculate_macd, calculate_kdj, calculate_bollinger_bands
-from trademind.core.signals import generate_signals
-from trademind.backtest import run_backtest
 from trademind.core.patterns import identify_candlestick_patterns
 from trademind.core.analyzer import StockAnalyzer
-from trademind.reports.generator import generate_html_report as generate_report
-from trademind.data.loader import get_stock_data, get_stock_info, validate_stock_code, batch_validate_stock_codes, update_watchlists_file, get_user_watchlists, save_user_watchlists, import_stocks_to_watchlist, STOCK_CATEGORIES, get_cn_stock_data
+from trademind.data.cache import configure_cache
+from trademind.data.metadata import configure_metadata_store
+from trademind.reports.catalog import get_catalog
+from trademind.reports.generator import HTMLReportWriter, generate_html_report as generate_report
+from trademind.data.loader import get_stock_info, validate_stock_code, batch_validate_stock_codes, update_watchlists_file, get_user_watchlists, save_user_watchlists, import_stocks_to_watchlist, STOCK_CATEGORIES, get_cn_stock_data
+from trademind.ui.jobs import JobManager
 from trademind import compat
 from trademind import __version__
 
@@ -57,19 +59,17 @@ temp_query_stocks = {}  # 临时查询股票列表
 reports_cache = []  # 报告缓存
 last_refresh_time = 0  # 上次刷新报告缓存的时间
 
-# 分析进度信息
-analysis_progress = {
-    "in_progress": False,
-    "percent": 0,
-    "current_symbol": None,
-    "current_index": 0,
-    "total": 0,
-    "remaining_seconds": None,
-    "report_url": None,
-    "report_path": None,
-    "timestamp": None,
-    "last_report_path": None
-}
+# 同时运行的分析任务数，超出的任务排队等待
+MAX_ANALYSIS_JOBS = 2
+
+# 分析任务队列，每个任务有独立的进度信息
+analysis_jobs = JobManager(max_workers=MAX_ANALYSIS_JOBS)
+
+# 进度推送没有新事件时发送保活注释的间隔（秒）
+SSE_KEEPALIVE_SECONDS = 15
+
+# 边生成边返回报告时检查报告文件的间隔（秒）
+REPORT_STREAM_POLL_SECONDS = 0.5
 
 # 自动整理进度信息
 organize_progress = {
@@ -79,6 +79,19 @@ organize_progress = {
     'completed': False
 }
 
+# 批量验证进度信息，按请求ID分别记录，同时进行的多个验证请求不会互相覆盖
+validation_progress: Dict[str, Dict] = {}
+validation_progress_lock = threading.Lock()
+
+# 没有对应验证请求（尚未开始或已结束）时返回的进度
+IDLE_VALIDATION_PROGRESS = {
+    'in_progress': False,
+    'completed': 0,
+    'total': 0,
+    'percent': 0,
+    'current_code': ''
+}
+
 logger = None
 server_running = None
 
@@ -102,10 +115,8 @@ def index():
 @app.route('/api/analyze', methods=['POST'])
 def analyze_stocks():
     """
-    分析股票API
+    分析股票API，分析在后台任务中执行，返回任务ID供查询进度
     """
-    global analysis_progress
-    
     try:
         data = request.get_json()
         symbols = data.get('symbols', [])
@@ -131,278 +142,248 @@ def analyze_stocks():
             names = all_names
             title = "全市场分析报告（预置股票列表）"
         
-        # 初始化进度信息
-        analysis_progress["in_progress"] = True
-        analysis_progress["percent"] = 0
-        analysis_progress["current_index"] = 0
-        analysis_progress["total"] = len(symbols)
-        analysis_progress["current_symbol"] = ""
-        analysis_progress["start_time"] = datetime.now()
-        analysis_progress["last_report_path"] = None
-        
-        # 创建一个线程来执行分析，以便不阻塞响应
-        def run_analysis():
-            global analysis_progress, analyzer
-            try:
-                # 确保analyzer已初始化
-                if analyzer is None:
-                    analyzer = StockAnalyzer()
-                
-                # 重写analyze_stocks方法，添加进度跟踪
-                results = []
-                total = len(symbols)
-                
-                for index, symbol in enumerate(symbols, 1):
-                    # 检查服务器是否已停止
-                    if not server_running.is_set():
-                        print("\n检测到服务器停止信号，正在安全终止分析...")
-                        break
-                        
-                    try:
-                        # 更新进度信息
-                        analysis_progress["current_index"] = index
-                        analysis_progress["current_symbol"] = f"{names.get(symbol, symbol)} ({symbol})"
-                        analysis_progress["percent"] = index / total
-                        
-                        # 修复显示问题，确保正确显示股票名称和代码
-                        stock_name = names.get(symbol, symbol)
-                        
-                        if isinstance(stock_name, dict):
-                            # 新格式：{name: "名称", yf_code: "YF代码"}
-                            display_name = stock_name.get('name', symbol)
-                            print(f"\n[{index}/{total} - {index/total*100:.1f}%] 分析: {display_name} ({symbol})")
-                        else:
-                            # 旧格式：直接是名称字符串
-                            print(f"\n[{index}/{total} - {index/total*100:.1f}%] 分析: {stock_name} ({symbol})")
-                        
-                        # 获取股票历史数据
-                        hist = get_stock_data(symbol)
-                        
-                        if hist.empty:
-                            print(f"⚠️ 无法获取 {symbol} 的数据，跳过")
-                            continue
-                        
-                        # 确保有足够的数据计算价格变化
-                        if len(hist) >= 2:
-                            current_price = hist['Close'].iloc[-1]
-                            prev_price = hist['Close'].iloc[-2]
-                            price_change = current_price - prev_price
-                            # 确保除数不为零
-                            if prev_price > 0:
-                                price_change_pct = (price_change / prev_price) * 100
-                            else:
-                                price_change_pct = 0.0
-                        else:
-                            # 如果只有一天数据，无法计算变化
-                            current_price = hist['Close'].iloc[-1] if not hist.empty else 0.0
-                            prev_price = hist['Open'].iloc[-1] if not hist.empty else 0.0
-                            price_change = current_price - prev_price
-                            # 确保除数不为零
-                            if prev_price > 0:
-                                price_change_pct = (price_change / prev_price) * 100
-                            else:
-                                price_change_pct = 0.0
-                        
-                        # 确保价格变化百分比不是NaN或无穷大
-                        if pd.isna(price_change_pct) or np.isinf(price_change_pct):
-                            price_change_pct = 0.0
-                        
-                        # 打印调试信息
-                        print(f"当前价格: {current_price:.2f}, 前一价格: {prev_price:.2f}")
-                        print(f"价格变化: {price_change:.2f}, 变化百分比: {price_change_pct:.2f}%")
-                        
-                        print("计算技术指标...")
-                        # 调用技术指标模块
-                        rsi = calculate_rsi(hist['Close'])
-                        macd, signal, hist_macd = calculate_macd(hist['Close'])
-                        k, d, j = calculate_kdj(hist['High'], hist['Low'], hist['Close'])
-                        bb_upper, bb_middle, bb_lower, bb_width, bb_percent = calculate_bollinger_bands(hist['Close'])
-                        
-                        indicators = {
-                            'rsi': rsi,
-                            'macd': {'macd': macd, 'signal': signal, 'hist': hist_macd},
-                            'kdj': {'k': k, 'd': d, 'j': j},
-                            'bollinger': {
-                                'upper': bb_upper, 
-                                'middle': bb_middle, 
-                                'lower': bb_lower,
-                                'bandwidth': bb_width,
-                                'percent_b': bb_percent
-                            }
-                        }
-                        
-                        print("分析K线形态...")
-                        # 创建StockAnalyzer实例并调用形态识别方法
-                        patterns = analyzer.identify_patterns(hist.tail(5))
-                        
-                        print("生成交易建议...")
-                        # 调用StockAnalyzer的交易建议生成方法
-                        advice = analyzer.generate_trading_advice(indicators, current_price, patterns)
-                        
-                        print("执行策略回测...")
-                        # 生成交易信号
-                        signals = generate_signals(hist, indicators)
-                        
-                        # 调用回测模块
-                        backtest_results = run_backtest(hist, signals)
-                        
-                        results.append({
-                            'symbol': symbol,
-                            'name': names.get(symbol, symbol),
-                            'price': current_price,
-                            'price_change': price_change,
-                            'price_change_pct': price_change_pct,
-                            'prev_close': prev_price,
-                            'indicators': indicators,
-                            'patterns': patterns,
-                            'advice': advice,
-                            'backtest': backtest_results
-                        })
-                        
-                        print(f"✅ {symbol} 分析完成")
-                        time.sleep(0.5)
-                        
-                    except Exception as e:
-                        logger.error(f"分析 {symbol} 时出错", exc_info=True)
-                        print(f"❌ {symbol} 分析失败: {str(e)}")
-                        continue
-                
-                # 生成报告
-                if results and server_running.is_set():  # 只有在服务器仍在运行且有结果时才生成报告
-                    report_path = analyzer.generate_report(results, title)
-                    analysis_progress["last_report_path"] = report_path
-                
-                # 更新分析状态
-                analysis_progress["in_progress"] = False
-                analysis_progress["percent"] = 1.0
-                
-                # 检查服务器是否已停止
-                if not server_running.is_set():
-                    print("\n分析已完成，但服务器已停止，不生成报告")
-                
-            except Exception as e:
-                logger.exception(f"分析过程中发生错误: {str(e)}")
-                analysis_progress["in_progress"] = False
-        
-        # 启动分析线程
-        threading.Thread(target=run_analysis).start()
+        # 在后台任务中执行分析，以便不阻塞响应；与命令行共用StockAnalyzer的分析流程
+        def run_analysis(job):
+            global analyzer
+            # 确保analyzer已初始化
+            if analyzer is None:
+                analyzer = StockAnalyzer()
+            
+            started = time.time()
+            
+            def on_progress(event, data):
+                # 更新任务进度，并发布进度事件供SSE接口推送给浏览器
+                symbol = data['symbol']
+                stock_name = names.get(symbol, symbol)
+                if isinstance(stock_name, dict):
+                    # 新格式：{name: "名称", yf_code: "YF代码"}
+                    stock_name = stock_name.get('name', symbol)
+                if symbol is not None:
+                    job.update(current_symbol=f"{stock_name} ({symbol})", current_index=data['index'])
+                if event == 'symbol':
+                    data = dict(data, name=stock_name, percent=data['completed'] / data['total'])
+                    job.update(percent=data['percent'])
+                job.publish(event, elapsed_seconds=round(time.time() - started, 2), **data)
+            
+            # 每只股票分析完成后立即写入报告，浏览器可以通过/api/progress/<job_id>/report边生成边查看
+            writer = HTMLReportWriter(title, analyzer.results_path)
+            job.update(live_report_path=str(writer.path))
+            
+            # 分析开始前批量获取全部股票的历史数据；任务取消时不再开始新的股票，也不生成报告
+            report_path = analyzer.analyze_and_report(symbols, names, title, prefetch=True,
+                                                      progress_callback=on_progress,
+                                                      cancel_event=job.cancel_event,
+                                                      report_writer=writer)
+            job.update(report_path=report_path, percent=1.0)
+            return report_path
+        
+        # 提交分析任务，超出并发数时排队等待
+        job = analysis_jobs.submit(run_analysis, kind='analysis', progress={
+            'percent': 0,
+            'current_index': 0,
+            'total': len(symbols),
+            'current_symbol': '',
+            'report_path': None,
+            'live_report_path': None
+        })
         
         # 立即返回响应，不等待分析完成
         return jsonify({
             'success': True,
             'message': '分析已开始，请等待完成',
-            'status': 'processing'
+            'status': 'processing',
+            'job_id': job.id
         })
         
     except Exception as e:
         logger.exception(f"启动分析过程中发生错误: {str(e)}")
-        analysis_progress["in_progress"] = False
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/progress')
-def get_progress():
+def analysis_progress_payload(job) -> Dict:
     """
-    获取分析进度
-    """
-    global analysis_progress
+    把分析任务的状态转换为前端使用的进度信息
     
-    if analysis_progress["in_progress"]:
-        # 计算已用时间
-        elapsed = None
-        if analysis_progress["start_time"]:
-            elapsed = (datetime.now() - analysis_progress["start_time"]).total_seconds()
+    参数:
+        job: 分析任务
         
-        # 计算预计剩余时间
+    返回:
+        Dict: 进度信息，任务完成且生成了报告时包含报告链接
+    """
+    snapshot = job.snapshot()
+    progress = snapshot['progress']
+    payload = {
+        'job_id': job.id,
+        'state': snapshot['state'],
+        'in_progress': not job.finished,
+        'percent': progress.get('percent', 0),
+        'current_index': progress.get('current_index', 0),
+        'total': progress.get('total', 0),
+        'current_symbol': progress.get('current_symbol'),
+        'error': snapshot['error']
+    }
+    
+    if not job.finished:
+        # 计算已用时间和预计剩余时间
+        elapsed = snapshot['elapsed_seconds']
         remaining = None
-        if elapsed and analysis_progress["percent"] > 0:
-            remaining = elapsed / analysis_progress["percent"] - elapsed
-        
-        return jsonify({
-            'progress': {
-                'in_progress': True,
-                'percent': analysis_progress["percent"],
-                'current_index': analysis_progress["current_index"],
-                'total': analysis_progress["total"],
-                'current_symbol': analysis_progress["current_symbol"],
-                'elapsed_seconds': elapsed,
-                'remaining_seconds': remaining
-            }
-        })
-    elif analysis_progress["last_report_path"]:
+        if elapsed and payload['percent'] > 0:
+            remaining = elapsed / payload['percent'] - elapsed
+        payload['elapsed_seconds'] = elapsed
+        payload['remaining_seconds'] = remaining
+    elif progress.get('report_path'):
         # 分析已完成，返回报告路径
-        report_path = analysis_progress["last_report_path"]
+        report_path = progress['report_path']
         report_filename = os.path.basename(report_path)
         # 使用URL编码处理文件名，确保特殊字符和空格被正确编码
-        encoded_filename = quote(report_filename)
-        report_url = f'/reports/{encoded_filename}'
+        payload['report_path'] = report_path
+        payload['report_url'] = f'/reports/{quote(report_filename)}'
         
         # 获取美国洛杉矶时间
-        la_time = datetime.now(pytz.timezone('America/Los_Angeles')).strftime('%Y-%m-%d %H:%M:%S')
-        
-        return jsonify({
-            'progress': {
-                'in_progress': False,
-                'percent': 1.0,
-                'report_path': report_path,
-                'report_url': report_url,
-                'timestamp': f"{la_time} (PST/PDT Time)"
-            }
-        })
-    else:
-        # 没有正在进行的分析
+        la_time = job.finished_at.astimezone(pytz.timezone('America/Los_Angeles')).strftime('%Y-%m-%d %H:%M:%S')
+        payload['timestamp'] = f"{la_time} (PST/PDT Time)"
+    
+    return payload
+
+@app.route('/api/progress')
+def get_progress():
+    """
+    获取最近一个分析任务的进度
+    """
+    job = analysis_jobs.latest('analysis')
+    if job is None:
+        # 没有分析任务
         return jsonify({
             'progress': None
         })
+    return jsonify({'progress': analysis_progress_payload(job)})
+
+@app.route('/api/progress/<job_id>')
+def get_job_progress(job_id):
+    """
+    获取指定分析任务的进度
+    """
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': '任务不存在或已过期'}), 404
+    return jsonify({'progress': analysis_progress_payload(job)})
+
+@app.route('/api/progress/<job_id>/stream')
+def stream_job_progress(job_id):
+    """
+    以Server-Sent Events推送分析任务的进度事件
+    
+    事件类型:
+        stage: 某只股票进入新的阶段（fetch、indicators、backtest、report）
+        symbol: 某只股票分析结束，status为done、skipped或failed
+        end: 任务结束，内容与/api/progress/<job_id>的progress相同
+    断线重连时根据Last-Event-ID继续推送之后的事件。
+    """
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': '任务不存在或已过期'}), 404
+    
+    try:
+        last_id = int(request.headers.get('Last-Event-ID', 0))
+    except ValueError:
+        last_id = 0
+    
+    def generate():
+        nonlocal last_id
+        # 通知浏览器断线后1秒重连
+        yield 'retry: 1000\n\n'
+        while True:
+            events, finished = job.wait_events(last_id, timeout=SSE_KEEPALIVE_SECONDS)
+            for record in events:
+                last_id = record['id']
+                yield f"id: {record['id']}\nevent: {record['event']}\ndata: {json.dumps(record['data'], ensure_ascii=False)}\n\n"
+            if finished:
+                yield f"event: end\ndata: {json.dumps(analysis_progress_payload(job), ensure_ascii=False)}\n\n"
+                return
+            if not events:
+                # 保持连接，防止代理超时断开
+                yield ': keep-alive\n\n'
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/progress/<job_id>/report')
+def stream_job_report(job_id):
+    """
+    边生成边返回分析任务的HTML报告
+    
+    报告文件每写入一只股票的卡片就推送给浏览器，任务结束后响应结束。
+    任务被取消或没有分析结果时报告文件会被删除，响应到此为止。
+    """
+    job = analysis_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': '任务不存在或已过期'}), 404
+    
+    def generate():
+        last_id = 0
+        handle = None
+        try:
+            while True:
+                # 先记录任务状态再读取，保证任务结束后读到完整的文件
+                finished = job.finished
+                path = job.snapshot()['progress'].get('live_report_path')
+                if handle is None and path:
+                    try:
+                        handle = open(path, 'r', encoding='utf-8')
+                    except FileNotFoundError:
+                        pass
+                if handle is not None:
+                    chunk = handle.read()
+                    if chunk:
+                        yield chunk
+                if finished:
+                    return
+                events, _ = job.wait_events(last_id, timeout=REPORT_STREAM_POLL_SECONDS)
+                if events:
+                    last_id = events[-1]['id']
+        finally:
+            if handle is not None:
+                handle.close()
+    
+    return Response(stream_with_context(generate()), mimetype='text/html',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/jobs')
+def list_jobs():
+    """
+    列出分析任务
+    """
+    return jsonify({'jobs': [analysis_progress_payload(job) for job in analysis_jobs.jobs('analysis')]})
+
+@app.route('/api/cancel/<job_id>', methods=['POST'])
+def cancel_job(job_id):
+    """
+    取消分析任务
+    """
+    if analysis_jobs.get(job_id) is None:
+        return jsonify({'error': '任务不存在或已过期'}), 404
+    if not analysis_jobs.cancel(job_id):
+        return jsonify({'success': False, 'message': '任务已结束'})
+    return jsonify({'success': True, 'message': '任务已取消'})
 
 @app.route('/reports/<path:filename>')
 def serve_report(filename):
     """
-    提供报告文件访问
+    提供报告文件访问，报告文件从报告索引中查找
     """
     try:
-        # 打印调试信息
-        print(f"请求访问报告: {filename}")
-        print(f"分析器报告目录: {analyzer.results_path}")
-        
-        # 确保报告目录存在
-        if not os.path.exists(analyzer.results_path):
-            print(f"报告目录不存在: {analyzer.results_path}")
-            return jsonify({'error': f'报告目录不存在: {analyzer.results_path}'}), 404
-            
         # 处理文件名中可能的URL编码问题
         filename = os.path.basename(filename)
-        print(f"处理后的文件名: {filename}")
         
-        # 检查文件是否存在
-        report_path = os.path.join(analyzer.results_path, filename)
-        print(f"尝试访问报告路径: {report_path}")
-        
-        if not os.path.exists(report_path):
-            print(f"报告文件不存在: {report_path}")
-            
-            # 列出目录中的所有文件
-            print("目录中的文件:")
-            for file in os.listdir(analyzer.results_path):
-                print(f" - {file}")
-            
-            # 尝试查找匹配的文件（忽略空格问题）
-            for file in os.listdir(analyzer.results_path):
-                if file.replace(" ", "") == filename.replace(" ", ""):
-                    report_path = os.path.join(analyzer.results_path, file)
-                    filename = file
-                    print(f"找到匹配的文件: {filename}")
-                    break
-            else:
-                return jsonify({'error': f'报告文件不存在: {filename}'}), 404
+        # 按文件名查找报告，找不到时忽略空格差异
+        entry = get_catalog(analyzer.results_path).find(filename)
+        if entry is None:
+            print(f"报告文件不存在: {filename}")
+            return jsonify({'error': f'报告文件不存在: {filename}'}), 404
         
-        print(f"准备发送文件: {filename}")
         # 使用绝对路径
-        abs_path = os.path.abspath(analyzer.results_path)
-        print(f"绝对路径: {abs_path}")
-        
         return send_from_directory(
-            abs_path,
-            filename,
+            os.path.abspath(analyzer.results_path),
+            entry['name'],
             as_attachment=False
         )
     except Exception as e:
@@ -412,41 +393,40 @@ def serve_report(filename):
 @app.route('/api/reports')
 def list_reports():
     """
-    列出所有报告
+    分页列出报告，按生成时间从新到旧排列
+    
+    查询参数:
+        offset: 跳过的报告数，默认0
+        limit: 返回的最大报告数，默认全部
     """
     try:
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        limit = request.args.get('limit', type=int)
+        entries, total = get_catalog(analyzer.results_path).list(offset, limit)
+        
         reports = []
-        if not os.path.exists(analyzer.results_path):
-            return jsonify({
-                'success': True,
-                'reports': []
-            })
+        la_timezone = pytz.timezone('America/Los_Angeles')
+        for entry in entries:
+            # 使用美国洛杉矶时间
+            created_time = datetime.fromtimestamp(entry['created'], la_timezone)
+            # 判断是否为夏令时
+            is_dst = created_time.dst() != timedelta(0)
+            tz_suffix = "PDT" if is_dst else "PST"
             
-        for filename in os.listdir(analyzer.results_path):
-            if filename.endswith('.html'):
-                filepath = os.path.join(analyzer.results_path, filename)
-                # 使用美国洛杉矶时间
-                created_timestamp = os.path.getctime(filepath)
-                created_time = datetime.fromtimestamp(
-                    created_timestamp, 
-                    pytz.timezone('America/Los_Angeles')
-                )
-                # 判断是否为夏令时
-                is_dst = created_time.dst() != timedelta(0)
-                tz_suffix = "PDT" if is_dst else "PST"
-                
+            reports.append({
+                'name': entry['name'],
+                'title': entry['title'],
+                'stock_count': entry['stock_count'],
                 # 使用URL编码处理文件名
-                encoded_filename = quote(filename)
-                
-                reports.append({
-                    'name': filename,
-                    'url': f'/reports/{encoded_filename}',
-                    'created': created_time.strftime(f'%Y-%m-%d %H:%M:%S ({tz_suffix} Time)')
-                })
+                'url': f"/reports/{quote(entry['name'])}",
+                'created': created_time.strftime(f'%Y-%m-%d %H:%M:%S ({tz_suffix} Time)')
+            })
         
         return jsonify({
             'success': True,
-            'reports': sorted(reports, key=lambda x: x['created'], reverse=True)
+            'reports': reports,
+            'total': total,
+            'offset': offset
         })
         
     except Exception as e:
@@ -504,6 +484,8 @@ def validate_stocks():
         codes = data.get('codes', [])
         market = data.get('market', 'US')
         translate = data.get('translate', True)  # 默认启用翻译
+        # 客户端生成的请求ID，用于查询本次请求的验证进度
+        request_id = str(data.get('request_id') or uuid.uuid4().hex)
         
         logger.info(f"收到验证请求: {len(codes)} 个股票代码, 市场: {market}, 翻译: {translate}")
         
@@ -519,9 +501,19 @@ def validate_stocks():
         # 记录请求的代码
         logger.debug(f"验证的股票代码: {codes}")
         
+        # 每个代码验证完成时更新本次请求的进度
+        progress = dict(IDLE_VALIDATION_PROGRESS, in_progress=True, total=len(codes))
+        with validation_progress_lock:
+            validation_progress[request_id] = progress
+        
+        def on_validated(done, total, code, result):
+            with validation_progress_lock:
+                progress.update(completed=done, percent=done / total * 100, current_code=code)
+        
         try:
-            # 批量验证股票代码
-            results = batch_validate_stock_codes(codes, market, translate=translate)
+            # 并发批量验证股票代码
+            results = batch_validate_stock_codes(codes, market, translate=translate,
+                                                 progress_callback=on_validated)
             
             # 统计验证结果
             valid_count = sum(1 for r in results if r.get('valid', False))
@@ -530,6 +522,7 @@ def validate_stocks():
             logger.info(f"验证完成: 总计 {len(results)}, 有效 {valid_count}, 无效 {invalid_count}")
             
             return jsonify({
+                'request_id': request_id,
                 'results': results,
                 'summary': {
                     'total': len(results),
@@ -540,6 +533,9 @@ def validate_stocks():
         except Exception as inner_e:
             logger.exception(f"执行批量验证时发生错误: {str(inner_e)}")
             return jsonify({'error': f'验证过程出错: {str(inner_e)}'}), 500
+        finally:
+            with validation_progress_lock:
+                validation_progress.pop(request_id, None)
             
     except Exception as e:
         logger.exception(f"批量验证股票代码时发生错误: {str(e)}")
@@ -752,132 +748,99 @@ def auto_organize_watchlist():
         organize_progress['percent'] = 20
         organize_progress['status'] = f'准备验证{stats["stocks"]}个股票代码（去除{stats["duplicates"]}个重复项）...'
         
-        # 批量验证所有股票
+        # 并发验证所有股票，进度按已完成的代码数更新 - 验证阶段占40%的进度(20%-60%)
+        symbols = [stock['symbol'] for stock in all_stocks]
+        
+        def on_validated(done, total, code, result):
+            organize_progress['percent'] = 20 + (done / total) * 40
+            organize_progress['status'] = f'正在验证股票代码有效性 ({done}/{total}): {code}'
+        
+        try:
+            results = batch_validate_stock_codes(symbols, translate=True, progress_callback=on_validated)
+        except Exception as validate_error:
+            app.logger.error(f"验证股票代码失败: {str(validate_error)}")
+            # 使用空结果继续处理
+            results = [{'valid': False, 'error': '验证过程出错'} for _ in symbols]
+        
+        # 处理验证结果
         validated_stocks = []
-        batch_size = 20
-        total_batches = (len(all_stocks) + batch_size - 1) // batch_size
         
         # 用于跟踪已验证的股票代码，避免重复
         validated_symbols = set()
         
-        for i in range(0, len(all_stocks), batch_size):
+        for stock, result in zip(all_stocks, results):
             try:
-                batch_index = i // batch_size
-                batch = all_stocks[i:i+batch_size]
-                symbols = [stock['symbol'] for stock in batch]
-                
-                # 更新进度 - 验证阶段占40%的进度(20%-60%)
-                progress_percent = 20 + (batch_index / total_batches) * 40
-                organize_progress['percent'] = progress_percent
-                
-                # 每个批次使用不同的状态消息，使界面更加动态
-                if batch_index % 5 == 0:
-                    organize_progress['status'] = f'正在验证股票代码有效性 ({i+1}-{min(i+batch_size, len(all_stocks))}/{len(all_stocks)})...'
-                elif batch_index % 5 == 1:
-                    organize_progress['status'] = f'正在查询股票信息和最新数据 ({i+1}-{min(i+batch_size, len(all_stocks))}/{len(all_stocks)})...'
-                elif batch_index % 5 == 2:
-                    organize_progress['status'] = f'正在翻译股票名称为中文 ({i+1}-{min(i+batch_size, len(all_stocks))}/{len(all_stocks)})...'
-                elif batch_index % 5 == 3:
-                    organize_progress['status'] = f'正在修复无效的股票代码 ({i+1}-{min(i+batch_size, len(all_stocks))}/{len(all_stocks)})...'
+                if result.get('valid', False):
+                    # 获取转换后的代码（如果有）
+                    converted_code = result.get('yf_code') or stock['symbol']
+                    
+                    # 如果转换后的代码已经存在，跳过（去重）
+                    if converted_code in validated_symbols:
+                        stats['duplicates'] += 1
+                        continue
+                    
+                    # 添加到已验证集合
+                    validated_symbols.add(converted_code)
+                    
+                    # 有效股票
+                    validated_stock = {
+                        'valid': True,
+                        'original': stock['symbol'],
+                        'converted': converted_code,
+                        'name': result.get('name', stock.get('name', '')),
+                        'market_type': result.get('market_type', ''),
+                        'originalGroup': stock['group']
+                    }
+                    
+                    # 检查是否有中文名称
+                    if validated_stock['name'] != stock.get('name', ''):
+                        stats['translated'] += 1
+                    
+                    validated_stocks.append(validated_stock)
                 else:
-                    organize_progress['status'] = f'正在处理特殊格式的股票代码 ({i+1}-{min(i+batch_size, len(all_stocks))}/{len(all_stocks)})...'
-                
-                # 验证股票代码
-                try:
-                    results = batch_validate_stock_codes(symbols, translate=True)
-                except Exception as validate_error:
-                    app.logger.error(f"验证股票代码批次失败: {str(validate_error)}")
-                    # 使用空结果继续处理
-                    results = [{'valid': False, 'error': '验证过程出错'} for _ in symbols]
-                
-                # 处理验证结果
-                for j, result in enumerate(results):
-                    try:
-                        stock = batch[j]
-                        
-                        if result.get('valid', False):
-                            # 获取转换后的代码（如果有）
-                            converted_code = result.get('yf_code') or stock['symbol']
-                            
-                            # 如果转换后的代码已经存在，跳过（去重）
-                            if converted_code in validated_symbols:
-                                stats['duplicates'] += 1
-                                continue
-                            
-                            # 添加到已验证集合
-                            validated_symbols.add(converted_code)
-                            
-                            # 有效股票
-                            validated_stock = {
-                                'valid': True,
-                                'original': stock['symbol'],
-                                'converted': converted_code,
-                                'name': result.get('name', stock.get('name', '')),
-                                'market_type': result.get('market_type', ''),
-                                'originalGroup': stock['group']
-                            }
-                            
-                            # 检查是否有中文名称
-                            if validated_stock['name'] != stock.get('name', ''):
-                                stats['translated'] += 1
-                            
-                            validated_stocks.append(validated_stock)
-                        else:
-                            # 尝试修复无效股票
-                            fixed = False
-                            
-                            # 尝试不同的修复方法
-                            if stock['symbol'].startswith('.'):
-                                try:
-                                    # 可能是指数，尝试转换为^格式
-                                    fixed_symbol = '^' + stock['symbol'][1:]
-                                    fixed_result = validate_stock_code(fixed_symbol, translate=True)
-                                    if fixed_result.get('valid', False):
-                                        # 检查修复后的代码是否已存在
-                                        converted_code = fixed_result.get('yf_code') or fixed_symbol
-                                        if converted_code in validated_symbols:
-                                            stats['duplicates'] += 1
-                                            continue
-                                            
-                                        # 添加到已验证集合
-                                        validated_symbols.add(converted_code)
-                                        
-                                        fixed = True
-                                        stats['fixed'] += 1
-                                        validated_stocks.append({
-                                            'valid': True,
-                                            'original': stock['symbol'],
-                                            'converted': converted_code,
-                                            'name': fixed_result.get('name', stock.get('name', '')),
-                                            'market_type': fixed_result.get('market_type', ''),
-                                            'originalGroup': stock['group']
-                                        })
-                                except Exception as fix_error:
-                                    app.logger.warning(f"修复股票代码 {stock['symbol']} 失败: {str(fix_error)}")
-                                    fixed = False
-                            
-                            if not fixed:
-                                # 无法修复，保留原始信息
+                    # 尝试修复无效股票
+                    fixed = False
+                    
+                    # 尝试不同的修复方法
+                    if stock['symbol'].startswith('.'):
+                        try:
+                            # 可能是指数，尝试转换为^格式
+                            fixed_symbol = '^' + stock['symbol'][1:]
+                            fixed_result = validate_stock_code(fixed_symbol, translate=True)
+                            if fixed_result.get('valid', False):
+                                # 检查修复后的代码是否已存在
+                                converted_code = fixed_result.get('yf_code') or fixed_symbol
+                                if converted_code in validated_symbols:
+                                    stats['duplicates'] += 1
+                                    continue
+                                    
+                                # 添加到已验证集合
+                                validated_symbols.add(converted_code)
+                                
+                                fixed = True
+                                stats['fixed'] += 1
                                 validated_stocks.append({
-                                    'valid': False,
+                                    'valid': True,
                                     'original': stock['symbol'],
-                                    'error': result.get('error', '无效股票代码'),
+                                    'converted': converted_code,
+                                    'name': fixed_result.get('name', stock.get('name', '')),
+                                    'market_type': fixed_result.get('market_type', ''),
                                     'originalGroup': stock['group']
                                 })
-                    except Exception as result_error:
-                        app.logger.warning(f"处理验证结果时出错: {str(result_error)}")
-                        continue
-                
-                # 避免API限制
-                try:
-                    time.sleep(0.5)
-                except Exception:
-                    pass
-                
-                # 每处理完一批次，稍微增加一点进度，让用户感觉到系统在持续工作
-                organize_progress['percent'] += 0.5
-            except Exception as batch_error:
-                app.logger.error(f"处理批次 {i//batch_size + 1}/{total_batches} 时出错: {str(batch_error)}")
+                        except Exception as fix_error:
+                            app.logger.warning(f"修复股票代码 {stock['symbol']} 失败: {str(fix_error)}")
+                            fixed = False
+                    
+                    if not fixed:
+                        # 无法修复，保留原始信息
+                        validated_stocks.append({
+                            'valid': False,
+                            'original': stock['symbol'],
+                            'error': result.get('error', '无效股票代码'),
+                            'originalGroup': stock['group']
+                        })
+            except Exception as result_error:
+                app.logger.warning(f"处理验证结果时出错: {str(result_error)}")
                 continue
         
         # 更新进度 - 分类阶段
@@ -1017,6 +980,13 @@ def auto_organize_progress():
     global organize_progress
     return jsonify(organize_progress)
 
+@app.route('/api/validate-stocks-progress', methods=['GET'])
+def validate_stocks_progress():
+    """获取批量验证进度，通过request_id参数指定验证请求"""
+    request_id = request.args.get('request_id', '')
+    with validation_progress_lock:
+        return jsonify(dict(validation_progress.get(request_id, IDLE_VALIDATION_PROGRESS)))
+
 @app.route('/api/cancel-validation', methods=['POST'])
 def cancel_validation():
     """取消正在进行的验证过程"""
@@ -1077,36 +1047,19 @@ def clean_reports():
             os.makedirs(reports_dir)
             return jsonify({'success': True, 'message': '没有报告需要清理'})
         
-        # 获取当前时间
-        now = datetime.now()
+        # 从报告索引中查询需要删除的报告：强制删除时为全部报告，否则为已满指定天数的报告
+        catalog = get_catalog(reports_dir)
+        cutoff = None if force_all else datetime.now() - timedelta(days=days)
         
         # 计算删除的文件数量
         deleted_count = 0
         
-        # 遍历报告目录
-        for filename in os.listdir(reports_dir):
-            file_path = os.path.join(reports_dir, filename)
-            
-            # 只处理HTML文件
-            if not filename.endswith('.html'):
-                continue
-                
-            # 如果强制删除所有，直接删除
-            if force_all:
-                os.remove(file_path)
-                deleted_count += 1
-                continue
-                
-            # 获取文件修改时间
-            file_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-            
-            # 计算文件年龄（天）
-            file_age = (now - file_time).days
-            
-            # 如果文件年龄大于指定天数，删除它
-            if file_age >= days:
+        for entry in catalog.older_than(cutoff):
+            file_path = os.path.join(reports_dir, entry['name'])
+            if os.path.exists(file_path):
                 os.remove(file_path)
                 deleted_count += 1
+            catalog.remove(entry['name'])
         
         # 返回成功消息
         return jsonify({
@@ -1123,14 +1076,13 @@ def shutdown_server():
     """
     关闭服务器API
     """
-    global server_running, analysis_progress
+    global server_running
     try:
         # 设置服务器停止标志
         if 'server_running' in globals() and server_running is not None:
             server_running.clear()
-            # 如果正在分析，标记分析为已完成
-            if analysis_progress["in_progress"]:
-                analysis_progress["in_progress"] = False
+            # 如果正在分析，取消所有分析任务
+            if analysis_jobs.cancel_all():
                 print("\n浏览器已关闭，但分析任务正在进行。正在安全停止...")
             else:
                 print("\n浏览器已关闭，服务器正在停止...")
@@ -1141,11 +1093,10 @@ def shutdown_server():
 
 def refresh_reports_cache():
     """
-    刷新报告缓存
+    刷新报告缓存，使报告索引与报告目录中的文件一致
     """
-    # 获取报告目录
-    # 这里可以添加任何需要的缓存刷新逻辑
-    logger.info("刷新报告列表缓存")
+    added, removed = get_catalog(analyzer.results_path).sync()
+    logger.info(f"刷新报告列表缓存: 新增 {added} 个，移除 {removed} 个")
 
 def load_watchlists() -> Dict[str, Dict[str, str]]:
     """
@@ -1296,6 +1247,7 @@ def start_server(host, port):
         except Exception as e:
             logger.exception("Flask服务器运行出错")
             server_running.clear()
+            analysis_jobs.cancel_all()
     
     def handle_commands():
         """处理用户输入的命令"""
@@ -1348,12 +1300,14 @@ def start_server(host, port):
                     elif command == 'stop':
                         print("\n正在停止服务器...")
                         server_running.clear()
+                        analysis_jobs.cancel_all()
                         # 不再使用sys.exit()，而是返回
                         return False
                         
                     elif command == 'restart':
                         print("\n正在重启服务器...")
                         server_running.clear()
+                        analysis_jobs.cancel_all()
                         time.sleep(1)
                         return True  # 表示需要重启
                         
@@ -1408,9 +1362,19 @@ def run_web_server(host='0.0.0.0', port=5000):
     # 设置日志
     logger = setup_logging(False)
     
+    # 启用本地行情缓存和股票元数据缓存
+    configure_cache()
+    configure_metadata_store()
+    
     # 创建分析器
     analyzer = StockAnalyzer()
     
+    # 启动时把手动放入或删除的报告同步到报告索引
+    try:
+        refresh_reports_cache()
+    except Exception as e:
+        logger.warning(f"同步报告索引失败: {str(e)}")
+    
     # 加载观察列表
     watchlists = load_watchlists()
     